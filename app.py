@@ -1,67 +1,114 @@
+import importlib
 import os
 from flask import Flask
-from src.routes.survey import survey_bp
-from src.routes.internal_qc.single_station import single_station_bp
-from src.routes.internal_qc.multi_station import multi_station_bp
-from src.routes.comparison_qc.comparison import comparison_qc_bp
-from src.routes.internal_qc.measurement import measurement_bp
-from src.routes.toolcode import toolcode_bp
-from src.routes.recommendations import recommendations_bp
-from src.routes.survey_conversions.synthetic_data import synthetic_data_bp, parse_bp
-from src.routes.corrections.corrections import corrections_bp
-from src.routes.survey_conversions.survey_from_raw_data import survey_from_raw_data_bp
-from src.routes.survey_conversions.survey_from_raw_gyro import survey_from_raw_gyro_bp
-from src.routes.test_generator import test_generator_bp
+from flask_compress import Compress
+from src.utils.json_provider import OrjsonProvider
+from src.utils.health import HealthShortcut
 
+# Blueprints are imported lazily (PEP 562) so that `import app` stays cheap;
+# the blueprint modules – and NumPy/IPM parsing behind them – are only loaded
+# when create_app() registers them or an attribute is accessed explicitly.
+_LAZY = {
+    "survey_bp": "src.routes.survey",
+    "single_station_bp": "src.routes.internal_qc.single_station",
+    "multi_station_bp": "src.routes.internal_qc.multi_station",
+    "comparison_qc_bp": "src.routes.comparison_qc.comparison",
+    "measurement_bp": "src.routes.internal_qc.measurement",
+    "toolcode_bp": "src.routes.toolcode",
+    "recommendations_bp": "src.routes.recommendations",
+    "synthetic_data_bp": "src.routes.survey_conversions.synthetic_data",
+    "parse_bp": "src.routes.survey_conversions.synthetic_data",
+    "corrections_bp": "src.routes.corrections.corrections",
+    "survey_from_raw_data_bp": "src.routes.survey_conversions.survey_from_raw_data",
+    "survey_from_raw_gyro_bp": "src.routes.survey_conversions.survey_from_raw_gyro",
+    "test_generator_bp": "src.routes.test_generator",
+    "qc_cache_bp": "src.routes.qc_cache",
+}
 
-def create_app(config_name=None):
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _register(app, bp_name, url_prefix=None):
+    """Import the blueprint's module on demand and register it."""
+    mod = importlib.import_module(_LAZY[bp_name])
+    app.register_blueprint(getattr(mod, bp_name), url_prefix=url_prefix)
+
+
+# Blueprint groups: (blueprint name, url prefix); a None prefix means the
+# blueprint declares its own in its constructor.  A bundle is the set a
+# process registers, so e.g. an internal-QC-only worker never imports the
+# comparison or survey-conversion modules.
+# The hot QC blueprints come first so their rules head the url_map.
+_INTERNAL = [
+    ('single_station_bp', None),
+    ('multi_station_bp', None),
+    ('survey_bp', '/api/v1/survey'),
+    ('toolcode_bp', None),
+    ('measurement_bp', '/api/v1/qc/measurement'),
+    ('qc_cache_bp', '/api/v1/qc/cache'),
+]
+_EXTERNAL = [
+    ('comparison_qc_bp', '/api/v1/qc/comparison'),
+    ('recommendations_bp', '/api/v1/recommendations'),
+]
+_CONVERSIONS = [
+    ('synthetic_data_bp', '/api/v1/synthetic-data'),
+    ('parse_bp', '/api/v1/parse'),
+    ('corrections_bp', '/api/v1/corrections'),
+    ('survey_from_raw_data_bp', '/api/v1/survey-from-raw-data'),
+    ('survey_from_raw_gyro_bp', '/api/v1/survey-from-raw-gyro'),
+    ('test_generator_bp', '/api/v1/test-generator'),
+]
+_BUNDLES = {
+    "internal": _INTERNAL,
+    "external": _EXTERNAL,
+    "full": _INTERNAL + _EXTERNAL + _CONVERSIONS,
+}
+
+
+def create_app(config_name=None, bundle=None):
+    """
+    Build the Flask app.
+
+    *bundle* selects which blueprint group to register ("internal",
+    "external" or "full"); it defaults to the APP_BUNDLE environment
+    variable and then to "full".
+    """
+    bundle = bundle or os.environ.get('APP_BUNDLE', 'full')
+    if bundle not in _BUNDLES:
+        raise ValueError(f"Unknown APP_BUNDLE {bundle!r}; expected one of {sorted(_BUNDLES)}")
+    
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Configure the app using environment variables
     app.config['DEBUG'] = os.environ.get('DEBUG', 'False').lower() == 'true'
     app.config['TESTING'] = os.environ.get('TESTING', 'False').lower() == 'true'
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'hard-to-guess-key'
+    app.config['APP_BUNDLE'] = bundle
     
-    # Add any additional configuration parameters as needed
+    # Compress large JSON responses (multi-station results grow with N stations)
+    app.config['COMPRESS_MIMETYPES'] = ['application/json']
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    app.config['COMPRESS_LEVEL'] = 4
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    Compress(app)
     
-    # Register basic blueprints
-    app.register_blueprint(survey_bp, url_prefix='/api/v1/survey')
-    app.register_blueprint(single_station_bp, url_prefix='/api/v1/qc/single-station')
-    app.register_blueprint(multi_station_bp, url_prefix='/api/v1/qc/multi-station')
-    app.register_blueprint(toolcode_bp, url_prefix='/api/v1/toolcode')
-    app.register_blueprint(measurement_bp, url_prefix='/api/v1/qc/measurement')  # Add this line
+    # Accept "/msat/" as "/msat" without a redirect round trip and collapse
+    # duplicate slashes; rules read these when registered, so set them first.
+    app.url_map.strict_slashes = False
+    app.url_map.merge_slashes = True
     
-    # Register comparison QC blueprint
-    app.register_blueprint(comparison_qc_bp, url_prefix='/api/v1/qc/comparison')
-    
-    # Register recommendations blueprint
-    app.register_blueprint(recommendations_bp, url_prefix='/api/v1/recommendations')
-    
-    # Register synthetic data blueprint
-    app.register_blueprint(synthetic_data_bp, url_prefix='/api/v1/synthetic-data')
-    
-    # Register parse blueprint
-    app.register_blueprint(parse_bp, url_prefix='/api/v1/parse')
+    # Register the bundle's blueprints
+    for bp_name, url_prefix in _BUNDLES[bundle]:
+        _register(app, bp_name, url_prefix)
 
-    # Register corrections blueprint
-    app.register_blueprint(corrections_bp, url_prefix='/api/v1/corrections')  
-    
-    # Register survey from raw data blueprint
-    app.register_blueprint(survey_from_raw_data_bp, url_prefix='/api/v1/survey-from-raw-data')  
-    
-    # Register survey from raw gyro blueprint
-    app.register_blueprint(survey_from_raw_gyro_bp, url_prefix='/api/v1/survey-from-raw-gyro')
-    
-    # Register test generator blueprint
-    app.register_blueprint(test_generator_bp, url_prefix='/api/v1/test-generator')
-
-    
-    @app.route('/healthz', methods=['GET'])
-    def health_check():
-        return {'status': 'healthy'}, 200
+    # /health and /healthz are answered in front of Flask
+    app.wsgi_app = HealthShortcut(app.wsgi_app)
     
     return app
-
-if __name__ == '__main__':
-    app = create_app()
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
\ No newline at end of file
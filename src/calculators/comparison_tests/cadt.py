@@ -2,7 +2,7 @@
 import math
 import numpy as np
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
 
 # Sidereal Earth rotation rate in degrees/hour
@@ -106,7 +106,7 @@ def perform_cadt(in_run, out_run, average_running_speed, ipm_data):
     
     # ---------- Check against error model tolerances ---------------------------
     # Parse IPM data
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
     
     # Get 1σ tolerances from IPM
     sigma_drift = get_error_term_value(ipm, "VD", "e", "s", default=0.2)  # Gyro drift
@@ -113,9 +113,9 @@ def perform_codt(survey1, survey2, max_stations=15):
                         east_diff * math.sin(az_avg) * math.sin(inc_avg)
         
         # Combined standard deviations
-        lateral_std = math.sqrt(point['lateral_std1']**2 + point['lateral_std2']**2)
-        highside_std = math.sqrt(point['highside_std1']**2 + point['highside_std2']**2)
-        alonghole_std = math.sqrt(point['alonghole_std1']**2 + point['alonghole_std2']**2)
+        lateral_std = math.hypot(point['lateral_std1'], point['lateral_std2'])
+        highside_std = math.hypot(point['highside_std1'], point['highside_std2'])
+        alonghole_std = math.hypot(point['alonghole_std1'], point['alonghole_std2'])
         
         # Add to valid points lists if standard deviation is sufficient
         if lateral_std >= min_std:
@@ -60,7 +60,7 @@ def perform_idt(survey1, survey2, max_stations=15):
     # ---------- Calculate Chi-square test statistic ----------------------------
     # Filter points with very small standard deviations
     valid_points = [p for p in matching_points 
-                  if math.sqrt(p['std1']**2 + p['std2']**2) >= 0.1]
+                  if math.hypot(p['std1'], p['std2']) >= 0.1]
     
     if len(valid_points) < 3:
         return _fail("Not enough points with sufficient inclination uncertainty")
@@ -2,7 +2,7 @@
 import math
 import numpy as np
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
 from src.utils.linalg import safe_inverse
 
@@ -100,7 +100,7 @@ def perform_iomt(in_run, out_run, ipm_data):
     residuals = inc_diffs - (A @ params)
     
     # Get tolerance values from IPM
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
     σ_mx = get_error_term_value(ipm, "MX", "e", "s")
     σ_my = get_error_term_value(ipm, "MY", "e", "s")
     σ_mr = get_error_term_value(ipm, "MR", "e", "s", default=0.05)  # Default random misalignment term
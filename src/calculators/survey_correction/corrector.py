@@ -1,8 +1,7 @@
 # services/survey/corrector.py
 import math
-import numpy as np
 from src.models.survey import Survey
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 
 def correct_surveys(surveys_data, ipm_data=None):
     """
@@ -27,7 +26,7 @@ def correct_surveys(surveys_data, ipm_data=None):
     ipm = None
     if ipm_data:
         if isinstance(ipm_data, str):
-            ipm = parse_ipm_file(ipm_data)
+            ipm = parse_ipm_file_cached(ipm_data)
         else:
             ipm = ipm_data
     
@@ -152,7 +151,7 @@ def apply_sensor_corrections(survey, ipm):
     # Recalculate inclination and azimuth based on corrected sensor readings
     if hasattr(corrected, 'Gx') and hasattr(corrected, 'Gy') and hasattr(corrected, 'Gz'):
         # Recalculate inclination
-        g = math.sqrt(corrected.Gx**2 + corrected.Gy**2 + corrected.Gz**2)
+        g = math.hypot(corrected.Gx, corrected.Gy, corrected.Gz)
         if g > 0:
             corrected.inclination = math.degrees(math.acos(corrected.Gz / g))
             
@@ -173,7 +172,7 @@ def apply_sensor_corrections(survey, ipm):
             pass
         else:
             # Get unit vectors
-            g_mag = math.sqrt(corrected.Gx**2 + corrected.Gy**2 + corrected.Gz**2)
+            g_mag = math.hypot(corrected.Gx, corrected.Gy, corrected.Gz)
             gx_unit = corrected.Gx / g_mag if g_mag > 0 else 0
             gy_unit = corrected.Gy / g_mag if g_mag > 0 else 0
             gz_unit = corrected.Gz / g_mag if g_mag > 0 else 0
@@ -1,7 +1,7 @@
 # …/stages/01_ipm_sensor.py
 from typing import List
 from src.models.survey import Survey
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 
 _BIAS_TERMS  = ["ABX","ABY","ABZ","MBX","MBY","MBZ","GBX","GBY"]
 _SCALE_TERMS = ["ASX","ASY","ASZ","MSX","MSY","MSZ"]
@@ -14,7 +14,7 @@ def apply(surveys: List[Survey], ctx: dict) -> List[Survey]:
     ipm = ctx.get("ipm")
     if not ipm:
         raw = ctx.get("ipm_content")
-        if raw: ipm = parse_ipm_file(raw)
+        if raw: ipm = parse_ipm_file_cached(raw)
         else:   return surveys
 
     g_std = 9.80665
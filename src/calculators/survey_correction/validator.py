@@ -47,7 +47,7 @@ def validate_survey(survey_data):
     # Validate accelerometer readings consistency
     if hasattr(survey, 'Gx') and hasattr(survey, 'Gy') and hasattr(survey, 'Gz'):
         # Calculate gravity magnitude (should be close to 1g)
-        g_mag = math.sqrt(survey.Gx**2 + survey.Gy**2 + survey.Gz**2)
+        g_mag = math.hypot(survey.Gx, survey.Gy, survey.Gz)
         if abs(g_mag - 1.0) > 0.1:  # 10% tolerance
             result['warnings'].append(f'Accelerometer magnitude {g_mag:.3f}g differs from expected 1g')
             
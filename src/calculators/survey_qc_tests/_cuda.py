@@ -0,0 +1,112 @@
+# src/calculators/survey_qc_tests/_cuda.py
+"""
+CUDA offload for very large QC batches
+--------------------------------------
+GPU twin of `_kernels.get_batch_kernel`: one thread per station, no
+cross-station dependencies.  Only worth the transfer and launch overhead for
+fleet-sized batches, so callers go through `use_gpu(n)`, which needs
+numba.cuda, a visible device and at least `QC_GPU_MIN_STATIONS` stations
+(default 100 000).
+
+Without numba.cuda or a GPU this module imports fine and `use_gpu` is
+always False.
+"""
+from __future__ import annotations
+
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from numba import cuda  # type: ignore
+except ImportError:  # pragma: no cover – executed only when Numba absent
+    cuda = None
+
+GPU_MIN_STATIONS = int(os.environ.get("QC_GPU_MIN_STATIONS", "100000"))
+THREADS_PER_BLOCK = 256
+
+
+@lru_cache(maxsize=1)
+def _cuda_ready() -> bool:
+    """True once a CUDA device has been found (probed on first use only)."""
+    try:
+        return cuda is not None and cuda.is_available()
+    except Exception:  # driver/runtime problems mean "no GPU"
+        return False
+
+
+def use_gpu(n: int) -> bool:
+    """Should a batch of *n* stations be offloaded to the GPU?"""
+    return n >= GPU_MIN_STATIONS and _cuda_ready()
+
+
+if cuda is not None:
+
+    @cuda.jit
+    def _get_kernel(ax, ay, az, inc_in, tf_in, use_inc, use_tf, gt,
+                    sig_i, sig_e, sigma,
+                    meas, calc_inc, calc_tf, err, tol, valid):
+        i = cuda.grid(1)
+        if i >= ax.shape[0]:
+            return
+        to_deg = 180.0 / math.pi
+        to_rad = math.pi / 180.0
+
+        x, y, z = ax[i], ay[i], az[i]
+        g = math.sqrt(x * x + y * y + z * z)
+        ci = math.acos(min(max(z / g, -1.0), 1.0)) * to_deg
+        ct = math.nan
+        if ci >= 10.0 and ci <= 170.0:
+            ct = (math.atan2(y, x) * to_deg) % 360.0
+
+        inc = inc_in[i] if use_inc else ci
+        tf = tf_in[i] if use_tf else ct
+        I = inc * to_rad
+        T = tf * to_rad
+        s_i = math.sin(I)
+        wx = s_i * math.sin(T)
+        wy = s_i * math.cos(T)
+        wz = math.cos(I)
+
+        if inc > 3.0:
+            ab_xy, abz, as_xy, asz = sig_i[0], sig_i[1], sig_i[2], sig_i[3]
+        else:
+            ab_xy, abz, as_xy, asz = sig_e[0], sig_e[1], sig_e[2], sig_e[3]
+        wx2 = wx * wx
+        wy2 = wy * wy
+        wz2 = wz * wz
+        acc = ab_xy * ab_xy * (wx2 + wy2) + abz * abz * wz2
+        scale = as_xy * as_xy * (wx2 * wx2 + wy2 * wy2) + asz * asz * (wz2 * wz2)
+        tol2 = sigma * sigma * (acc + gt[i] * gt[i] * scale)
+
+        e = g - gt[i]
+        meas[i] = g
+        calc_inc[i] = ci
+        calc_tf[i] = ct
+        err[i] = e
+        tol[i] = math.sqrt(tol2)
+        valid[i] = e * e <= tol2
+
+
+def get_batch_gpu(ax, ay, az, inc_in, tf_in, use_inc, use_tf, gt,
+                  sig_i, sig_e, sigma):
+    """Same arguments and return tuple as `_kernels.get_batch_kernel`."""
+    n = ax.shape[0]
+    stream = cuda.stream()
+    inputs = [cuda.to_device(np.ascontiguousarray(a), stream=stream)
+              for a in (ax, ay, az, inc_in, tf_in, gt, sig_i, sig_e)]
+    outputs = [cuda.device_array(n, dtype=np.float64, stream=stream)
+               for _ in range(5)]
+    valid = cuda.device_array(n, dtype=np.bool_, stream=stream)
+
+    d_ax, d_ay, d_az, d_inc, d_tf, d_gt, d_sig_i, d_sig_e = inputs
+    blocks = (n + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    _get_kernel[blocks, THREADS_PER_BLOCK, stream](
+        d_ax, d_ay, d_az, d_inc, d_tf, use_inc, use_tf, d_gt,
+        d_sig_i, d_sig_e, sigma, *outputs, valid)
+
+    host = [d.copy_to_host(stream=stream) for d in (*outputs, valid)]
+    stream.synchronize()
+    return tuple(host)
@@ -0,0 +1,584 @@
+# src/calculators/survey_qc_tests/_kernels.py
+"""
+Numba kernels for the QC tolerance maths
+----------------------------------------
+Pure-arithmetic cores of the tolerance formulas, compiled with Numba so the
+per-station work runs as native code.  Callers keep doing the IPM lookups in
+Python and pass only floats in, so the kernels never see Python objects.
+
+If the ahead-of-time extension built by `tools/build_qc_kernels.py` is
+importable, its exports replace the JIT versions and nothing is compiled at
+import.  When Numba is not installed either, the decorators collapse to
+no-ops and the same functions run as plain Python.
+
+The `*_batch_kernel` functions are the multi-station versions: one
+`prange` loop over the station axis, spread across cores by Numba.  They
+only pay off when compiled, so batch callers check `HAVE_NUMBA` and keep
+their NumPy expression otherwise.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Attempt to import Numba; fall back automatically if unavailable.
+# -----------------------------------------------------------------------------
+try:
+    from numba import njit, prange  # type: ignore
+    HAVE_NUMBA = True
+except ModuleNotFoundError:  # pragma: no cover – executed only when Numba absent
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):  # type: ignore  # noqa: D401 – dummy decorator
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+try:
+    from src.calculators.survey_qc_tests import _qc_kernels_aot as _aot  # type: ignore
+except ImportError:
+    _aot = None
+
+# name -> (python function, nargs); read by tools/build_qc_kernels.py
+PY_KERNELS: dict = {}
+
+
+def _f64_sig(nargs: int) -> str:
+    """Numba signature string for a kernel taking *nargs* floats."""
+    return "float64(" + ", ".join(["float64"] * nargs) + ")"
+
+
+def _kernel(nargs: int):
+    """
+    Compile a float-only kernel, preferring the AOT build when present.
+
+    Explicit signatures make Numba compile (or load from the on-disk cache) at
+    import time, so the first request does not pay the JIT latency.
+    """
+    def decorator(func):
+        PY_KERNELS[func.__name__] = (func, nargs)
+        if _aot is not None and hasattr(_aot, func.__name__):
+            return getattr(_aot, func.__name__)
+        return njit(_f64_sig(nargs), cache=True, fastmath=True)(func)
+
+    return decorator
+
+
+# -----------------------------------------------------------------------------
+# GET – gravity-error variance (Ekseth 2006, App. 1 A, Eq. 3)
+# -----------------------------------------------------------------------------
+@_kernel(8)
+def get_var_kernel(wx, wy, wz, ab_xy, abz, as_xy, asz, gt):
+    """
+    Return the 1-σ² gravity-error variance for one station.
+
+    The X and Y accelerometers share the ABXY/ASXY sigmas, so their bias and
+    scale terms are factored:  ab_xy²·(wx² + wy²)  and  as_xy²·(wx⁴ + wy⁴).
+    """
+    wx2 = wx * wx
+    wy2 = wy * wy
+    wz2 = wz * wz
+    acc = ab_xy * ab_xy * (wx2 + wy2)
+    acc += abz * abz * wz2
+    scale = as_xy * as_xy * (wx2 * wx2 + wy2 * wy2)
+    scale += asz * asz * (wz2 * wz2)
+    return acc + gt * gt * scale
+
+
+# -----------------------------------------------------------------------------
+# HERT – horizontal earth-rate variance (Ekseth 2006, App. 1 C)
+# -----------------------------------------------------------------------------
+@_kernel(12)
+def hert_var_kernel(gbx, gby, gsx, gsy, m, q, gr,
+                    w_gbx, w_gby, w_m, w_q, omega_cos_phi):
+    """Return the 1-σ² horizontal-rate variance for one station."""
+    t = gbx * w_gbx
+    acc = t * t
+    t = gby * w_gby
+    acc += t * t
+    t = gsx * (2.0 * w_gbx * omega_cos_phi)
+    acc += t * t
+    t = gsy * (2.0 * w_gby * omega_cos_phi)
+    acc += t * t
+    t = m * w_m
+    acc += t * t
+    t = q * w_q
+    acc += t * t
+    return acc + gr * gr
+
+
+# -----------------------------------------------------------------------------
+# Batched variances – one parallel pass over the station axis
+# -----------------------------------------------------------------------------
+@njit(parallel=True, fastmath=True, cache=True)
+def get_var_batch_kernel(wx, wy, wz, sig, gt):
+    """
+    GET variance per station.
+
+    *sig* is the (N, 4) sigma block in `_GET_TERMS` order and *gt* the
+    per-station gravity; same factored terms as `get_var_kernel`.
+    """
+    n = wx.shape[0]
+    out = np.empty(n)
+    for i in prange(n):
+        wx2 = wx[i] * wx[i]
+        wy2 = wy[i] * wy[i]
+        wz2 = wz[i] * wz[i]
+        ab_xy, abz, as_xy, asz = sig[i, 0], sig[i, 1], sig[i, 2], sig[i, 3]
+        acc = ab_xy * ab_xy * (wx2 + wy2) + abz * abz * wz2
+        scale = as_xy * as_xy * (wx2 * wx2 + wy2 * wy2) + asz * asz * (wz2 * wz2)
+        out[i] = acc + gt[i] * gt[i] * scale
+    return out
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def hert_var_batch_kernel(w_gbx, w_gby, w_m, w_q, omega_cos_phi, sig):
+    """
+    HERT variance per station.
+
+    *sig* is the (N, 7) sigma block in `_HERT_TERMS` order; same terms as
+    `hert_var_kernel`.
+    """
+    n = w_gbx.shape[0]
+    out = np.empty(n)
+    for i in prange(n):
+        t = sig[i, 0] * w_gbx[i]
+        acc = t * t
+        t = sig[i, 1] * w_gby[i]
+        acc += t * t
+        t = sig[i, 2] * (2.0 * w_gbx[i] * omega_cos_phi[i])
+        acc += t * t
+        t = sig[i, 3] * (2.0 * w_gby[i] * omega_cos_phi[i])
+        acc += t * t
+        t = sig[i, 4] * w_m[i]
+        acc += t * t
+        t = sig[i, 5] * w_q[i]
+        acc += t * t
+        out[i] = acc + sig[i, 6] * sig[i, 6]
+    return out
+
+
+# -----------------------------------------------------------------------------
+# GET – whole batch in one fused pass
+# -----------------------------------------------------------------------------
+# fastmath without "nnan"/"ninf": undefined toolfaces are NaN and must stay so
+_FASTMATH_NAN_SAFE = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@njit(parallel=True, fastmath=_FASTMATH_NAN_SAFE, cache=True)
+def get_batch_kernel(ax, ay, az, inc_in, tf_in, use_inc, use_tf, gt,
+                     sig_i, sig_e, sigma):
+    """
+    Complete GET for N stations in a single prange loop.
+
+    Reads the accelerometers, the optional provided angles (*use_inc* /
+    *use_tf* say whether *inc_in* / *tf_in* hold data) and the gravity
+    reference; writes measured gravity, the accelerometer angles, error,
+    tolerance and verdict.  Every intermediate stays in registers.
+    *sig_i* / *sig_e* are the constant "i,s" / "e,s" sigma rows in
+    `_GET_TERMS` order.
+    """
+    n = ax.shape[0]
+    meas = np.empty(n)
+    calc_inc = np.empty(n)
+    calc_tf = np.empty(n)
+    err = np.empty(n)
+    tol = np.empty(n)
+    valid = np.empty(n, dtype=np.bool_)
+    to_deg = 180.0 / math.pi
+    to_rad = math.pi / 180.0
+    for i in prange(n):
+        x, y, z = ax[i], ay[i], az[i]
+        g = math.sqrt(x * x + y * y + z * z)
+        ci = math.acos(min(max(z / g, -1.0), 1.0)) * to_deg
+        ct = np.nan
+        if ci >= 10.0 and ci <= 170.0:
+            ct = (math.atan2(y, x) * to_deg) % 360.0
+
+        inc = inc_in[i] if use_inc else ci
+        tf = tf_in[i] if use_tf else ct
+        I = inc * to_rad
+        T = tf * to_rad
+        s_i = math.sin(I)
+        wx = s_i * math.sin(T)
+        wy = s_i * math.cos(T)
+        wz = math.cos(I)
+
+        sig = sig_i if inc > 3.0 else sig_e
+        wx2 = wx * wx
+        wy2 = wy * wy
+        wz2 = wz * wz
+        acc = sig[0] * sig[0] * (wx2 + wy2) + sig[1] * sig[1] * wz2
+        scale = sig[2] * sig[2] * (wx2 * wx2 + wy2 * wy2) + sig[3] * sig[3] * (wz2 * wz2)
+        tol2 = sigma * sigma * (acc + gt[i] * gt[i] * scale)
+
+        e = g - gt[i]
+        meas[i] = g
+        calc_inc[i] = ci
+        calc_tf[i] = ct
+        err[i] = e
+        tol[i] = math.sqrt(tol2)
+        valid[i] = e * e <= tol2
+    return meas, calc_inc, calc_tf, err, tol, valid
+
+
+# -----------------------------------------------------------------------------
+# MSAT – design matrix, ΔG and residual variance (Ekseth 2006, App. 1 B)
+# -----------------------------------------------------------------------------
+@njit(fastmath=True, cache=True)
+def msat_design_kernel(ax, ay, az, inc_deg, tf_deg, gt, full, sig):
+    """
+    Per-station part of `perform_msat` in one loop.
+
+    Returns the design matrix (N×5 for the *full* model, N×3 reduced), the
+    gravity-error vector ΔG and the 1-σ² residual variance.  *sig* holds
+    (σ_abxy, σ_abz, σ_asxy, σ_asz).  Serial on purpose: an MSAT survey is
+    tens to hundreds of stations, too few to pay for the thread pool.
+    """
+    n = ax.shape[0]
+    A = np.empty((n, 5 if full else 3))
+    dG = np.empty(n)
+    var = np.empty(n)
+    ab_xy, abz, as_xy, asz = sig[0], sig[1], sig[2], sig[3]
+    to_rad = math.pi / 180.0
+    for i in range(n):
+        I = inc_deg[i] * to_rad
+        T = tf_deg[i] * to_rad
+        s_i = math.sin(I)
+        wx = s_i * math.sin(T)
+        wy = s_i * math.cos(T)
+        wz = math.cos(I)
+        x, y, z = ax[i], ay[i], az[i]
+        dG[i] = math.sqrt(x * x + y * y + z * z) - gt[i]
+
+        A[i, 0] = wx
+        A[i, 1] = wy
+        A[i, 2] = wz
+        t = ab_xy * wx
+        acc = t * t
+        t = ab_xy * wy
+        acc += t * t
+        t = abz * wz
+        acc += t * t
+        if full:
+            wxg = wx * gt[i]
+            wyg = wy * gt[i]
+            A[i, 3] = 2.0 * wxg
+            A[i, 4] = 2.0 * wyg
+            t = 2.0 * as_xy * wxg
+            acc += t * t
+            t = 2.0 * as_xy * wyg
+            acc += t * t
+            t = asz * wz * gt[i]
+            acc += t * t
+        var[i] = acc
+    return A, dG, var
+
+
+# -----------------------------------------------------------------------------
+# MSE – forward model and analytic Jacobian
+# -----------------------------------------------------------------------------
+@njit(fastmath=True, cache=True)
+def _mse_terms(x, bias_col, scale_col):
+    """Bias and scale-factor values per sensor output (0 where not estimated)."""
+    bias = np.zeros(6)
+    scale = np.zeros(6)
+    for k in range(6):
+        if bias_col[k] >= 0:
+            bias[k] = x[bias_col[k]]
+        if scale_col[k] >= 0:
+            scale[k] = x[scale_col[k]]
+    return bias, scale
+
+
+@njit(fastmath=True, cache=True)
+def mse_predict_kernel(x, bt, sin_dip, cos_dip, grav, bias_col, scale_col):
+    """
+    Predicted Bx,By,Bz,Gx,Gy,Gz for every station, as `mse._predict`.
+
+    *x* holds the station angles [rad] followed by the error terms;
+    *bias_col* / *scale_col* give, per sensor output, the index in *x* of its
+    bias / scale-factor term or -1 when the model does not estimate it.
+    Serial for the same reason as `msat_design_kernel`.
+    """
+    ns = bt.shape[0]
+    y = np.empty(ns * 6)
+    bias, scale = _mse_terms(x, bias_col, scale_col)
+    for i in range(ns):
+        si = math.sin(x[3 * i])
+        ci = math.cos(x[3 * i])
+        sa = math.sin(x[3 * i + 1])
+        ca = math.cos(x[3 * i + 1])
+        st = math.sin(x[3 * i + 2])
+        ct = math.cos(x[3 * i + 2])
+        b, sd, cd, g = bt[i], sin_dip[i], cos_dip[i], grav[i]
+        r = 6 * i
+        y[r] = b * (si * ca * cd - sd * sa) * (1.0 + scale[0] * b * 2.0) + bias[0]
+        y[r + 1] = b * (si * sa * cd + sd * ca) * (1.0 + scale[1] * b * 2.0) + bias[1]
+        y[r + 2] = b * (ci * cd + si * sd) * (1.0 + scale[2] * b * 2.0) + bias[2]
+        y[r + 3] = si * st * (1.0 + scale[3] * g * 2.0) + bias[3]
+        y[r + 4] = si * ct * (1.0 + scale[4] * g * 2.0) + bias[4]
+        y[r + 5] = ci * (1.0 + scale[5] * g * 2.0) + bias[5]
+    return y
+
+
+@njit(fastmath=True, cache=True)
+def mse_jacobian_kernel(x, bt, sin_dip, cos_dip, grav, bias_col, scale_col):
+    """
+    Analytic Jacobian of `mse_predict_kernel`, same arguments, in blocks.
+
+    Returns the (ns, 6, 3) derivatives of each station's outputs w.r.t. its
+    own angles and the (ns, 6, P) derivatives w.r.t. the P error terms – the
+    only non-zeros of the full 6·ns × (3·ns + P) matrix.
+    """
+    ns = bt.shape[0]
+    J_ang = np.zeros((ns, 6, 3))
+    J_err = np.zeros((ns, 6, x.shape[0] - 3 * ns))
+    bias, scale = _mse_terms(x, bias_col, scale_col)
+    for i in range(ns):
+        si = math.sin(x[3 * i])
+        ci = math.cos(x[3 * i])
+        sa = math.sin(x[3 * i + 1])
+        ca = math.cos(x[3 * i + 1])
+        st = math.sin(x[3 * i + 2])
+        ct = math.cos(x[3 * i + 2])
+        b, sd, cd, g = bt[i], sin_dip[i], cos_dip[i], grav[i]
+        mx = 1.0 + scale[0] * b * 2.0
+        my = 1.0 + scale[1] * b * 2.0
+        mz = 1.0 + scale[2] * b * 2.0
+        gx = 1.0 + scale[3] * g * 2.0
+        gy = 1.0 + scale[4] * g * 2.0
+        gz = 1.0 + scale[5] * g * 2.0
+
+        J_ang[i, 0, 0] = b * ci * ca * cd * mx
+        J_ang[i, 0, 1] = b * (-si * sa * cd - sd * ca) * mx
+        J_ang[i, 1, 0] = b * ci * sa * cd * my
+        J_ang[i, 1, 1] = b * (si * ca * cd - sd * sa) * my
+        J_ang[i, 2, 0] = b * (ci * sd - si * cd) * mz
+        J_ang[i, 3, 0] = ci * st * gx
+        J_ang[i, 3, 2] = si * ct * gx
+        J_ang[i, 4, 0] = ci * ct * gy
+        J_ang[i, 4, 2] = -si * st * gy
+        J_ang[i, 5, 0] = -si * gz
+
+        ideal0 = b * (si * ca * cd - sd * sa)
+        ideal1 = b * (si * sa * cd + sd * ca)
+        ideal2 = b * (ci * cd + si * sd)
+        for k in range(6):
+            if bias_col[k] >= 0:
+                J_err[i, k, bias_col[k] - 3 * ns] = 1.0
+        if scale_col[0] >= 0:
+            J_err[i, 0, scale_col[0] - 3 * ns] = ideal0 * b * 2.0
+        if scale_col[1] >= 0:
+            J_err[i, 1, scale_col[1] - 3 * ns] = ideal1 * b * 2.0
+        if scale_col[2] >= 0:
+            J_err[i, 2, scale_col[2] - 3 * ns] = ideal2 * b * 2.0
+        if scale_col[3] >= 0:
+            J_err[i, 3, scale_col[3] - 3 * ns] = si * st * g * 2.0
+        if scale_col[4] >= 0:
+            J_err[i, 4, scale_col[4] - 3 * ns] = si * ct * g * 2.0
+        if scale_col[5] >= 0:
+            J_err[i, 5, scale_col[5] - 3 * ns] = ci * g * 2.0
+    return J_ang, J_err
+
+
+@njit(fastmath=True, cache=True)
+def _mse_normal(J_ang, J_err, res, ridge, bias_col, scale_col):
+    """
+    Blocks of JᵀJ + ridge·I and Jᵀr, as `mse._normal_equations`.
+
+    Each sensor output row of J_err is non-zero only under that output's
+    bias and scale-factor terms, so only those (at most two) slots of the
+    active model are accumulated instead of all P.
+    """
+    ns, P = J_err.shape[0], J_err.shape[2]
+    off = 3 * ns
+    N_aa = np.zeros((ns, 3, 3))
+    N_ae = np.zeros((ns, 3, P))
+    N_ee = np.zeros((P, P))
+    g_a = np.zeros((ns, 3))
+    g_e = np.zeros(P)
+    for i in range(ns):
+        for k in range(6):
+            r = res[6 * i + k]
+            pb = bias_col[k] - off if bias_col[k] >= 0 else -1
+            ps = scale_col[k] - off if scale_col[k] >= 0 else -1
+            eb = J_err[i, k, pb] if pb >= 0 else 0.0
+            es = J_err[i, k, ps] if ps >= 0 else 0.0
+            for a in range(3):
+                ja = J_ang[i, k, a]
+                g_a[i, a] += ja * r
+                for b in range(3):
+                    N_aa[i, a, b] += ja * J_ang[i, k, b]
+                if pb >= 0:
+                    N_ae[i, a, pb] += ja * eb
+                if ps >= 0:
+                    N_ae[i, a, ps] += ja * es
+            if pb >= 0:
+                g_e[pb] += eb * r
+                N_ee[pb, pb] += eb * eb
+            if ps >= 0:
+                g_e[ps] += es * r
+                N_ee[ps, ps] += es * es
+            if pb >= 0 and ps >= 0:
+                N_ee[pb, ps] += eb * es
+                N_ee[ps, pb] += eb * es
+        for a in range(3):
+            N_aa[i, a, a] += ridge
+    for p in range(P):
+        N_ee[p, p] += ridge
+    return N_aa, N_ae, N_ee, g_a, g_e
+
+
+@njit(fastmath=True, cache=True)
+def _inv3(A, inv):
+    """Write the inverse of the 3×3 matrix *A* into *inv* (adjugate / det)."""
+    c00 = A[1, 1] * A[2, 2] - A[1, 2] * A[2, 1]
+    c01 = A[1, 2] * A[2, 0] - A[1, 0] * A[2, 2]
+    c02 = A[1, 0] * A[2, 1] - A[1, 1] * A[2, 0]
+    det = A[0, 0] * c00 + A[0, 1] * c01 + A[0, 2] * c02
+    if det == 0.0:
+        raise np.linalg.LinAlgError("Singular matrix")
+    inv[0, 0] = c00 / det
+    inv[1, 0] = c01 / det
+    inv[2, 0] = c02 / det
+    inv[0, 1] = (A[0, 2] * A[2, 1] - A[0, 1] * A[2, 2]) / det
+    inv[1, 1] = (A[0, 0] * A[2, 2] - A[0, 2] * A[2, 0]) / det
+    inv[2, 1] = (A[0, 1] * A[2, 0] - A[0, 0] * A[2, 1]) / det
+    inv[0, 2] = (A[0, 1] * A[1, 2] - A[0, 2] * A[1, 1]) / det
+    inv[1, 2] = (A[0, 2] * A[1, 0] - A[0, 0] * A[1, 2]) / det
+    inv[2, 2] = (A[0, 0] * A[1, 1] - A[0, 1] * A[1, 0]) / det
+
+
+@njit(fastmath=True, cache=True)
+def _spd_solve_small(A, b):
+    """Solve A·x = b for a symmetric positive-definite *A* by Cholesky."""
+    n = b.shape[0]
+    L = np.zeros((n, n))
+    for j in range(n):
+        d = A[j, j]
+        for k in range(j):
+            d -= L[j, k] * L[j, k]
+        if d <= 0.0:
+            raise np.linalg.LinAlgError("Matrix is not positive definite")
+        L[j, j] = math.sqrt(d)
+        for i in range(j + 1, n):
+            acc = A[i, j]
+            for k in range(j):
+                acc -= L[i, k] * L[j, k]
+            L[i, j] = acc / L[j, j]
+    x = np.empty(n)
+    for i in range(n):                      # L·z = b
+        acc = b[i]
+        for k in range(i):
+            acc -= L[i, k] * x[k]
+        x[i] = acc / L[i, i]
+    for i in range(n - 1, -1, -1):          # Lᵀ·x = z
+        acc = x[i]
+        for k in range(i + 1, n):
+            acc -= L[k, i] * x[k]
+        x[i] = acc / L[i, i]
+    return x
+
+
+@njit(fastmath=True, cache=True)
+def _mse_schur_step(N_aa, N_ae, N_ee, g_a, g_e, damp):
+    """Damped step by eliminating the angle blocks, as `mse._schur_step`."""
+    ns, P = N_ae.shape[0], N_ae.shape[2]
+    A_inv = np.empty((ns, 3, 3))
+    AiB = np.empty((ns, 3, P))
+    S = N_ee.copy()
+    rhs = g_e.copy()
+    for p in range(P):
+        S[p, p] *= damp
+    for i in range(ns):
+        A = N_aa[i].copy()
+        for a in range(3):
+            A[a, a] *= damp
+        _inv3(A, A_inv[i])
+        for a in range(3):
+            for p in range(P):
+                AiB[i, a, p] = (A_inv[i, a, 0] * N_ae[i, 0, p] +
+                                A_inv[i, a, 1] * N_ae[i, 1, p] +
+                                A_inv[i, a, 2] * N_ae[i, 2, p])
+        for p in range(P):
+            for a in range(3):
+                rhs[p] -= AiB[i, a, p] * g_a[i, a]
+                for q in range(P):
+                    S[p, q] -= N_ae[i, a, p] * AiB[i, a, q]
+    dx_e = _spd_solve_small(S, rhs)
+
+    dx = np.empty(3 * ns + P)
+    for i in range(ns):
+        for a in range(3):
+            acc = 0.0
+            for b in range(3):
+                acc += A_inv[i, a, b] * g_a[i, b]
+            for p in range(P):
+                acc -= AiB[i, a, p] * dx_e[p]
+            dx[3 * i + a] = acc
+    for p in range(P):
+        dx[3 * ns + p] = dx_e[p]
+    return dx
+
+
+@njit(fastmath=True, cache=True)
+def _mse_residual(x, y, bt, sin_dip, cos_dip, grav, bias_col, scale_col):
+    """Residual y − prediction (overwriting the prediction) and its cost."""
+    res = mse_predict_kernel(x, bt, sin_dip, cos_dip, grav, bias_col, scale_col)
+    cost = 0.0
+    for j in range(res.shape[0]):
+        res[j] = y[j] - res[j]
+        cost += res[j] * res[j]
+    return res, cost
+
+
+@njit(fastmath=True, cache=True)
+def mse_lm_kernel(x, y, bt, sin_dip, cos_dip, grav, bias_col, scale_col,
+                  max_iter):
+    """
+    The whole MSE Levenberg-Marquardt loop, as `mse._levenberg_marquardt`.
+
+    Returns the final state, its cost, the index of the last iteration,
+    whether a step/cost tolerance was met and the normal-equation blocks at
+    the final state (for the covariance).
+    Raises np.linalg.LinAlgError when an elimination step is singular.
+    """
+    n = x.shape[0]
+    res, cost = _mse_residual(x, y, bt, sin_dip, cos_dip, grav,
+                              bias_col, scale_col)
+    J_ang, J_err = mse_jacobian_kernel(x, bt, sin_dip, cos_dip, grav,
+                                       bias_col, scale_col)
+    N_aa, N_ae, N_ee, g_a, g_e = _mse_normal(J_ang, J_err, res, 1e-6,
+                                             bias_col, scale_col)
+    lam = 1e-3
+    it = 0
+    while True:
+        dx = _mse_schur_step(N_aa, N_ae, N_ee, g_a, g_e, 1.0 + lam)
+        x_try = np.empty(n)
+        step2 = 0.0
+        for j in range(n):
+            x_try[j] = x[j] + dx[j]
+            step2 += dx[j] * dx[j]
+        res_try, cost_try = _mse_residual(x_try, y, bt, sin_dip, cos_dip, grav,
+                                          bias_col, scale_col)
+        stalled = abs(cost - cost_try) <= 1e-12 * cost
+        if cost_try < cost:
+            x, res, cost = x_try, res_try, cost_try
+            lam /= 10.0
+            J_ang, J_err = mse_jacobian_kernel(x, bt, sin_dip, cos_dip, grav,
+                                               bias_col, scale_col)
+            N_aa, N_ae, N_ee, g_a, g_e = _mse_normal(J_ang, J_err, res, 1e-6,
+                                                     bias_col, scale_col)
+        else:
+            lam *= 10.0
+        converged = math.sqrt(step2) < 1e-6 or stalled
+        if converged or it == max_iter - 1:
+            break
+        it += 1
+    return x, cost, it, converged, N_aa, N_ae, N_ee, g_a, g_e
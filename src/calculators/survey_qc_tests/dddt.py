@@ -7,7 +7,7 @@ Key fix: stretch-term now uses depth * TVD * ΔDST, per Eq. 13.
 """
 import math
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
 
 
@@ -70,8 +70,20 @@ def calculate_dddt_tolerance(ipm_data,
 
     where Dt = measured depth, Dv = TVD.
     """
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
 
+    dref_diff, dsf_diff, dst_diff = ipm.tolerance_table("dddt", _dddt_table)
+
+    # Full 3-σ tolerance
+    tol = 3.0 * math.hypot(
+        dref_diff,
+        depth * dsf_diff,
+        depth * true_vertical_depth * dst_diff      # ← fixed term
+    )
+    return tol
+
+def _dddt_table(ipm):
+    """Pipe/wire RSS sigmas (ΔDREF, ΔDSF, ΔDST) – depend on the IPM only."""
     # 1-σ sigmas from IPM
     dref_p = get_error_term_value(ipm, "DREF-PIPE", "e", "s")
     dref_w = get_error_term_value(ipm, "DREF-WIRE", "e", "s")
@@ -81,14 +93,6 @@ def calculate_dddt_tolerance(ipm_data,
     dst_w  = get_error_term_value(ipm, "DST-WIRE",  "e", "s")
 
     # Combine independent pipe + wire sigmas (root-sum-square)
-    dref_diff = math.hypot(dref_p, dref_w)
-    dsf_diff  = math.hypot(dsf_p,  dsf_w)
-    dst_diff  = math.hypot(dst_p,  dst_w)
-
-    # Full 3-σ tolerance
-    tol = 3.0 * math.sqrt(
-        dref_diff ** 2 +
-        (depth * dsf_diff) ** 2 +
-        (depth * true_vertical_depth * dst_diff) ** 2      # ← fixed term
-    )
-    return tol
\ No newline at end of file
+    return (math.hypot(dref_p, dref_w),
+            math.hypot(dsf_p,  dsf_w),
+            math.hypot(dst_p,  dst_w))
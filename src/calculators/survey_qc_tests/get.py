@@ -17,9 +17,9 @@ QCResult.serialised dict
 """
 import math
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
 from src.utils.tolerance import get_error_term_value
-from src.utils.ipm_cache import get_ipm
+from src.utils.ipm_cache import parse_ipm_file_cached
+from src.calculators.survey_qc_tests._kernels import get_var_kernel
 
 
 # advisory thresholds (deg)
@@ -40,7 +40,7 @@ def perform_get(survey: dict, ipm_data, theoretical_gravity: float, sigma: float
     acc_z = survey["accelerometer_z"] # m/s²
     
     # Calculate gravity magnitude
-    measured_g = math.sqrt(acc_x**2 + acc_y**2 + acc_z**2)  # m/s²
+    measured_g = math.hypot(acc_x, acc_y, acc_z)  # m/s²
     
     # Calculate inclination from accelerometer readings
     calc_inc = math.degrees(math.acos(min(max(acc_z / measured_g, -1.0), 1.0)))
@@ -77,7 +77,9 @@ def perform_get(survey: dict, ipm_data, theoretical_gravity: float, sigma: float
 
 
     g_error = measured_g - g_theoretical
-    tol, debug_ipm_terms = _get_tolerance(ipm_data, inc, tf, g_theoretical, sigma)
+    w = _weighting_functions(inc, tf)
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    tol, debug_ipm_terms = _get_tolerance(ipm, w, inc, g_theoretical, sigma)
     is_ok = abs(g_error) <= tol
 
     # ---------- QCResult ---------------------------------------------------- #
@@ -89,7 +91,7 @@ def perform_get(survey: dict, ipm_data, theoretical_gravity: float, sigma: float
         .add_tolerance("gravity", tol)
         .add_detail("calculated_inclination", calc_inc)
         .add_detail("calculated_toolface", calc_tf)
-        .add_detail("weighting_functions", _weighting_functions(inc, tf))
+        .add_detail("weighting_functions", dict(zip(_WEIGHT_NAMES, w)))
         .add_detail("debug_ipm_terms", debug_ipm_terms))  # Add debug info to response
     
     # Add provided values if they exist
@@ -164,47 +166,65 @@ def perform_get(survey: dict, ipm_data, theoretical_gravity: float, sigma: float
 # --------------------------------------------------------------------------- #
 #  Internals
 # --------------------------------------------------------------------------- #
+_WEIGHT_NAMES = ("wx", "wy", "wz")
+
+
 def _weighting_functions(inclination_deg: float, toolface_deg: float):
+    """(wx, wy, wz); the dict for the result payload is built by the caller."""
     I = math.radians(inclination_deg)
     T = math.radians(toolface_deg)
-    return {
-        "wx": math.sin(I) * math.sin(T),
-        "wy": math.sin(I) * math.cos(T),
-        "wz": math.cos(I),
-    }
+    sinI = math.sin(I)
+    return sinI * math.sin(T), sinI * math.cos(T), math.cos(I)
+
 
+# accelerometer terms in `get_var_kernel` argument order; the XY rows serve
+# both the X and the Y axis
+_GET_TERMS = ("ABXY-TI1S", "ABZ", "ASXY-TI1S", "ASZ")
 
-def _get_error_term_value(ipm, name, vec, tie_on, inc_deg=None,
-                          az_deg=None, gt=None):
-    term = ipm.get_error_term(name, vec, tie_on)
-    if not term:
-        return 0.0
-
-    sigma = term["value"]            # already in m/s²
-    formula = term.get("formula", "").strip()
-    if formula and inc_deg is not None:
-        # minimal sandbox for eval – only the symbols that appear in OWSG formulas
-        env = {
-            "inc": math.radians(inc_deg),
-            "azm": math.radians(az_deg) if az_deg is not None else 0.0,
-            "dip": 0.0,
-            "gtot": gt or 9.81,
-            # math helpers
-            "sin": math.sin, "cos": math.cos, "tan": math.tan,
-            "sqrt": math.sqrt, "abs": abs
-        }
+
+def _get_error_term_values(ipm, names, vec, tie_on, inc_deg=None,
+                           az_deg=None, gt=None):
+    """1-σ values for *names* in one batch lookup, scaled by any IPM formulas."""
+    sigmas = ipm.get_values(names, vec, tie_on)     # already in m/s²
+    if inc_deg is None:
+        return sigmas.tolist()
+
+    env = None
+    for i, code in enumerate(ipm.get_formula_codes(names, vec, tie_on)):
+        if code is None:
+            continue
+        if env is None:
+            # minimal sandbox for eval – only the symbols that appear in OWSG formulas
+            env = {
+                "inc": math.radians(inc_deg),
+                "azm": math.radians(az_deg) if az_deg is not None else 0.0,
+                "dip": 0.0,
+                "gtot": gt or 9.81,
+                # math helpers
+                "sin": math.sin, "cos": math.cos, "tan": math.tan,
+                "sqrt": math.sqrt, "abs": abs
+            }
         try:
-            sigma *= abs(eval(formula, {"__builtins__": None}, env))
+            sigmas[i] *= abs(eval(code, {"__builtins__": None}, env))
         except Exception:
             pass     # fall back to un‑scaled value if the eval fails
-    return sigma
+    return sigmas.tolist()
+
 
+def _get_sigma_table(ipm, vec, tie):
+    """Constant GET sigmas for the (vec, tie) rows, or None if any term has a formula."""
+    if any(code is not None for code in ipm.get_formula_codes(_GET_TERMS, vec, tie)):
+        return None
+    return tuple(ipm.get_values(_GET_TERMS, vec, tie).tolist())
 
-def _get_tolerance(ipm_data, inc_deg: float, tf_deg: float, gt: float, sigma: float = 3.0):
-    """3-σ gravity-error tolerance δG (Eq. 3, Appendix 1 A)."""
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
-    w = _weighting_functions(inc_deg, tf_deg)
 
+def _get_tolerance(ipm, w: tuple, inc_deg: float, gt: float, sigma: float = 3.0):
+    """
+    3-σ gravity-error tolerance δG (Eq. 3, Appendix 1 A).
+
+    *ipm* is an already parsed IPMFile and *w* the station's
+    `_weighting_functions` tuple; both are prepared once by the caller.
+    """
 
     # Debug collection - store found error terms
     debug_terms = {}
@@ -218,52 +238,35 @@ def _get_tolerance(ipm_data, inc_deg: float, tf_deg: float, gt: float, sigma: fl
     vec = "i" if inc_deg > 3.0 else "e"          # inclination‑dependent or constant
     tie = "s"                                     # ‘single‑station’ rows only
 
-    # --- bias terms ---------------------------------------------------
-    abx = _get_error_term_value(ipm, "ABXY-TI1S", vec, tie,
-                                inc_deg=inc_deg, gt=gt)
-    debug_terms[f"ABXY-TI1S ({vec},{tie}) - X axis bias"] = abx
-
-    aby = _get_error_term_value(ipm, "ABXY-TI1S", vec, tie,
-                                inc_deg=inc_deg, gt=gt)
-    debug_terms[f"ABXY-TI1S ({vec},{tie}) - Y axis bias"] = aby
+    # Without formulas the sigmas depend on the IPM row only – build once per IPM
+    sigmas = ipm.tolerance_table(("get", vec, tie),
+                                 lambda f: _get_sigma_table(f, vec, tie))
+    if sigmas is None:
+        sigmas = _get_error_term_values(ipm, _GET_TERMS, vec, tie,
+                                        inc_deg=inc_deg, gt=gt)
+    ab_xy, abz, as_xy, asz = sigmas
 
-    abz = _get_error_term_value(ipm, "ABZ", vec, tie,
-                                inc_deg=inc_deg, gt=gt)
+    # --- bias terms ---------------------------------------------------
+    debug_terms[f"ABXY-TI1S ({vec},{tie}) - X axis bias"] = ab_xy
+    debug_terms[f"ABXY-TI1S ({vec},{tie}) - Y axis bias"] = ab_xy
     debug_terms[f"ABZ ({vec},{tie}) - Z axis bias"] = abz
 
     # --- scale‑factor terms -------------------------------------------
-    asx = _get_error_term_value(ipm, "ASXY-TI1S", vec, tie,
-                                inc_deg=inc_deg, gt=gt)
-    debug_terms[f"ASXY-TI1S ({vec},{tie}) - X axis scale"] = asx
-
-    asy = _get_error_term_value(ipm, "ASXY-TI1S", vec, tie,
-                                inc_deg=inc_deg, gt=gt)
-    debug_terms[f"ASXY-TI1S ({vec},{tie}) - Y axis scale"] = asy
-
-    asz = _get_error_term_value(ipm, "ASZ", vec, tie,
-                                inc_deg=inc_deg, gt=gt)
+    debug_terms[f"ASXY-TI1S ({vec},{tie}) - X axis scale"] = as_xy
+    debug_terms[f"ASXY-TI1S ({vec},{tie}) - Y axis scale"] = as_xy
     debug_terms[f"ASZ ({vec},{tie}) - Z axis scale"] = asz
 
-    wx2 = w["wx"] ** 2
-    wy2 = w["wy"] ** 2
-    wz2 = w["wz"] ** 2
-    var = (
-        (abx * w["wx"])**2 +
-        (aby * w["wy"])**2 +
-        (abz * w["wz"])**2 +
-        (asx * gt * wx2)**2 +
-        (asy * gt * wy2)**2 +
-        (asz * gt * wz2)**2
-    )
+    wx, wy, wz = w
+    var = get_var_kernel(wx, wy, wz, ab_xy, abz, as_xy, asz, gt)
     
     # Calculate weighted contribution of each term for debugging
     debug_terms["weighted_contributions"] = {
-        "abx": (abx * w["wx"])**2,
-        "aby": (aby * w["wy"])**2,
-        "abz": (abz * w["wz"])**2,
-        "asx": (2 * asx * w["wx"] * gt)**2,
-        "asy": (2 * asy * w["wy"] * gt)**2,
-        "asz": (2 * asz * w["wz"] * gt)**2
+        "abx": (ab_xy * wx)**2,
+        "aby": (ab_xy * wy)**2,
+        "abz": (abz * wz)**2,
+        "asx": (2 * as_xy * wx * gt)**2,
+        "asy": (2 * as_xy * wy * gt)**2,
+        "asz": (2 * asz * wz * gt)**2
     }
     
     tolerance = sigma * math.sqrt(var)
@@ -0,0 +1,180 @@
+# src/calculators/survey_qc_tests/get_batch.py
+"""
+Gravity Error Test (GET) – batched over many stations
+-----------------------------------------------------
+Same maths as `perform_get` (Ekseth et al. 2006, Appendix 1 A) but run as one
+NumPy pass over a whole survey instead of one Python call per station.
+
+Inputs
+------
+surveys_soa          – dict of equal-length arrays (or a SurveyBatch):
+                       accelerometer_x/y/z and, optionally, inclination,
+                       toolface and expected_gravity
+ipm_data             – raw IPM text *or* a parsed IPMFile instance
+theoretical_gravity  – local gravity [m/s2], scalar or per-station array.
+                       Falls back to surveys_soa["expected_gravity"].
+
+Output
+------
+dict of per-station NumPy arrays (measured/theoretical gravity, error,
+tolerance, is_valid and the accelerometer-derived angles).  No QCResult is
+built here; callers that need per-station payloads can stream them with
+`QCResult.batch_to_records`.
+"""
+import numpy as np
+
+from src.utils.ipm_cache import parse_ipm_file_cached
+from src.calculators.survey_qc_tests._kernels import (
+    HAVE_NUMBA,
+    get_batch_kernel,
+    get_var_batch_kernel,
+)
+from src.calculators.survey_qc_tests._cuda import get_batch_gpu, use_gpu
+from src.calculators.survey_qc_tests.get import (
+    _GET_TERMS,
+    _get_error_term_values,
+    _get_sigma_table,
+)
+
+
+# --------------------------------------------------------------------------- #
+#  Public API
+# --------------------------------------------------------------------------- #
+def perform_get_batch(surveys_soa: dict, ipm_data, theoretical_gravity=None,
+                      sigma: float = 3.0) -> dict:
+    ax = np.asarray(surveys_soa["accelerometer_x"], dtype=np.float64)
+    ay = np.asarray(surveys_soa["accelerometer_y"], dtype=np.float64)
+    az = np.asarray(surveys_soa["accelerometer_z"], dtype=np.float64)
+
+    g_theoretical = theoretical_gravity
+    if g_theoretical is None:
+        g_theoretical = surveys_soa.get("expected_gravity")
+    if g_theoretical is None:
+        raise ValueError("GET needs 'expected_gravity' in m/s² or explicit argument.")
+    g_theoretical = np.broadcast_to(
+        np.asarray(g_theoretical, dtype=np.float64), ax.shape)
+
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
+
+    # Constant sigmas: the whole test runs as one fused kernel pass
+    if HAVE_NUMBA:
+        tables = [ipm.tolerance_table(("get", vec, "s"),
+                                      lambda f, v=vec: _get_sigma_table(f, v, "s"))
+                  for vec in ("i", "e")]
+        if None not in tables:
+            return _fused(surveys_soa, ax, ay, az, g_theoretical, tables, sigma)
+
+    # Calculate gravity magnitude
+    measured_g = np.sqrt(ax * ax + ay * ay + az * az)
+
+    # Accelerometer-derived angles; toolface is undefined (NaN) near vertical
+    calc_inc = np.degrees(np.arccos(np.clip(az / measured_g, -1.0, 1.0)))
+    calc_tf = np.where((calc_inc >= 10.0) & (calc_inc <= 170.0),
+                       np.degrees(np.arctan2(ay, ax)) % 360.0, np.nan)
+
+    inc = _column(surveys_soa, "inclination", calc_inc)
+    tf = _column(surveys_soa, "toolface", calc_tf)
+
+    g_error = measured_g - g_theoretical
+
+    # Weighting functions, one trig pass for the whole survey
+    I = np.radians(inc)
+    T = np.radians(tf)
+    s_i = np.sin(I)
+    wx = s_i * np.sin(T)
+    wy = s_i * np.cos(T)
+    wz = np.cos(I)
+
+    sig = _sigma_columns(ipm, inc, g_theoretical)
+
+    if HAVE_NUMBA:
+        var = get_var_batch_kernel(wx, wy, wz, sig,
+                                   np.ascontiguousarray(g_theoretical))
+    else:
+        # Same factored terms as `get_var_kernel`
+        ab_xy, abz, as_xy, asz = sig.T
+        gt = g_theoretical
+        wx2, wy2, wz2 = wx * wx, wy * wy, wz * wz
+        var = (
+            ab_xy * ab_xy * (wx2 + wy2) +
+            abz * abz * wz2 +
+            gt * gt * (as_xy * as_xy * (wx2 * wx2 + wy2 * wy2) +
+                       asz * asz * (wz2 * wz2))
+        )
+    # Verdict on squared quantities; the sqrt is only needed for reporting
+    tol2 = (sigma * sigma) * var
+    is_valid = g_error * g_error <= tol2
+
+    return {
+        "measured_gravity": measured_g,
+        "theoretical_gravity": g_theoretical,
+        "gravity_error": g_error,
+        "tolerance": np.sqrt(tol2),
+        "is_valid": is_valid,
+        "calculated_inclination": calc_inc,
+        "calculated_toolface": calc_tf,
+    }
+
+
+# --------------------------------------------------------------------------- #
+#  Internals
+# --------------------------------------------------------------------------- #
+def _fused(soa, ax, ay, az, g_theoretical, tables, sigma) -> dict:
+    """
+    `perform_get_batch` through `get_batch_kernel` (constant sigma rows only),
+    or its CUDA twin for batches large enough to amortise the transfer.
+    """
+    empty = np.empty(0)
+    inc = soa.get("inclination")
+    tf = soa.get("toolface")
+    kernel = get_batch_gpu if use_gpu(ax.shape[0]) else get_batch_kernel
+    meas, calc_inc, calc_tf, err, tol, valid = kernel(
+        ax, ay, az,
+        empty if inc is None else np.asarray(inc, dtype=np.float64),
+        empty if tf is None else np.asarray(tf, dtype=np.float64),
+        inc is not None, tf is not None,
+        np.ascontiguousarray(g_theoretical),
+        np.asarray(tables[0], dtype=np.float64),
+        np.asarray(tables[1], dtype=np.float64),
+        float(sigma))
+    return {
+        "measured_gravity": meas,
+        "theoretical_gravity": g_theoretical,
+        "gravity_error": err,
+        "tolerance": tol,
+        "is_valid": valid,
+        "calculated_inclination": calc_inc,
+        "calculated_toolface": calc_tf,
+    }
+
+
+def _column(soa: dict, key: str, default: np.ndarray) -> np.ndarray:
+    """*key* as a float64 array, or *default* when the survey does not carry it."""
+    if soa.get(key) is None:
+        return default
+    return np.asarray(soa[key], dtype=np.float64)
+
+
+def _sigma_columns(ipm, inc: np.ndarray, gt: np.ndarray) -> np.ndarray:
+    """
+    (N, 4) array of GET 1-σ values in `_GET_TERMS` order.
+
+    Stations pick the "i,s" or "e,s" rows exactly as `_get_tolerance` does.
+    Constant rows are broadcast from the IPM's memoised table; rows carrying
+    a formula are evaluated station by station.
+    """
+    out = np.empty((inc.shape[0], len(_GET_TERMS)))
+    inc_rows = inc > 3.0
+    for vec, mask in (("i", inc_rows), ("e", ~inc_rows)):
+        if not mask.any():
+            continue
+        table = ipm.tolerance_table(("get", vec, "s"),
+                                    lambda f, v=vec: _get_sigma_table(f, v, "s"))
+        if table is not None:
+            out[mask] = table
+            continue
+        for k in np.flatnonzero(mask):
+            out[k] = _get_error_term_values(ipm, _GET_TERMS, vec, "s",
+                                            inc_deg=float(inc[k]),
+                                            gt=float(gt[k]))
+    return out
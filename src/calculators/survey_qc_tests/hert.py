@@ -12,10 +12,11 @@ The warning pattern mirrors GET and TFDT so front-end code can treat it
 uniformly.
 """
 import math
+from functools import lru_cache
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
-from src.utils.tolerance import get_error_term_value
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
+from src.calculators.survey_qc_tests._kernels import hert_var_kernel
 
 EARTH_RATE_DPH = 15.041067  # deg / hr  (sidereal)
 
@@ -55,106 +56,117 @@ def perform_hert(survey: dict, ipm_data, sigma: float = 3.0):
     measured_h_rate = math.hypot(gyro_x, gyro_y)
 
     # 2. theoretical Ω cos φ
-    theoretical_h_rate = EARTH_RATE_DPH * math.cos(math.radians(lat))
+    theoretical_h_rate = _horizontal_earth_rate(lat)
 
     # 3. error
     h_rate_error = measured_h_rate - theoretical_h_rate
 
-    # 4. tolerance
-    tol = _hert_tolerance(ipm_data, inc, az, lat, sigma)
+    # 4. tolerance – angles converted and weights computed once per station
+    w = _hert_weights(math.radians(inc), math.radians(az))
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    tol = _hert_tolerance(ipm, w, inc, lat, sigma)
 
     # 5. verdict
     is_valid = abs(h_rate_error) <= tol
 
-    # 6. QCResult
-    res = QCResult("HERT")
-    res.set_validity(is_valid)
-    res.add_measurement("horizontal_rate", measured_h_rate)
-    res.add_theoretical("horizontal_rate", theoretical_h_rate)
-    res.add_error("horizontal_rate", h_rate_error)
-    res.add_tolerance("horizontal_rate", tol)
-    res.add_detail("inclination", inc)
-    res.add_detail("azimuth", az)
-    res.add_detail("toolface", tf)
-    res.add_detail("weighting_functions", _hert_weights(inc, az))
+    details = {
+        "inclination": inc,
+        "azimuth": az,
+        "toolface": tf,
+        "weighting_functions": w[:2],
+    }
 
     # ----- geometry advisories --------------------------------------------- #
     if inc < INC_WARN_LOW or inc > INC_WARN_HIGH:
         _add_warning(
-            res,
+            details,
             "weak_geometry",
             f"HERT discriminatory power reduced at inclination {inc:.1f} °."
         )
 
     if _is_cardinal_azimuth(az):
         _add_warning(
-            res,
+            details,
             "cardinal_azimuth",
             f"Azimuth {az:.1f} ° is near a cardinal direction; "
             "weights become ill-conditioned (Ekseth 2006)."
         )
 
-    return res.to_dict()
+    # 6. QCResult payload, built in one step
+    return QCResult.from_fields(
+        "HERT", is_valid,
+        {"horizontal_rate": measured_h_rate},
+        {"horizontal_rate": theoretical_h_rate},
+        {"horizontal_rate": h_rate_error},
+        {"horizontal_rate": tol},
+        details,
+    )
 
 
 # --------------------------------------------------------------------------- #
 #  Core math
 # --------------------------------------------------------------------------- #
-def _hert_weights(inclination_deg: float, azimuth_deg: float):
+@lru_cache(maxsize=1024)
+def _horizontal_earth_rate(latitude_deg: float) -> float:
+    """Ω cos φ (deg / hr); latitude is usually constant over a whole survey."""
+    return EARTH_RATE_DPH * math.cos(math.radians(latitude_deg))
+
+
+def _hert_weights(inc_rad: float, az_rad: float):
     """
     Weighting functions ∂ΔΩ_h/∂error_term  (Ekseth App. 1 C)
+
+    Returns (w_gbx, w_gby, w_m, w_q) from a single sin/cos of each angle.
     """
-    I = math.radians(inclination_deg)
-    A = math.radians(azimuth_deg)
+    sinI, cosI = math.sin(inc_rad), math.cos(inc_rad)
+    sinA, cosA = math.sin(az_rad), math.cos(az_rad)
 
-    sinI = math.sin(I) or 1e-6  # never 0 here (guarded earlier)
-    w_gbx = math.cos(I) * math.cos(A) + math.sin(A) / sinI
-    w_gby = math.cos(I) * math.sin(A) - math.cos(A) / sinI
-    return w_gbx, w_gby
+    # branchless clamp away from 0 (vertical wells are rejected earlier)
+    sinI = math.copysign(max(abs(sinI), 1e-6), sinI)
+    w_gbx = cosI * cosA + sinA / sinI
+    w_gby = cosI * sinA - cosA / sinI
+    w_m = -cosI * cosA
+    w_q =  cosI * sinA
+    return w_gbx, w_gby, w_m, w_q
 
 
-def _hert_tolerance(ipm_data,
+def _hert_tolerance(ipm,
+                   w: tuple,
                    inclination_deg: float,
-                   azimuth_deg: float,
                    latitude_deg: float,
                    sigma: float = 3.0) -> float:
-    """3 σ tolerance δΩ_h  (deg / hr)."""
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    """
+    3 σ tolerance δΩ_h  (deg / hr).
+
+    *ipm* is an already parsed IPMFile and *w* the (w_gbx, w_gby, w_m, w_q)
+    tuple from `_hert_weights`; both are prepared once by the caller.
+    """
 
     # If inclination is greater than 3 degrees, use the inclination vector, otherwise use the depth vector
     vec = "i" if inclination_deg > 3.0 else "e"
     
-    # 1 σ sigmas
-    gbx = get_error_term_value(ipm, "GBX", vec, "s")
-    gby = get_error_term_value(ipm, "GBY", vec, "s")
-    gsx = get_error_term_value(ipm, "GSX", vec, "s")
-    gsy = get_error_term_value(ipm, "GSY", vec, "s")
-    m   = get_error_term_value(ipm, "M",   vec, "s")
-    q   = get_error_term_value(ipm, "Q",   vec, "s")
-    gr  = get_error_term_value(ipm, "GR",  vec, "s")
-
-    w_gbx, w_gby = _hert_weights(inclination_deg, azimuth_deg)
-    omega_cos_phi = EARTH_RATE_DPH * math.cos(math.radians(latitude_deg))
-    sf_x = 2.0 * w_gbx * omega_cos_phi
-    sf_y = 2.0 * w_gby * omega_cos_phi
-
-    I = math.radians(inclination_deg)
-    A = math.radians(azimuth_deg)
-    w_m = -math.cos(I) * math.cos(A)
-    w_q =  math.cos(I) * math.sin(A)
-
-    var = (
-        (gbx * w_gbx) ** 2 +
-        (gby * w_gby) ** 2 +
-        (gsx * sf_x)  ** 2 +
-        (gsy * sf_y)  ** 2 +
-        (m   * w_m)   ** 2 +
-        (q   * w_q)   ** 2 +
-        gr ** 2
-    )
+    # 1 σ sigmas – station-independent, so looked up once per IPM
+    gbx, gby, gsx, gsy, m, q, gr = ipm.tolerance_table(
+        ("hert", vec), lambda f: _hert_sigma_table(f, vec))
+
+    w_gbx, w_gby, w_m, w_q = w
+    omega_cos_phi = _horizontal_earth_rate(latitude_deg)
+
+    var = hert_var_kernel(gbx, gby, gsx, gsy, m, q, gr,
+                          w_gbx, w_gby, w_m, w_q, omega_cos_phi)
     return sigma * math.sqrt(var)  # Changed from 3.0 to configurable sigma
 
 
+# gyro terms in `hert_var_kernel` argument order
+_HERT_TERMS = ("GBX", "GBY", "GSX", "GSY", "M", "Q", "GR")
+
+
+def _hert_sigma_table(ipm, vec):
+    """1 σ values for `_HERT_TERMS` on the (vec, 's') rows of *ipm*."""
+    # No station geometry is passed, so any formula evaluates to a constant
+    return tuple(get_error_term_value(ipm, name, vec, "s") for name in _HERT_TERMS)
+
+
 # --------------------------------------------------------------------------- #
 #  Helpers
 # --------------------------------------------------------------------------- #
@@ -164,10 +176,8 @@ def _is_cardinal_azimuth(azimuth_deg: float) -> bool:
     return any(abs(az - c) < AZI_CARDINAL_TOL for c in (0, 90, 180, 270))
 
 
-def _add_warning(res: QCResult, code: str, msg: str):
-    warn = res.details.get("warnings", [])
-    warn.append({"code": code, "message": msg})
-    res.add_detail("warnings", warn)
+def _add_warning(details: dict, code: str, msg: str):
+    details.setdefault("warnings", []).append({"code": code, "message": msg})
 
 
 def _fail(msg):
@@ -0,0 +1,112 @@
+# src/calculators/survey_qc_tests/hert_batch.py
+"""
+Horizontal Earth-Rate Test (HERT) – batched over many stations
+--------------------------------------------------------------
+Same maths as `perform_hert` (Ekseth et al. 2006, Appendix 1 C) but run as one
+NumPy pass over a whole survey instead of one Python call per station.
+
+Inputs
+------
+surveys_soa  – dict of equal-length arrays (or a SurveyBatch): gyro_x,
+               gyro_y, inclination, azimuth and latitude
+ipm_data     – raw IPM text *or* a parsed IPMFile instance
+
+Output
+------
+dict of per-station NumPy arrays.  Stations outside 3–177 ° inclination,
+which `perform_hert` rejects outright, come back with a NaN tolerance and
+is_valid False.
+"""
+import numpy as np
+
+from src.utils.ipm_cache import parse_ipm_file_cached
+from src.calculators.survey_qc_tests._kernels import (
+    HAVE_NUMBA,
+    hert_var_batch_kernel,
+)
+from src.calculators.survey_qc_tests.hert import (
+    EARTH_RATE_DPH,
+    _hert_sigma_table,
+)
+
+
+# --------------------------------------------------------------------------- #
+#  Public API
+# --------------------------------------------------------------------------- #
+def perform_hert_batch(surveys_soa: dict, ipm_data, sigma: float = 3.0) -> dict:
+    gyro_x = np.asarray(surveys_soa["gyro_x"], dtype=np.float64)
+    gyro_y = np.asarray(surveys_soa["gyro_y"], dtype=np.float64)
+    inc = np.asarray(surveys_soa["inclination"], dtype=np.float64)   # deg
+    az = np.asarray(surveys_soa["azimuth"], dtype=np.float64)        # deg
+    lat = np.asarray(surveys_soa["latitude"], dtype=np.float64)      # deg
+
+    # HERT is undefined close to vertical (see perform_hert)
+    defined = (inc >= 3.0) & (inc <= 177.0)
+
+    # 1. measured horizontal rate |Ω_h|
+    measured_h_rate = np.hypot(gyro_x, gyro_y)
+
+    # 2. theoretical Ω cos φ
+    omega_cos_phi = EARTH_RATE_DPH * np.cos(np.radians(lat))
+
+    # 3. error
+    h_rate_error = measured_h_rate - omega_cos_phi
+
+    # 4. weights – one trig pass for the whole survey
+    I = np.radians(inc)
+    A = np.radians(az)
+    sI, cI = np.sin(I), np.cos(I)
+    sA, cA = np.sin(A), np.cos(A)
+    sI = np.copysign(np.maximum(np.abs(sI), 1e-6), sI)   # as `_hert_weights`
+    w_gbx = cI * cA + sA / sI
+    w_gby = cI * sA - cA / sI
+    w_m = -cI * cA
+    w_q = cI * sA
+
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    sig = _sigma_columns(ipm, inc)
+
+    if HAVE_NUMBA:
+        var = hert_var_batch_kernel(
+            w_gbx, w_gby, w_m, w_q,
+            np.ascontiguousarray(np.broadcast_to(omega_cos_phi, inc.shape)), sig)
+    else:
+        # Same terms as `hert_var_kernel`
+        gbx, gby, gsx, gsy, m, q, gr = sig.T
+        sf_x = 2.0 * w_gbx * omega_cos_phi
+        sf_y = 2.0 * w_gby * omega_cos_phi
+        var = (
+            (gbx * w_gbx) ** 2 +
+            (gby * w_gby) ** 2 +
+            (gsx * sf_x) ** 2 +
+            (gsy * sf_y) ** 2 +
+            (m * w_m) ** 2 +
+            (q * w_q) ** 2 +
+            gr ** 2
+        )
+    # Verdict on squared quantities; the sqrt is only needed for reporting
+    tol2 = np.where(defined, (sigma * sigma) * var, np.nan)
+    is_valid = defined & (h_rate_error * h_rate_error <= tol2)
+
+    return {
+        "measured_horizontal_rate": measured_h_rate,
+        "theoretical_horizontal_rate": omega_cos_phi,
+        "horizontal_rate_error": h_rate_error,
+        "tolerance": np.sqrt(tol2),
+        "is_valid": is_valid,
+        "w_gbx": w_gbx,
+        "w_gby": w_gby,
+    }
+
+
+# --------------------------------------------------------------------------- #
+#  Internals
+# --------------------------------------------------------------------------- #
+def _sigma_columns(ipm, inc: np.ndarray) -> np.ndarray:
+    """(N, 7) array of HERT 1 σ values, picking the "i" or "e" rows per station."""
+    rows = {
+        vec: np.asarray(ipm.tolerance_table(("hert", vec),
+                                            lambda f, v=vec: _hert_sigma_table(f, v)))
+        for vec in ("i", "e")
+    }
+    return np.where((inc > 3.0)[:, None], rows["i"], rows["e"])
@@ -2,9 +2,14 @@
 import math
 import numpy as np
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
-from src.utils.linalg import safe_inverse
+from src.utils.linalg import safe_spd_inverse
+from src.utils.survey_arrays import station_count, station_dicts, survey_columns
+from src.calculators.survey_qc_tests._kernels import HAVE_NUMBA, msat_design_kernel
+
+_MSAT_FIELDS = ('accelerometer_x', 'accelerometer_y', 'accelerometer_z',
+                'inclination', 'toolface', 'expected_gravity')
 
 
 def perform_msat(surveys, ipm_data, sigma: float = 3.0):
@@ -18,104 +23,100 @@ def perform_msat(surveys, ipm_data, sigma: float = 3.0):
         
     Parameters:
     -----------
-    surveys : list
-        List of dictionaries containing survey data
+    surveys : list or dict
+        List of dictionaries containing survey data, or the same fields as
+        per-station columns: a dict of arrays, a SurveyBatch or a structured
+        ndarray (no per-station dicts are built then)
     ipm_data : str or object
         IPM file content as string or parsed object
     sigma : float, optional
         Sigma multiplier for tolerances, default is 3.0
     """
     # ---------------- geometry sanity -------------------------------- #
-    if len(surveys) < 10:
+    # counted before any field is read, so a short survey fails on its size
+    if station_count(surveys) < 10:
         return _fail("At least 10 survey stations are required for MSAT")
 
-    incs  = np.radians([s['inclination'] for s in surveys])
-    tfs   = np.radians([s['toolface']    for s in surveys])
-    inc_variation = incs.max() - incs.min()
+    # one pass over the stations → contiguous float64 column per field
+    ax, ay, az, inc_deg, tf_deg, Gt = survey_columns(surveys, _MSAT_FIELDS)
+
+    inc_variation = math.radians(inc_deg.max() - inc_deg.min())
 
-    quadrant_hits = [0, 0, 0, 0]
-    for deg in (s['toolface'] % 360 for s in surveys):
-        quadrant_hits[int(deg // 90)] += 1
-    if sum(1 for q in quadrant_hits if q) < 3:
+    # a tiny negative toolface wraps to exactly 360.0 – fold that back into Q1
+    quadrant = (np.mod(tf_deg, 360.0) // 90).astype(np.intp) % 4
+    quadrant_hits = np.bincount(quadrant, minlength=4).tolist()
+    if np.count_nonzero(quadrant_hits) < 3:
         return _fail("Toolfaces must cover at least three quadrants")
 
     use_reduced = inc_variation < math.radians(45)
+    names = ['ABX*', 'ABY*', 'ABZ*'] if use_reduced else \
+            ['ABX', 'ABY', 'ABZ*', 'ASX', 'ASY']
+
+    # ---------------- IPM 1 σ terms ---------------------------------- #
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
+
+    σ_abx, σ_abz, σ_asx, σ_asz = ipm.tolerance_table(("msat",), _msat_sigma_table)
+    σ_aby = σ_abx  # Same term for both X and Y
+    σ_asy = σ_asx
 
-    # ---------------- build design matrix & ΔG vector ---------------- #
-    wx = np.sin(incs) * np.sin(tfs)
-    wy = np.sin(incs) * np.cos(tfs)
-    wz = np.cos(incs)
-
-    Gt = np.asarray([s['expected_gravity'] for s in surveys])  # m/s²
-    meas_g = np.sqrt([s['accelerometer_x']**2 +
-                      s['accelerometer_y']**2 +
-                      s['accelerometer_z']**2 for s in surveys])
-    dG = meas_g - Gt                                           # ΔG vector
-
-    if use_reduced:  # 3-parameter model
-        A = np.column_stack((wx, wy, wz))
-        names = ['ABX*', 'ABY*', 'ABZ*']
-    else:            # 5-parameter model
-        A = np.column_stack((wx,
-                             wy,
-                             wz,
-                             2 * wx * Gt,      # 2·wx·G  (ASX)
-                             2 * wy * Gt))     # 2·wy·G  (ASY)
-        names = ['ABX', 'ABY', 'ABZ*', 'ASX', 'ASY']
+    # ---------------- build design matrix, ΔG & residual variance ---- #
+    if HAVE_NUMBA:
+        A, dG, res_var = msat_design_kernel(
+            ax, ay, az, inc_deg, tf_deg, Gt, not use_reduced,
+            np.array((σ_abx, σ_abz, σ_asx, σ_asz)))
+    else:
+        incs = np.radians(inc_deg)
+        tfs = np.radians(tf_deg)
+        s_i = np.sin(incs)
+        wx = s_i * np.sin(tfs)
+        wy = s_i * np.cos(tfs)
+        wz = np.cos(incs)
+
+        meas_g = np.sqrt(ax*ax + ay*ay + az*az)               # m/s²
+        dG = meas_g - Gt                                       # ΔG vector
+
+        # residual-by-station variance (GET formula incl. factor 2)
+        tx, ty, tz = σ_abx*wx, σ_aby*wy, σ_abz*wz
+        res_var = tx*tx + ty*ty + tz*tz
+
+        # design matrix: columns written in place, 3 (reduced) or 5 (full)
+        A = np.empty((ax.shape[0], len(names)))
+        A[:, 0] = wx
+        A[:, 1] = wy
+        A[:, 2] = wz
+        if not use_reduced:  # 5-parameter model
+            wxG, wyG, wzG = wx * Gt, wy * Gt, wz * Gt
+            A[:, 3] = 2 * wxG     # 2·wx·G  (ASX)
+            A[:, 4] = 2 * wyG     # 2·wy·G  (ASY)
+            tx, ty, tz = 2*σ_asx*wxG, 2*σ_asy*wyG, σ_asz*wzG
+            res_var += tx*tx + ty*ty + tz*tz
 
     # ---------------- least-squares solution ------------------------- #
     X, *_ = np.linalg.lstsq(A, dG, rcond=None)          # parameter vector
     residuals = dG - A @ X
 
-    # correlation matrix
+    # correlation matrix – the normal matrix is only inverted (Cholesky)
+    # for this, X itself comes from the QR/SVD solve above.  With a constant
+    # expected_gravity the ASX/ASY columns are 2G × the ABX/ABY columns, so
+    # AᵀA is singular by construction and only the ridge in
+    # `safe_spd_inverse` makes the cofactor exist (R⁻¹R⁻ᵀ from a QR does not).
     try:
-        cofactor = safe_inverse(A.T @ A)
+        cofactor = safe_spd_inverse(A.T @ A)
     except np.linalg.LinAlgError as exc:
         return _fail(str(exc))
 
-    corr = cofactor / np.sqrt(np.outer(np.diag(cofactor), np.diag(cofactor)))
+    d = np.sqrt(np.diag(cofactor))
+    corr = cofactor / np.outer(d, d)
     max_corr = np.abs(corr - np.eye(corr.shape[0])).max()
 
-    # ---------------- IPM tolerances (3 σ) --------------------------- #
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
-    
-    # Try to get accelerometer terms with fallbacks for different naming conventions
-    # For X/Y bias, check both with and without Z-axis correction
-    σ_abx = get_error_term_value(ipm, 'ABXY-TI1S', 'e', 's') or \
-            get_error_term_value(ipm, 'ABIXY-TI1S', 'e', 's') or \
-            get_error_term_value(ipm, 'ABIX', 'e', 's')
-    
-    σ_aby = σ_abx  # Same term for both X and Y
-    
-    # For Z bias, check both with and without Z-axis correction
-    σ_abz = get_error_term_value(ipm, 'ABZ', 'e', 's') or \
-            get_error_term_value(ipm, 'ABIZ', 'e', 's')
-    
-    # For X/Y scale factor, check both with and without Z-axis correction
-    σ_asx = get_error_term_value(ipm, 'ASXY-TI1S', 'e', 's') or \
-            get_error_term_value(ipm, 'ASIXY-TI1S', 'e', 's') or \
-            get_error_term_value(ipm, 'ASIX', 'e', 's')
-    
-    σ_asy = σ_asx  # Same term for both X and Y
-    
-    # For Z scale factor, check both with and without Z-axis correction
-    σ_asz = get_error_term_value(ipm, 'ASZ', 'e', 's') or \
-            get_error_term_value(ipm, 'ASIZ', 'e', 's')
-    
-    # Apply sigma multiplier to tolerances
+    # ---------------- tolerances (sigma × 1 σ) ----------------------- #
     param_tol = (sigma*σ_abx, sigma*σ_aby, sigma*σ_abz) if use_reduced else \
                 (sigma*σ_abx, sigma*σ_aby, sigma*σ_abz, sigma*σ_asx, sigma*σ_asy)
-    params_valid = all(abs(x) <= t for x, t in zip(X, param_tol))
+    params_valid = bool(np.all(np.abs(X) <= param_tol))
 
-    # residual-by-station tolerance (GET formula incl. factor 2)
-    if use_reduced:
-        res_tol = sigma * np.sqrt((σ_abx*wx)**2 + (σ_aby*wy)**2 + (σ_abz*wz)**2)
-    else:
-        res_tol = sigma * np.sqrt(
-            (σ_abx*wx)**2 + (σ_aby*wy)**2 + (σ_abz*wz)**2 +
-            (2*σ_asx*wx*Gt)**2 + (2*σ_asy*wy*Gt)**2 + (σ_asz*wz*Gt)**2)
-    
-    residuals_valid = np.all(np.abs(residuals) <= res_tol)
+    res_tol = sigma * np.sqrt(res_var)
+
+    residuals_valid = bool(np.all(np.abs(residuals) <= res_tol))
 
     overall = params_valid and residuals_valid and max_corr <= 0.4
 
@@ -154,8 +155,9 @@ def perform_msat_with_corrections(surveys, ipm_data, sigma: float = 3.0):
     
     Parameters:
     -----------
-    surveys : list
-        List of dictionaries containing survey data with accelerometer values in m/s²
+    surveys : list or dict
+        List of dictionaries containing survey data with accelerometer values
+        in m/s², or per-station arrays as accepted by `perform_msat`
     ipm_data : str or object
         IPM file content as string or parsed object
     sigma : float, optional
@@ -196,59 +198,58 @@ def perform_msat_with_corrections(surveys, ipm_data, sigma: float = 3.0):
         asx = measurements.get('ASX', 0.0)
         asy = measurements.get('ASY', 0.0)
     
-    # Apply corrections to each survey
-    for i, survey in enumerate(surveys):
-        # Extract original measurements
-        acc_x = survey['accelerometer_x']
-        acc_y = survey['accelerometer_y']
-        acc_z = survey['accelerometer_z']
-        
-        # Apply bias corrections
-        acc_x_corr = acc_x - abx
-        acc_y_corr = acc_y - aby
-        acc_z_corr = acc_z - abz
-        
-        # Apply scale factor corrections if using full model
-        if model_type == 'full':
-            # Scale factors affect gravity-proportional terms
-            # Scale factor correction: original / (1 + scale_error)
-            acc_x_corr = acc_x_corr / (1 + asx)
-            acc_y_corr = acc_y_corr / (1 + asy)
-            # Z scale not corrected as it's lumped with bias in ABZ*
-        
-        # Calculate corrected gravity magnitude
-        corrected_g = math.sqrt(acc_x_corr**2 + acc_y_corr**2 + acc_z_corr**2)
-        
-        # Recalculate inclination from corrected accelerometer readings
-        calc_inc_corr = math.degrees(math.acos(min(max(acc_z_corr / corrected_g, -1.0), 1.0)))
-        
-        # Recalculate toolface from corrected readings (if inclination is sufficient)
-        if calc_inc_corr >= 10.0 and calc_inc_corr <= 170.0:
-            calc_tf_corr = math.degrees(math.atan2(acc_y_corr, acc_x_corr))
-            # Convert to 0-360 range
-            calc_tf_corr = (calc_tf_corr + 360) % 360
-        else:
-            # Toolface is undefined in near-vertical wells
-            calc_tf_corr = None
-        
-        # Create corrected survey record
+    # Apply corrections to all stations at once
+    acc_x, acc_y, acc_z = survey_columns(surveys, _MSAT_FIELDS[:3])
+    stations = station_dicts(surveys, _MSAT_FIELDS)
+
+    # Apply bias corrections
+    acc_x_corr = acc_x - abx
+    acc_y_corr = acc_y - aby
+    acc_z_corr = acc_z - abz
+
+    # Apply scale factor corrections if using full model
+    if model_type == 'full':
+        # Scale factors affect gravity-proportional terms
+        # Scale factor correction: original / (1 + scale_error)
+        acc_x_corr = acc_x_corr / (1 + asx)
+        acc_y_corr = acc_y_corr / (1 + asy)
+        # Z scale not corrected as it's lumped with bias in ABZ*
+
+    # Original and corrected gravity magnitudes
+    g = np.sqrt(acc_x*acc_x + acc_y*acc_y + acc_z*acc_z)
+    corrected_g = np.sqrt(acc_x_corr*acc_x_corr + acc_y_corr*acc_y_corr +
+                          acc_z_corr*acc_z_corr)
+
+    # Recalculate inclination from corrected accelerometer readings
+    calc_inc_corr = np.degrees(np.arccos(np.clip(acc_z_corr / corrected_g, -1.0, 1.0)))
+
+    # Recalculate toolface (0-360) from corrected readings; it is undefined
+    # (None) in near-vertical wells
+    calc_tf_corr = (np.degrees(np.arctan2(acc_y_corr, acc_x_corr)) + 360) % 360
+    tf_defined = ((calc_inc_corr >= 10.0) & (calc_inc_corr <= 170.0)).tolist()
+
+    # Create corrected survey records
+    for i, (survey, g_i, x, y, z, g_c, inc_c, tf_c, tf_ok) in enumerate(zip(
+            stations, g.tolist(), acc_x_corr.tolist(), acc_y_corr.tolist(),
+            acc_z_corr.tolist(), corrected_g.tolist(), calc_inc_corr.tolist(),
+            calc_tf_corr.tolist(), tf_defined)):
         corrected_surveys.append({
             'original_index': i,
             'original': {
-                'accelerometer_x': acc_x,
-                'accelerometer_y': acc_y,
-                'accelerometer_z': acc_z,
-                'gravity': math.sqrt(acc_x**2 + acc_y**2 + acc_z**2),
+                'accelerometer_x': survey['accelerometer_x'],
+                'accelerometer_y': survey['accelerometer_y'],
+                'accelerometer_z': survey['accelerometer_z'],
+                'gravity': g_i,
                 'inclination': survey.get('inclination'),
                 'toolface': survey.get('toolface')
             },
             'corrected': {
-                'accelerometer_x': acc_x_corr,
-                'accelerometer_y': acc_y_corr,
-                'accelerometer_z': acc_z_corr,
-                'gravity': corrected_g,
-                'inclination': calc_inc_corr,
-                'toolface': calc_tf_corr
+                'accelerometer_x': x,
+                'accelerometer_y': y,
+                'accelerometer_z': z,
+                'gravity': g_c,
+                'inclination': inc_c,
+                'toolface': tf_c if tf_ok else None
             }
         })
     
@@ -270,5 +271,27 @@ def perform_msat_with_corrections(surveys, ipm_data, sigma: float = 3.0):
 # ------------------------------------------------------------------- #
 # helpers
 # ------------------------------------------------------------------- #
+# 1 σ lookup order per MSAT term: with Z-axis correction first, then without
+_MSAT_TERMS = (
+    ("ABXY-TI1S", "ABIXY-TI1S", "ABIX"),   # X/Y bias
+    ("ABZ", "ABIZ"),                       # Z bias
+    ("ASXY-TI1S", "ASIXY-TI1S", "ASIX"),   # X/Y scale factor
+    ("ASZ", "ASIZ"),                       # Z scale factor
+)
+
+
+def _msat_sigma_table(ipm):
+    """(σ_abxy, σ_abz, σ_asxy, σ_asz) from the 'e,s' rows, first non-zero variant."""
+    table = []
+    for variants in _MSAT_TERMS:
+        value = 0.0
+        for name in variants:
+            value = get_error_term_value(ipm, name, 'e', 's')
+            if value:
+                break
+        table.append(value)
+    return tuple(table)
+
+
 def _fail(msg):
     return {'is_valid': False, 'error': msg}
\ No newline at end of file
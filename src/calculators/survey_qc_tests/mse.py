@@ -1,9 +1,25 @@
 # services/qc/mse.py
-import math, numpy as np
+import numpy as np
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
-from src.utils.linalg import safe_inverse
+from src.utils.linalg import safe_spd_inverse, spd_solve
+from src.utils.survey_arrays import stack_fields
+from src.calculators.survey_qc_tests._kernels import (
+    HAVE_NUMBA,
+    mse_jacobian_kernel,
+    mse_lm_kernel,
+    mse_predict_kernel,
+)
+
+_MSE_FIELDS = ('inclination', 'azimuth', 'toolface',
+               'mag_x', 'mag_y', 'mag_z',
+               'accelerometer_x', 'accelerometer_y', 'accelerometer_z',
+               'expected_gravity')
+
+# error terms acting on each sensor output, in Bx,By,Bz,Gx,Gy,Gz order
+_BIAS_TERMS  = ('MBX','MBY','MBZ','ABX','ABY','ABZ')
+_SCALE_TERMS = ('MSX','MSY','MSZ','ASX','ASY','ASZ')
 
 
 # --------------------------------------------------------------------------- #
@@ -17,15 +33,15 @@ def perform_mse(surveys, ipm_data):
     if len(surveys) < 10:
         return _fail("At least 10 survey stations are required for MSE")
 
-    incs = [s['inclination'] for s in surveys]
-    azis = [s['azimuth']     for s in surveys]
-    tfs  = [s['toolface']    for s in surveys]
-    inc_var = max(incs) - min(incs)
-    azi_var = max(abs((a1-a2+180)%360-180) for a1 in azis for a2 in azis)
+    # every numeric per-station field in one pass: (ns, 10) block
+    cols = stack_fields(surveys, _MSE_FIELDS)
+    incs, azis, tfs = cols[:,0], cols[:,1], cols[:,2]
+    inc_var = float(incs.max() - incs.min())
+    azi_var = _azimuth_spread(azis)
 
-    quad_hits = [0,0,0,0]
-    for d in tfs: quad_hits[int(d//90)%4]+=1
-    q_cnt = sum(1 for q in quad_hits if q)
+    quadrant = (np.mod(tfs, 360.0) // 90).astype(np.intp) % 4
+    quad_hits = np.bincount(quadrant, minlength=4).tolist()
+    q_cnt = np.count_nonzero(quad_hits)
 
     geom = ("excellent" if inc_var>45 and azi_var>45 and q_cnt>=4 else
             "good"      if inc_var>30 and azi_var>30 and q_cnt>=3 else
@@ -47,46 +63,44 @@ def perform_mse(surveys, ipm_data):
     ns, np_ = len(surveys), len(pnames)
 
     # measurement vector (Bx,By,Bz,Gx,Gy,Gz) per station
-    y=np.zeros(ns*6)
-    for i,s in enumerate(surveys):
-        y[i*6+0:i*6+3]=[s['mag_x'],s['mag_y'],s['mag_z']]
-        y[i*6+3:i*6+6]=[s['accelerometer_x'],s['accelerometer_y'],s['accelerometer_z']]
+    y=cols[:,3:9].ravel()
 
     # parameter vector: 3*ns station angles + np_ error terms
     x=np.zeros(ns*3+np_)
-    for i,s in enumerate(surveys):
-        x[i*3:i*3+3]=np.radians([s['inclination'],s['azimuth'],s['toolface']])
-
-    geo=[s['expected_geomagnetic_field'] for s in surveys]
-    grav=[s['expected_gravity']          for s in surveys]
-
-    ipm=parse_ipm_file(ipm_data) if isinstance(ipm_data,str) else ipm_data
-
-    # ---- Gauss-Newton -------------------------------------------------------
-    for it in range(20):
-        ypred=_predict(x,geo,grav,ns,pnames)
-        res=y-ypred
-        J  =_jacobian(x,geo,grav,ns,pnames)
-        try:
-            dx=np.linalg.solve(J.T@J+1e-6*np.eye(J.shape[1]),J.T@res)
-        except np.linalg.LinAlgError:
-            return _fail("Normal matrix singular – geometry too weak")
-        x+=dx
-        if np.linalg.norm(dx)<1e-6: break
-    converged=it<19
-
-    JTJ=J.T@J+1e-6*np.eye(J.shape[1])
-    
-    # robust inverse
+    x[:ns*3]=np.radians(cols[:,0:3]).ravel()
+
+    # reference field per station – fixed over the iterations, so its trig
+    # is taken once here rather than on every prediction
+    Bt, dip_deg = stack_fields([s['expected_geomagnetic_field'] for s in surveys],
+                               ('total_field', 'dip')).T
+    dip=np.radians(dip_deg)
+    field=(np.ascontiguousarray(Bt),np.sin(dip),np.cos(dip))
+    grav=np.ascontiguousarray(cols[:,9])
+
+    ipm=parse_ipm_file_cached(ipm_data) if isinstance(ipm_data,str) else ipm_data
+
+    # ---- Levenberg-Marquardt ------------------------------------------------
+    cols=_term_columns(ns,pnames)
     try:
-        cov = safe_inverse(JTJ, ridge=1e-6)     
+        x,cost,it,converged,N=_levenberg_marquardt(x,y,field,grav,cols)
+    except np.linalg.LinAlgError:
+        return _fail("Normal matrix singular – geometry too weak")
+
+    # error-term covariance = inverse of the Schur complement of the angle
+    # block in the normal matrix at the final estimate (Cholesky), scaled by
+    # the a-posteriori variance factor σ̂² = r·r/(M−n).  N and cost already
+    # belong to the accepted LM state, so nothing is re-predicted here.
+    dof=y.size-x.size
+    s2=cost/dof
+    try:
+        err_cov = s2*safe_spd_inverse(_schur(N,1.0)[2], ridge=1e-6)
     except np.linalg.LinAlgError as exc:
         return _fail(str(exc))                   # abort with a clear message
-        
-    err_cov=cov[-np_:,-np_:]
+
     err_std=np.sqrt(np.diag(err_cov))
-    corr=err_cov/np.sqrt(np.outer(err_std,err_std))
-    max_corr=np.nanmax(np.abs(corr-np.eye(np_)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr=err_cov/np.outer(err_std,err_std)
+    max_corr=float(np.nanmax(np.abs(corr-np.eye(np_))))
 
     # tolerances
     tol={n:3*get_error_term_value(ipm,n,'e','s') for n in pnames}
@@ -122,13 +136,14 @@ def perform_mse(surveys, ipm_data):
             'max_correlation': float(max_corr),
             'converged': bool(converged),
             'iterations': int(it+1),
-            'final_residual_norm': float(np.linalg.norm(res))
+            'final_residual_norm': float(cost ** 0.5),
+            'variance_factor': float(s2)
         },
         'details': {
             'geometry_quality': geom,
             'inclination_variation': float(inc_var),
             'azimuth_variation': float(azi_var),
-            'quadrant_distribution': [int(q) for q in quad_hits]
+            'quadrant_distribution': quad_hits
         }
     }
     
@@ -146,39 +161,217 @@ def perform_mse(surveys, ipm_data):
 # --------------------------------------------------------------------------- #
 #  helpers
 # --------------------------------------------------------------------------- #
-def _predict(x, geo, grav, ns, pnames):
-    """Return 6·ns vector of predicted sensor outputs."""
-    y=np.zeros(ns*6); err={n:x[ns*3+i] for i,n in enumerate(pnames)}
-    g_get=lambda n:err.get(n,0.0)
-    for i in range(ns):
-        inc,az,tf=x[i*3:i*3+3]
-        Bt=geo[i]['total_field']; dip=math.radians(geo[i]['dip']); g=grav[i]
-
-        bx_ideal = Bt*(math.sin(inc)*math.cos(az)*math.cos(dip)-math.sin(dip)*math.sin(az))
-        by_ideal = Bt*(math.sin(inc)*math.sin(az)*math.cos(dip)+math.sin(dip)*math.cos(az))
-        bz_ideal = Bt*(math.cos(inc)*math.cos(dip)+math.sin(inc)*math.sin(dip))
-        gx_ideal = math.sin(inc)*math.sin(tf)
-        gy_ideal = math.sin(inc)*math.cos(tf)
-        gz_ideal = math.cos(inc)
-
-        bx=bx_ideal*(1+g_get('MSX')*Bt*2)+g_get('MBX')
-        by=by_ideal*(1+g_get('MSY')*Bt*2)+g_get('MBY')
-        bz=bz_ideal*(1+g_get('MSZ')*Bt*2)+g_get('MBZ')
-        gx=gx_ideal*(1+g_get('ASX')*g*2)+g_get('ABX')
-        gy=gy_ideal*(1+g_get('ASY')*g*2)+g_get('ABY')
-        gz=gz_ideal*(1+g_get('ASZ')*g*2)+g_get('ABZ')
-
-        y[i*6:i*6+6]=[bx,by,bz,gx,gy,gz]
-    return y
-
-def _jacobian(x,geo,grav,ns,pnames):
-    """Finite-difference Jacobian."""
-    h=1e-6; y0=_predict(x,geo,grav,ns,pnames)
-    J=np.zeros((ns*6,len(x)))
-    for j in range(len(x)):
-        xp=x.copy(); xp[j]+=h
-        J[:,j]=(_predict(xp,geo,grav,ns,pnames)-y0)/h
-    return J
+def _azimuth_spread(azis):
+    """
+    Largest circular distance between any two azimuths [deg, ≤180].
+
+    For each azimuth the farthest other one is the nearest neighbour of its
+    antipode, so a sort plus one `searchsorted` replaces the all-pairs scan.
+    """
+    a=np.sort(np.mod(np.asarray(azis,dtype=float),360.0))
+    k=np.searchsorted(a,(a+180.0)%360.0)
+    far=a[np.stack((k%a.size,(k-1)%a.size))]
+    return float(np.max(np.abs((a-far+180)%360-180)))
+
+def _term_columns(ns, pnames):
+    """
+    Index in x of each output's bias / scale term, -1 if not estimated.
+
+    Resolved once per run so the forward model and Jacobian index *x*
+    directly instead of looking terms up by name on every call.
+    """
+    col={n:ns*3+i for i,n in enumerate(pnames)}
+    return (np.array([col.get(n,-1) for n in _BIAS_TERMS],dtype=np.intp),
+            np.array([col.get(n,-1) for n in _SCALE_TERMS],dtype=np.intp))
+
+def _ideal(x, field, ns):
+    """
+    Angle trig and error-free sensor outputs for state *x*.
+
+    Returns the (sin inc, cos inc, sin az, cos az, sin tf, cos tf) arrays and
+    the (ns, 6) block of ideal Bx,By,Bz,Gx,Gy,Gz; shared by `_predict` and
+    `_jacobian` so both see the same geometry.
+    """
+    Bt, sin_dip, cos_dip = field
+    inc, az, tf = x[:ns*3].reshape(ns, 3).T
+    trig = (np.sin(inc), np.cos(inc), np.sin(az), np.cos(az),
+            np.sin(tf), np.cos(tf))
+    sin_inc, cos_inc, sin_az, cos_az, sin_tf, cos_tf = trig
+
+    ideal=np.empty((ns, 6))
+    ideal[:,0]=Bt*(sin_inc*cos_az*cos_dip-sin_dip*sin_az)
+    ideal[:,1]=Bt*(sin_inc*sin_az*cos_dip+sin_dip*cos_az)
+    ideal[:,2]=Bt*(cos_inc*cos_dip+sin_inc*sin_dip)
+    ideal[:,3]=sin_inc*sin_tf
+    ideal[:,4]=sin_inc*cos_tf
+    ideal[:,5]=cos_inc
+    return trig, ideal
+
+def _reference(field, grav):
+    """(ns, 6) magnitude each output's scale factor acts on: Bt or gravity."""
+    Bt = field[0]
+    return np.column_stack((Bt, Bt, Bt, grav, grav, grav))
+
+def _scales(x, ref, cols):
+    """(ns, 6) scale-factor multipliers 1 + S·ref·2 and the (6,) biases."""
+    bias_col, scale_col = cols
+    bias=np.where(bias_col>=0, x[bias_col], 0.0)
+    return 1+np.where(scale_col>=0, x[scale_col], 0.0)*ref*2, bias
+
+def _predict(x, field, grav, cols):
+    """
+    Return 6·ns vector of predicted sensor outputs.
+
+    *field* is the per-station (Bt, sin dip, cos dip) arrays and *grav* the
+    per-station gravity, *cols* the `_term_columns` pair; all stations are
+    evaluated in one NumPy pass, or in `mse_predict_kernel` when Numba is
+    available.
+    """
+    if HAVE_NUMBA:
+        return mse_predict_kernel(x, *field, grav, *cols)
+    _, ideal = _ideal(x, field, grav.shape[0])
+    scale, bias = _scales(x, _reference(field, grav), cols)
+    return (ideal*scale+bias).ravel()
+
+def _jacobian(x,field,grav,cols):
+    """
+    Analytic Jacobian of `_predict`.
+
+    A station's six outputs depend only on its own three angles, so only
+    the non-zero blocks are returned: the (ns, 6, 3) angle derivatives and
+    the (ns, 6, P) error-term derivatives (1 under a bias term, ideal·ref·2
+    under a scale-factor term).  Built by `mse_jacobian_kernel` when Numba
+    is available.
+    """
+    if HAVE_NUMBA:
+        return mse_jacobian_kernel(x, *field, grav, *cols)
+    ns = grav.shape[0]
+    Bt, sin_dip, cos_dip = field
+    (sin_inc, cos_inc, sin_az, cos_az, sin_tf, cos_tf), ideal = _ideal(x, field, ns)
+    ref = _reference(field, grav)
+    scale, _ = _scales(x, ref, cols)
+
+    # d(output)/d(inc, az, tf) per station; magnetometers do not see tf,
+    # accelerometers do not see az
+    D=np.zeros((ns, 6, 3))
+    D[:,0,0]=Bt*cos_inc*cos_az*cos_dip
+    D[:,0,1]=Bt*(-sin_inc*sin_az*cos_dip-sin_dip*cos_az)
+    D[:,1,0]=Bt*cos_inc*sin_az*cos_dip
+    D[:,1,1]=Bt*(sin_inc*cos_az*cos_dip-sin_dip*sin_az)
+    D[:,2,0]=Bt*(cos_inc*sin_dip-sin_inc*cos_dip)
+    D[:,3,0]=cos_inc*sin_tf
+    D[:,3,2]=sin_inc*cos_tf
+    D[:,4,0]=cos_inc*cos_tf
+    D[:,4,2]=-sin_inc*sin_tf
+    D[:,5,0]=-sin_inc
+    D*=scale[:,:,None]
+
+    E=np.zeros((ns, 6, x.shape[0]-ns*3))
+    for k,(b,c) in enumerate(zip(*cols)):
+        if b>=0:
+            E[:,k,b-ns*3]=1.0
+        if c>=0:
+            E[:,k,c-ns*3]=ideal[:,k]*ref[:,k]*2
+    return D, E
+
+def _levenberg_marquardt(x, y, field, grav, cols, max_iter=20):
+    """
+    Fit *x* to the measurements *y*.
+
+    Returns the final state, its squared residual norm, the index of the
+    last iteration, whether the step or cost tolerance was met (rather than
+    *max_iter* running out) and the normal-equation blocks there (see
+    `_normal_equations`).  With Numba the whole loop runs in
+    `mse_lm_kernel`, which owns its buffers; otherwise in NumPy below.
+
+    Raises np.linalg.LinAlgError if an elimination step is singular.
+    """
+    if HAVE_NUMBA:
+        x, cost, it, converged, *N = mse_lm_kernel(x, y, *field, grav, *cols, max_iter)
+        return x, cost, it, converged, tuple(N)
+
+    # The normal equations are only rebuilt after an accepted step; a
+    # rejected step raises the damping and re-solves from the cached blocks.
+    # scipy.optimize.least_squares (TRF) reaches the same minimum but is
+    # 4-60x slower here: its exact solver factors the dense J and its LSMR
+    # solver iterates where the block elimination below is direct.
+    res=y-_predict(x,field,grav,cols)
+    cost=res@res
+    N=_normal_equations(*_jacobian(x,field,grav,cols),res)
+    lam=1e-3
+    converged=False
+    for it in range(max_iter):
+        # Normal equations on purpose: the diag(JᵀJ) damping and the ridge
+        # keep them well conditioned (steps match a QR solve of the
+        # augmented J to ~1e-11), a QR of the tall J is 6-10x slower at
+        # 20-200 stations, and it could not reuse the cache on a rejection
+        dx=_schur_step(N,1+lam)
+        x_try=x+dx
+        res_try=y-_predict(x_try,field,grav,cols)
+        cost_try=res_try@res_try
+        # no measurable change in cost: the remaining steps are rounding noise
+        stalled=abs(cost-cost_try)<=1e-12*cost
+        if cost_try<cost:
+            x,res,cost=x_try,res_try,cost_try
+            lam/=10
+            N=_normal_equations(*_jacobian(x,field,grav,cols),res)
+        else:
+            lam*=10
+        if (dx @ dx) ** 0.5 < 1e-6 or stalled:
+            converged=True
+            break
+    return x, cost, it, converged, N
+
+def _normal_equations(J_ang, J_err, res, ridge=1e-6):
+    """
+    JᵀJ + ridge·I and Jᵀr for the block Jacobian from `_jacobian`.
+
+    JᵀJ is bordered block-diagonal: (ns, 3, 3) angle blocks, the (ns, 3, P)
+    angle/error coupling and the dense (P, P) error block.  Returns those
+    three and the matching (ns, 3) / (P,) pieces of Jᵀr.
+    """
+    ns, P = J_err.shape[0], J_err.shape[2]
+    JaT = J_ang.transpose(0, 2, 1)
+    E = J_err.reshape(ns*6, P)
+    N_aa = JaT@J_ang+ridge*np.eye(3)
+    N_ae = JaT@J_err
+    N_ee = E.T@E+ridge*np.eye(P)
+    g_a = (JaT@res.reshape(ns, 6, 1))[:,:,0]
+    g_e = E.T@res
+    return N_aa, N_ae, N_ee, g_a, g_e
+
+def _schur(N, damp):
+    """
+    Per-station inverses of the angle blocks (diagonals scaled by *damp*),
+    N_aa⁻¹·N_ae and the P×P Schur complement S = N_ee − N_aeᵀ·N_aa⁻¹·N_ae.
+
+    Raises np.linalg.LinAlgError if an angle block is singular.
+    """
+    N_aa, N_ae, N_ee, _, _ = N
+    ns, P = N_ae.shape[0], N_ae.shape[2]
+    A = N_aa.copy()
+    A[:, (0,1,2), (0,1,2)] *= damp
+    A_inv = np.linalg.inv(A)
+    AiB = A_inv@N_ae
+    S = N_ee.copy()
+    S.flat[::P+1] *= damp
+    S -= N_ae.reshape(ns*3, P).T@AiB.reshape(ns*3, P)
+    return A_inv, AiB, S
+
+def _schur_step(N, damp):
+    """
+    Solve the damped normal equations for the full step [angles, errors].
+
+    The angle block is 3×3 block-diagonal, so it is eliminated station by
+    station and only the small P×P Schur complement is solved densely –
+    O(ns·P²) instead of O((3·ns + P)³).
+    """
+    _, _, _, g_a, g_e = N
+    A_inv, AiB, S = _schur(N, damp)
+    ns, P = AiB.shape[0], AiB.shape[2]
+    dx_e = spd_solve(S, g_e-AiB.reshape(ns*3, P).T@g_a.ravel())
+    dx_a = (A_inv@g_a[:,:,None])[:,:,0]-AiB@dx_e
+    return np.concatenate((dx_a.ravel(), dx_e))
 
 def _fail(msg,extra=None):
     res={'is_valid':False,'error':str(msg)}
@@ -2,13 +2,19 @@
 import math
 import numpy as np
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
-from src.utils.linalg import safe_inverse
+from src.utils.linalg import safe_spd_inverse, spd_solve
+from src.utils.survey_arrays import station_count, survey_columns
 
 
 EARTH_RATE_DPH = 15.041067  # deg/hr  (sidereal)
 
+_MSGT_FIELDS = ('gyro_x', 'gyro_y', 'inclination', 'azimuth', 'toolface', 'latitude')
+
+# gyro terms in the order `perform_msgt` unpacks them
+_MSGT_TERMS = ('GBX', 'GBY', 'M', 'Q', 'GSX', 'GSY', 'GR')
+
 # --------------------------------------------------------------------------- #
 #  top-level entry
 # --------------------------------------------------------------------------- #
@@ -20,95 +26,93 @@ def perform_msgt(surveys, ipm_data):
         inclination, azimuth     [deg]
         toolface                 [deg]     (used only for geometry checks)
         latitude                 [deg]
+
+    *surveys* may also be given column-wise (dict of arrays, SurveyBatch or
+    structured ndarray), as for `perform_msat`.
     """
-    if len(surveys) < 10:
+    n = station_count(surveys)
+    if n < 10:
         return _fail("At least 10 survey stations are required for MSGT")
+    gyro_x, gyro_y, inc_deg, azm_deg, tf_deg, lat_deg = survey_columns(surveys, _MSGT_FIELDS)
 
-    incs = np.radians([s['inclination'] for s in surveys])
-    azms = np.radians([s['azimuth']     for s in surveys])
-    tfs  = np.radians([s['toolface']    for s in surveys])
+    incs = np.radians(inc_deg)
+    azms = np.radians(azm_deg)
+    tfs  = np.radians(tf_deg)
 
     # ---------- geometry checks ------------------------------------------------
     inc_var = incs.max() - incs.min()
 
-    quad_hits = [0, 0, 0, 0]
-    for deg in (s['toolface'] % 360 for s in surveys):
-        quad_hits[int(deg // 90)] += 1
-    if inc_var < math.radians(30) or sum(1 for q in quad_hits if q) < 3:
+    quadrant = (np.mod(tf_deg, 360.0) // 90).astype(np.intp) % 4
+    quad_hits = np.bincount(quadrant, minlength=4).tolist()
+    if inc_var < math.radians(30) or np.count_nonzero(quad_hits) < 3:
         return _fail("Need ≥30° inclination spread and toolfaces in ≥3 quadrants")
 
-    ew_hits = sum(1 for deg in (s['azimuth'] % 360 for s in surveys)
-                  if 60 <= deg <= 120 or 240 <= deg <= 300)
-    if ew_hits / len(surveys) > 0.5:
+    azm_mod = np.mod(azm_deg, 360.0)
+    ew_hits = int(np.count_nonzero(((azm_mod >= 60) & (azm_mod <= 120)) |
+                                   ((azm_mod >= 240) & (azm_mod <= 300))))
+    if ew_hits / n > 0.5:
         return _fail("More than 50 % of stations lie in east–west sector; geometry too weak")
 
-    # ---------- horizontal-rate errors & design matrix ------------------------
-    omega_h_err = []
-    A_rows = []
-
-    for s, I, A in zip(surveys, incs, azms):
-        # measured Ω_h
-        Ωh_meas = math.hypot(s['gyro_x'], s['gyro_y'])
+    # ---------- horizontal-rate errors ---------------------------------------
+    Ωh_meas = np.hypot(gyro_x, gyro_y)                       # measured Ω_h
+    Ωh_theo = EARTH_RATE_DPH * np.cos(np.radians(lat_deg))   # theoretical Ω cos φ
+    dΩ = Ωh_meas - Ωh_theo
 
-        # theoretical Ω cos φ
-        Ωh_theo = EARTH_RATE_DPH * math.cos(math.radians(s['latitude']))
-        omega_h_err.append(Ωh_meas - Ωh_theo)
+    # ---------- weighting functions (App. 1 C) – once for all stations -------
+    sin_i, cos_i = np.sin(incs), np.cos(incs)
+    sin_a, cos_a = np.sin(azms), np.cos(azms)
+    w_gbx = cos_i * cos_a + sin_a / sin_i
+    w_gby = cos_i * sin_a - cos_a / sin_i
+    w_m   = -cos_i * cos_a
+    w_q   =  cos_i * sin_a
 
-        # weighting functions (App. 1 C)
-        w_gbx = math.cos(I) * math.cos(A) + math.sin(A) / math.sin(I)
-        w_gby = math.cos(I) * math.sin(A) - math.cos(A) / math.sin(I)
-        w_m   = -math.cos(I) * math.cos(A)
-        w_q   =  math.cos(I) * math.sin(A)
-        A_rows.append([w_gbx, w_gby, w_m, w_q])
-
-    A = np.asarray(A_rows)
-    dΩ = np.asarray(omega_h_err)
+    # ---------- design matrix -------------------------------------------------
+    A = np.column_stack((w_gbx, w_gby, w_m, w_q))
 
     # ---------- least-squares solution ---------------------------------------
-    X, *_ = np.linalg.lstsq(A, dΩ, rcond=None)          # GBX*, GBY*, M, Q
-
+    # as in MSMT: lstsq's singular values give cond(A) for free, and only a
+    # numerically singular A falls back to a ridge solve (Cholesky)
+    ATA = A.T @ A
+    try:
+        X, _, _, sv = np.linalg.lstsq(A, dΩ, rcond=None)  # GBX*, GBY*, M, Q
+        if sv[-1] == 0.0 or sv[0] / sv[-1] > 1e15:
+            alpha = 1e-8 * np.trace(ATA) / A.shape[1]
+            X = spd_solve(ATA + alpha * np.eye(A.shape[1]), A.T @ dΩ)
+    except np.linalg.LinAlgError:
+        return _fail("Linear algebra error in least squares solution")
     residuals = dΩ - A @ X
-    
-    # correlation matrix
+
+    # cofactor for the correlations only – Cholesky of the ridge-regularised
+    # normal matrix.  X must not come from it: the ridge would bias the
+    # estimates, and a constant azimuth makes the 1/sin i parts of w_gbx and
+    # w_gby proportional, so AᵀA is (near) singular.
     try:
-        cofactor = safe_inverse(A.T @ A)
+        cofactor = safe_spd_inverse(ATA)
     except np.linalg.LinAlgError as exc:
-        return _fail(str(exc))    
-    
-    corr = cofactor / np.sqrt(np.outer(np.diag(cofactor), np.diag(cofactor)))
+        return _fail(str(exc))
+
+    # correlation matrix
+    d = np.sqrt(np.diag(cofactor))
+    corr = cofactor / np.outer(d, d)
     max_corr = np.abs(corr - np.eye(4)).max()
 
     # ---------- tolerance build ----------------------------------------------
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
-    σ_gbx = get_error_term_value(ipm, 'GBX', 'e', 's')
-    σ_gby = get_error_term_value(ipm, 'GBY', 'e', 's')
-    σ_m   = get_error_term_value(ipm, 'M',   'e', 's')
-    σ_q   = get_error_term_value(ipm, 'Q',   'e', 's')
-    σ_gsx = get_error_term_value(ipm, 'GSX', 'e', 's')
-    σ_gsy = get_error_term_value(ipm, 'GSY', 'e', 's')
-    σ_gr  = get_error_term_value(ipm, 'GR',  'e', 's')
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    σ_gbx, σ_gby, σ_m, σ_q, σ_gsx, σ_gsy, σ_gr = ipm.tolerance_table(
+        ("msgt",), _msgt_sigma_table)
 
     param_tol = (3*σ_gbx, 3*σ_gby, 3*σ_m, 3*σ_q)
     params_valid = all(abs(x) <= t for x, t in zip(X, param_tol))
 
-    res_tol = []
-    for I, A, s in zip(incs, azms, surveys):
-        w_gbx = math.cos(I) * math.cos(A) + math.sin(A) / math.sin(I)
-        w_gby = math.cos(I) * math.sin(A) - math.cos(A) / math.sin(I)
-        w_m   = -math.cos(I) * math.cos(A)
-        w_q   =  math.cos(I) * math.sin(A)
-
-        Ωcosφ = EARTH_RATE_DPH * math.cos(math.radians(s['latitude']))
-        tol = 3 * math.sqrt(
-            (σ_gbx * w_gbx)**2 +
-            (σ_gby * w_gby)**2 +
-            (σ_m   * w_m  )**2 +
-            (σ_q   * w_q  )**2 +
-            (2 * σ_gsx * w_gbx * Ωcosφ)**2 +
-            (2 * σ_gsy * w_gby * Ωcosφ)**2 +
-            σ_gr**2
-        )
-        res_tol.append(tol)
+    res_tol = 3 * np.sqrt(
+        (σ_gbx * w_gbx)**2 +
+        (σ_gby * w_gby)**2 +
+        (σ_m   * w_m  )**2 +
+        (σ_q   * w_q  )**2 +
+        (2 * σ_gsx * w_gbx * Ωh_theo)**2 +
+        (2 * σ_gsy * w_gby * Ωh_theo)**2 +
+        σ_gr**2
+    )
     residuals_valid = np.all(np.abs(residuals) <= res_tol)
 
     overall = params_valid and residuals_valid and max_corr <= 0.4
@@ -122,12 +126,12 @@ def perform_msgt(surveys, ipm_data):
         r.add_tolerance(name, tol)
 
     r.add_detail("residuals", residuals.tolist())
-    r.add_detail("residual_tolerances", res_tol)
+    r.add_detail("residual_tolerances", res_tol.tolist())
     r.add_detail("correlation_matrix", corr.tolist())
     r.add_detail("max_nondiagonal_correlation", float(max_corr))
     r.add_detail("inclination_variation_deg", math.degrees(inc_var))
     r.add_detail("quadrant_distribution", quad_hits)
-    r.add_detail("east_west_ratio", ew_hits / len(surveys))
+    r.add_detail("east_west_ratio", ew_hits / n)
 
     if not overall:
         if max_corr > 0.4:
@@ -143,5 +147,10 @@ def perform_msgt(surveys, ipm_data):
 # --------------------------------------------------------------------------- #
 # helpers
 # --------------------------------------------------------------------------- #
+def _msgt_sigma_table(ipm):
+    """1 σ values for `_MSGT_TERMS` on the ('e', 's') rows of *ipm*."""
+    return tuple(get_error_term_value(ipm, name, 'e', 's') for name in _MSGT_TERMS)
+
+
 def _fail(msg):
     return {'is_valid': False, 'error': msg}
\ No newline at end of file
@@ -4,9 +4,13 @@ from typing import List, Dict, Any, Tuple, Optional, Union
 import numpy as np
 
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
-from src.utils.linalg import safe_inverse
+from src.utils.linalg import safe_spd_inverse, spd_solve
+from src.utils.survey_arrays import stack_fields
+
+_ACC_FIELDS = ("accelerometer_x", "accelerometer_y", "accelerometer_z")
+_MAG_FIELDS = ("mag_x", "mag_y", "mag_z")
 
 ###############################################################################
 # Helper utilities
@@ -15,7 +19,7 @@ from src.utils.linalg import safe_inverse
 def _norm(vec: Tuple[float, float, float]) -> float:
     """Return Euclidean norm of a 3-vector."""
     x, y, z = vec
-    return math.sqrt(x * x + y * y + z * z)
+    return math.hypot(x, y, z)
 
 
 def _unit(vec: Tuple[float, float, float]) -> Tuple[float, float, float]:
@@ -66,6 +70,24 @@ def _reduce_condition_number(A: np.ndarray, threshold: float = 1e15) -> np.ndarr
             return np.linalg.pinv(A)
 
 
+def _first_bad_station(surveys: List[Dict[str, Any]], exc: Exception) -> Tuple[Any, Exception]:
+    """
+    Index and error of the first station whose sensor or reference-field
+    values are missing or not finite floats; ``("?", exc)`` if none is.
+    """
+    for i, sv in enumerate(surveys):
+        try:
+            geo = sv["expected_geomagnetic_field"]
+            values = [(f, sv[f]) for f in _ACC_FIELDS + _MAG_FIELDS]
+            values += [(f, geo[f]) for f in ("total_field", "dip")]
+            for f, v in values:
+                if not math.isfinite(float(v)):
+                    raise ValueError(f"non-finite {f}")
+        except Exception as e:
+            return i, e
+    return "?", exc
+
+
 def _safe_asin(x: float) -> float:
     """Safely compute arcsin, clamping input to [-1, 1] to avoid math domain errors."""
     return math.asin(max(-1.0, min(1.0, x)))
@@ -153,7 +175,7 @@ def perform_msmt(surveys: List[Dict[str, Any]], ipm_data: Any, *, sigma: float =
         return {"is_valid": False, "error": "At least 10 survey stations are required for MSMT"}
 
     # Parse IPM parameters
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
     
     try:
         σ_mbx = _require_sigma(ipm, "MBX")
@@ -170,109 +192,77 @@ def perform_msmt(surveys: List[Dict[str, Any]], ipm_data: Any, *, sigma: float =
     # Parameter tolerances
     param_tol = sigma * np.array([σ_mbx, σ_mby, σ_mbz, σ_msx, σ_msy, σ_msz])
 
-    # Build combined error vector (magnetic field and dip errors)
     n = len(surveys)
-    ΔBΘ = np.zeros(2 * n)  # Combined field and dip errors
-    Bt_list = []
     
-    # Pre-calculate measured field magnitudes and unit vectors
-    B_meas_list = []
-    unit_vectors = []
-    grav_vectors = []
+    # Pre-calculate measured field magnitudes and unit vectors in one
+    # vectorised pass over (N, 3) accelerometer / magnetometer blocks
+    try:
+        acc = stack_fields(surveys, _ACC_FIELDS)
+        mag = stack_fields(surveys, _MAG_FIELDS)
+        # reference field read once per station, shared by every pass below
+        geo = stack_fields([sv["expected_geomagnetic_field"] for sv in surveys],
+                           ("total_field", "dip"))
+        # np.fromiter reads None as NaN where float() would fail
+        if not (np.isfinite(acc).all() and np.isfinite(mag).all() and np.isfinite(geo).all()):
+            raise ValueError("non-finite sensor or reference-field value")
+        Bt_arr, dip_arr = geo.T
+    except Exception as e:
+        # rare path: walk the stations once more to name the malformed one
+        i, e = _first_bad_station(surveys, e)
+        return {"is_valid": False, "error": f"Error preprocessing station {i}: {str(e)}"}
+
+    # Validate accelerometer magnitude
+    g_mag = np.sqrt(np.einsum("ij,ij->i", acc, acc))
+    bad = np.flatnonzero((g_mag < 7.0) | (g_mag > 12.0))
+    if bad.size:
+        i = int(bad[0])
+        return {"is_valid": False, "error": f"Accelerometer magnitude {g_mag[i]:.2f} m/s² at station {i} outside 7-12 m/s²"}
+
+    B_meas = np.sqrt(np.einsum("ij,ij->i", mag, mag))
+    if np.any(B_meas == 0.0):
+        i = int(np.flatnonzero(B_meas == 0.0)[0])
+        return {"is_valid": False, "error": f"Error preprocessing station {i}: zero magnetic field magnitude"}
+
+    n_hat = mag / B_meas[:, None]                      # unit mag vectors
+    k_hat = acc / g_mag[:, None]                       # unit gravity vectors
+
+    # Measured dip from the unit-vector dot product, clamped to [-1,1] to
+    # avoid domain errors
+    dot_product = np.clip(np.einsum("ij,ij->i", n_hat, k_hat), -1.0, 1.0)
+    dip_meas = np.degrees(np.arcsin(dot_product))
     
-    # Calculate reference data first to prevent potential calculation inconsistencies
-    for i, sv in enumerate(surveys):
-        try:
-            # Validate accelerometer magnitude
-            ax, ay, az = sv["accelerometer_x"], sv["accelerometer_y"], sv["accelerometer_z"]
-            g_mag = math.sqrt(ax*ax + ay*ay + az*az)
-            if not (7.0 <= g_mag <= 12.0):
-                return {"is_valid": False, "error": f"Accelerometer magnitude {g_mag:.2f} m/s² at station {i} outside 7-12 m/s²"}
-            
-            # Calculate unit gravity vector
-            grav_vectors.append((ax/g_mag, ay/g_mag, az/g_mag))
-            
-            # Get mag field measurements
-            bx, by, bz = sv["mag_x"], sv["mag_y"], sv["mag_z"]
-            B_meas = math.sqrt(bx*bx + by*by + bz*bz)
-            B_meas_list.append(B_meas)
-            
-            # Calculate unit mag vector
-            unit_vectors.append((bx/B_meas, by/B_meas, bz/B_meas))
-            
-            # Get expected field
-            Bt = sv["expected_geomagnetic_field"]["total_field"]
-            Bt_list.append(Bt)
-        except Exception as e:
-            return {"is_valid": False, "error": f"Error preprocessing station {i}: {str(e)}"}
+    # Combined error vector: field error at even, Bt-scaled dip error at
+    # odd indices (scaled to match field magnitude)
+    ΔBΘ = np.empty(2 * n)
+    ΔBΘ[0::2] = B_meas - Bt_arr
+    ΔBΘ[1::2] = Bt_arr * (dip_meas - dip_arr)
     
-    # Build design matrix according to Appendix 1F
-    A = np.zeros((2*n, 6))
+    # Build design matrix according to Appendix 1F – field rows at even,
+    # dip rows at odd indices, each filled a column block at a time
+    A = np.empty((2*n, 6))
     
-    for i, sv in enumerate(surveys):
-        # Get expected values 
-        Bt = Bt_list[i]
-        dip_t = sv["expected_geomagnetic_field"]["dip"]
-        
-        # Get measured values
-        B_meas = B_meas_list[i]
-        bx, by, bz = sv["mag_x"], sv["mag_y"], sv["mag_z"]
-        
-        # Unit vectors
-        nx, ny, nz = unit_vectors[i]
-        kx, ky, kz = grav_vectors[i]
-        
-        # Calculate measured dip (dot product of unit vectors)
-        dot_product = nx*kx + ny*ky + nz*kz
-        # Safely clamp to [-1,1] range to avoid domain errors
-        dot_product = max(-1.0, min(1.0, dot_product))
-        dip_meas = math.degrees(math.asin(dot_product))
-        
-        # Errors to solve for
-        field_err = B_meas - Bt
-        dip_err = dip_meas - dip_t
-        
-        # Store in combined error vector
-        ΔBΘ[2*i] = field_err
-        ΔBΘ[2*i+1] = Bt * dip_err  # Scale to match field magnitude
-        
-        # Calculate design matrix coefficients as per Appendix 1E/1F
-        # Field row - exactly as per Appendix 1E
-        A[2*i, 0] = bx/B_meas  # nx = bx/B
-        A[2*i, 1] = by/B_meas  # ny = by/B
-        A[2*i, 2] = bz/B_meas  # nz = bz/B
-        A[2*i, 3] = bx*bx/B_meas  # 2*MSX term simplified
-        A[2*i, 4] = by*by/B_meas  # 2*MSY term simplified
-        A[2*i, 5] = bz*bz/B_meas  # 2*MSZ term simplified
-        
-        # Dip row - calculate wx, wy, wz as per Appendix 1E
-        dip_rad = math.radians(dip_t)
-        cosd = max(math.cos(dip_rad), 1e-4)  # Safety factor for vertical fields
-        sind = math.sin(dip_rad)
-        
-        # Calculate terms as per paper
-        wx = (kx * cosd - nx * sind) / cosd
-        wy = (ky * cosd - ny * sind) / cosd
-        wz = (kz * cosd - nz * sind) / cosd
-        
-        A[2*i+1, 0] = wx
-        A[2*i+1, 1] = wy
-        A[2*i+1, 2] = wz
-        A[2*i+1, 3] = wx * Bt  # Bt factor to normalize scale with field row
-        A[2*i+1, 4] = wy * Bt
-        A[2*i+1, 5] = wz * Bt
+    # Field row - exactly as per Appendix 1E
+    A[0::2, :3] = n_hat                         # nx = bx/B
+    A[0::2, 3:] = mag * mag / B_meas[:, None]   # 2*MSX term simplified
+    
+    # Dip row - wx, wy, wz as per Appendix 1E
+    dip_rad = np.radians(dip_arr)
+    cosd = np.maximum(np.cos(dip_rad), 1e-4)[:, None]  # Safety factor for vertical fields
+    sind = np.sin(dip_rad)[:, None]
+    w = (k_hat * cosd - n_hat * sind) / cosd
     
-    # Check condition number
+    A[1::2, :3] = w
+    A[1::2, 3:] = w * Bt_arr[:, None]  # Bt factor to normalize scale with field row
+    
+    # Solve; the singular values lstsq computes anyway give cond(A), so the
+    # ill-conditioning check needs no SVD of its own
+    ATA = A.T @ A
     try:
-        cond_num = np.linalg.cond(A)
-        if cond_num > 1e15:
+        X, _, _, sv = np.linalg.lstsq(A, ΔBΘ, rcond=None)
+        if sv[-1] == 0.0 or sv[0] / sv[-1] > 1e15:
             # Apply regularization to improve condition number
-            alpha = 1e-8 * np.trace(A.T @ A) / A.shape[1]
-            ATA_reg = A.T @ A + alpha * np.eye(A.shape[1])
-            X = np.linalg.solve(ATA_reg, A.T @ ΔBΘ)
-        else:
-            # Solve system normally
-            X = np.linalg.lstsq(A, ΔBΘ, rcond=None)[0]
+            alpha = 1e-8 * np.trace(ATA) / A.shape[1]
+            X = spd_solve(ATA + alpha * np.eye(A.shape[1]), A.T @ ΔBΘ)
     except np.linalg.LinAlgError:
         return {"is_valid": False, "error": "Linear algebra error in least squares solution"}
     
@@ -281,7 +271,7 @@ def perform_msmt(surveys: List[Dict[str, Any]], ipm_data: Any, *, sigma: float =
     
     # Calculate correlation matrix
     try:
-        ATA_inv = np.linalg.inv(A.T @ A + 1e-10 * np.eye(A.shape[1]))  # Add tiny regularization
+        ATA_inv = safe_spd_inverse(ATA, ridge=1e-10)  # Cholesky, tiny regularization
         std = np.sqrt(np.diag(ATA_inv))
         
         # Calculate correlation matrix safely
@@ -298,52 +288,23 @@ def perform_msmt(surveys: List[Dict[str, Any]], ipm_data: Any, *, sigma: float =
     # Tolerance check for parameters
     params_valid = np.all(np.abs(X) <= param_tol)
     
-    # Calculate residual tolerances (per Appendix 1F)
-    res_tol = []
-    for i, (Bt, sv) in enumerate(zip(Bt_list, surveys)):
-        bx, by, bz = sv["mag_x"], sv["mag_y"], sv["mag_z"]
-        B = math.sqrt(bx*bx + by*by + bz*bz)
-        nx, ny, nz = bx/B, by/B, bz/B
-        
-        # Total field tolerance - from paper
-        tf_tol = sigma * math.sqrt(
-            (σ_mbx * nx) ** 2 +
-            (σ_mby * ny) ** 2 +
-            (σ_mbz * nz) ** 2 +
-            (σ_msx * nx * Bt) ** 2 +
-            (σ_msy * ny * Bt) ** 2 +
-            (σ_msz * nz * Bt) ** 2 +
-            σ_mfi ** 2
-        )
-        res_tol.append(tf_tol)
-        
-        # Dip tolerance
-        dip_rad = math.radians(sv["expected_geomagnetic_field"]["dip"])
-        cosd = max(math.cos(dip_rad), 1e-4)
-        sind = math.sin(dip_rad)
-        
-        # Calculate gravity unit vector
-        g = math.sqrt(sv["accelerometer_x"]**2 + sv["accelerometer_y"]**2 + sv["accelerometer_z"]**2)
-        kx = sv["accelerometer_x"] / g
-        ky = sv["accelerometer_y"] / g
-        kz = sv["accelerometer_z"] / g
-        
-        # Calculate weighting terms
-        wx = (kx * cosd - nx * sind) / cosd
-        wy = (ky * cosd - ny * sind) / cosd
-        wz = (kz * cosd - nz * sind) / cosd
-        
-        # Dip tolerance (scaled by Bt)
-        dp_tol = sigma * math.sqrt(
-            (σ_mbx * wx) ** 2 +
-            (σ_mby * wy) ** 2 +
-            (σ_mbz * wz) ** 2 +
-            (σ_msx * wx * Bt) ** 2 +
-            (σ_msy * wy * Bt) ** 2 +
-            (σ_msz * wz * Bt) ** 2 +
-            σ_mdi ** 2
-        )
-        res_tol.append(Bt * dp_tol)
+    # Calculate residual tolerances (per Appendix 1F) – one expression per
+    # row type over the unit vectors and dip weights the design matrix used
+    σ_bias = np.array([σ_mbx, σ_mby, σ_mbz])
+    σ_scale = np.array([σ_msx, σ_msy, σ_msz])
+    Bt_col = Bt_arr[:, None]
+    
+    # Total field tolerance - from paper
+    tb, ts = σ_bias * n_hat, σ_scale * n_hat * Bt_col
+    field_tol = sigma * np.sqrt((tb*tb).sum(axis=1) + (ts*ts).sum(axis=1) + σ_mfi ** 2)
+    
+    # Dip tolerance (in degrees; the residual row is scaled by Bt)
+    tb, ts = σ_bias * w, σ_scale * w * Bt_col
+    dip_tol = sigma * np.sqrt((tb*tb).sum(axis=1) + (ts*ts).sum(axis=1) + σ_mdi ** 2)
+    
+    res_tol = np.empty(2 * n)
+    res_tol[0::2] = field_tol
+    res_tol[1::2] = Bt_arr * dip_tol
     
     # Check residual validity
     residuals_valid = np.all(np.abs(residuals) <= res_tol)
@@ -365,8 +326,8 @@ def perform_msmt(surveys: List[Dict[str, Any]], ipm_data: Any, *, sigma: float =
     # Add details
     qc.add_detail("field_residuals", residuals[0::2].tolist())
     qc.add_detail("dip_residuals", residuals[1::2].tolist())
-    qc.add_detail("field_tolerances", res_tol[0::2])
-    qc.add_detail("dip_tolerances", [rt / Bt for rt, Bt in zip(res_tol[1::2], Bt_list)])
+    qc.add_detail("field_tolerances", field_tol.tolist())
+    qc.add_detail("dip_tolerances", dip_tol.tolist())
     qc.add_detail("correlation_matrix", corr.tolist())
     qc.add_detail("max_nondiagonal_correlation", float(max_corr))
     qc.add_detail("sigma", sigma)
@@ -20,7 +20,7 @@ from typing import List, Dict, Any, Tuple
 import numpy as np
 
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
 
 # -----------------------------------------------------------------------------
@@ -131,7 +131,7 @@ def perform_rsmt(surveys: List[Dict[str, float]], ipm_data: Any) -> Dict[str, An
 # -----------------------------------------------------------------------------
 def _rsmt_tolerances(ipm_data: Any) -> Tuple[float, float]:
     """Return (MX_tol, MY_tol) in degrees, 3 σ."""
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
     σ_mx = get_error_term_value(ipm, "MX", "e", "s")
     σ_my = get_error_term_value(ipm, "MY", "e", "s")
     return 3.0 * σ_mx, 3.0 * σ_my
@@ -28,7 +28,7 @@ Values are converted to 1‑σ in physical units on the fly.
 
 import math
 from src.models.qc_result import QCResult
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.tolerance import get_error_term_value
 
 # --------------------------------------------------------------------------- #
@@ -50,7 +50,7 @@ def perform_tfdt(survey, ipm_data, sigma: float = 3.0):
     gx, gy, gz = survey["accelerometer_x"], survey["accelerometer_y"], survey["accelerometer_z"]
 
     # inclination / toolface from accelerometers (same algo as GET)
-    g_tot = math.sqrt(gx*gx + gy*gy + gz*gz)
+    g_tot = math.hypot(gx, gy, gz)
     inc   = math.degrees(math.acos(max(min(gz / g_tot, 1.0), -1.0)))
 
     if 10.0 <= inc <= 170.0:
@@ -66,7 +66,7 @@ def perform_tfdt(survey, ipm_data, sigma: float = 3.0):
     lat = survey.get("latitude", 0.0)
 
     # --- measured total field & dip --------------------------------------- #
-    b_tot = math.sqrt(mx*mx + my*my + mz*mz)
+    b_tot = math.hypot(mx, my, mz)
     dip_meas = _calc_dip(mx, my, mz, gx, gy, gz)
 
     # --- theoretical ------------------------------------------------------ #
@@ -78,8 +78,11 @@ def perform_tfdt(survey, ipm_data, sigma: float = 3.0):
     err_field = b_tot  - b_ref
     err_dip   = dip_meas - dip_ref
 
+    w = _tfdt_weights(inc, tf, dip_ref)
+    ipm = parse_ipm_file_cached(ipm_data) if isinstance(ipm_data, str) else ipm_data
     tol_field, tol_dip, dbg = _tfdt_tolerances(
-    ipm_data,
+    ipm,                    # parsed once per request
+    w,                      # weights, shared with the result details
     inc, tf,                # station geometry
     az,                     # NEW: azimuth
     b_ref, dip_ref,         # reference field
@@ -110,7 +113,7 @@ def perform_tfdt(survey, ipm_data, sigma: float = 3.0):
        .add_detail("toolface",   tf)\
        .add_detail("azimuth",    az)\
        .add_detail("latitude",   lat)\
-       .add_detail("weighting_functions", _tfdt_weights(inc, tf, dip_ref))\
+       .add_detail("weighting_functions", dict(zip(_TFDT_WEIGHT_NAMES, w)))\
        .add_detail("debug_ipm_terms", dbg)
 
     _maybe_add_warnings(res, inc, az, lat)
@@ -149,8 +152,8 @@ def _calc_dip(mx, my, mz, gx, gy, gz):
     Implements: Θ = 90° − arccos [(B·G)/(Bt Gt)]
     """
     # magnitudes
-    bt = math.sqrt(mx*mx + my*my + mz*mz)
-    gt = math.sqrt(gx*gx + gy*gy + gz*gz)
+    bt = math.hypot(mx, my, mz)
+    gt = math.hypot(gx, gy, gz)
 
     # dot product B·G
     dot = mx*gx + my*gy + mz*gz
@@ -161,28 +164,30 @@ def _calc_dip(mx, my, mz, gx, gy, gz):
     # 90° − arccos(...)
     return 90.0 - math.degrees(math.acos(c))
 
+_TFDT_WEIGHT_NAMES = ("wbx_b", "wby_b", "wbz_b", "wbx_d", "wby_d", "wbz_d")
+
+
 def _tfdt_weights(inc_deg, tf_deg, dip_deg):
+    """Weights in `_TFDT_WEIGHT_NAMES` order, from one sin/cos per angle."""
     I, T, D = map(math.radians, (inc_deg, tf_deg, dip_deg))
+    sinI, cosI = math.sin(I), math.cos(I)
+    sinT, cosT = math.sin(T), math.cos(T)
+    sinD, cosD = math.sin(D), math.cos(D)
     # total‑field weights
-    wbx_b = math.sin(I)*math.cos(T)*math.cos(D) - math.sin(T)*math.sin(D)
-    wby_b = math.sin(I)*math.sin(T)*math.cos(D) + math.cos(T)*math.sin(D)
-    wbz_b = math.cos(I)*math.cos(D)
+    wbx_b = sinI*cosT*cosD - sinT*sinD
+    wby_b = sinI*sinT*cosD + cosT*sinD
+    wbz_b = cosI*cosD
     # dip weights
-    cosD = math.cos(D)
-    wbx_d = (math.sin(I)*math.cos(T)*math.sin(D) + math.sin(T)*cosD) / cosD
-    wby_d = (math.sin(I)*math.sin(T)*math.sin(D) - math.cos(T)*cosD) / cosD
-    wbz_d = math.cos(I)*math.sin(D) / cosD
-    return {
-        "wbx_b": wbx_b, "wby_b": wby_b, "wbz_b": wbz_b,
-        "wbx_d": wbx_d, "wby_d": wby_d, "wbz_d": wbz_d,
-    }
+    wbx_d = (sinI*cosT*sinD + sinT*cosD) / cosD
+    wby_d = (sinI*sinT*sinD - cosT*cosD) / cosD
+    wbz_d = cosI*sinD / cosD
+    return wbx_b, wby_b, wbz_b, wbx_d, wby_d, wbz_d
 
 # --------------------------------------------------------------------------- #
 # Tolerance calculator
 # --------------------------------------------------------------------------- #
-def _tfdt_tolerances(ipm_data, inc, tf, az, b_ref, dip_ref, g_tot, sigma=3.0):
-    ipm = parse_ipm_file(ipm_data) if isinstance(ipm_data, str) else ipm_data
-    w   = _tfdt_weights(inc, tf, dip_ref)
+def _tfdt_tolerances(ipm, w, inc, tf, az, b_ref, dip_ref, g_tot, sigma=3.0):
+    wbx_b, wby_b, wbz_b, wbx_d, wby_d, wbz_d = w
     dbg = {}
 
     # -- helper for value selection + logging ----------------------------- #
@@ -223,24 +228,24 @@ def _tfdt_tolerances(ipm_data, inc, tf, az, b_ref, dip_ref, g_tot, sigma=3.0):
 
     # -- variance contributions ------------------------------------------ #
     field_terms = {
-        "mbx": ((mbx / b_ref) * w["wbx_b"])**2,
-        "mby": ((mby / b_ref) * w["wby_b"])**2,
-        "mbz": ((mbz / b_ref) * w["wbz_b"])**2,
-        "msx": (msx * w["wbx_b"])**2,
-        "msy": (msy * w["wby_b"])**2,
-        "msz": (msz * w["wbz_b"])**2,
+        "mbx": ((mbx / b_ref) * wbx_b)**2,
+        "mby": ((mby / b_ref) * wby_b)**2,
+        "mbz": ((mbz / b_ref) * wbz_b)**2,
+        "msx": (msx * wbx_b)**2,
+        "msy": (msy * wby_b)**2,
+        "msz": (msz * wbz_b)**2,
         "mfi": (mfi * b_ref)**2
     }
 
     dip_terms = {
     # bias terms (nT → deg) divide by B_tot
-    "mbx": ((mbx / b_ref) * w["wbx_d"])**2,
-    "mby": ((mby / b_ref) * w["wby_d"])**2,
-    "mbz": ((mbz / b_ref) * w["wbz_d"])**2,
+    "mbx": ((mbx / b_ref) * wbx_d)**2,
+    "mby": ((mby / b_ref) * wby_d)**2,
+    "mbz": ((mbz / b_ref) * wbz_d)**2,
     # scale‑factor terms are already dimensionless — no B_tot
-    "msx": (msx * w["wbx_d"])**2,
-    "msy": (msy * w["wby_d"])**2,
-    "msz": (msz * w["wbz_d"])**2,
+    "msx": (msx * wbx_d)**2,
+    "msy": (msy * wby_d)**2,
+    "msz": (msz * wbz_d)**2,
     "mdi":  mdi**2
     }
 
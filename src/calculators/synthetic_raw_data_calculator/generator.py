@@ -134,9 +134,9 @@ def generate_synthetic_raw_data(trajectory_data, magnetic_dip=73.484, magnetic_f
             
             # Base solution for vertical case
             vertical_solution = [
-                magnetic_field_strength * np.cos(dip_rad) * np.cos(azi),
-                magnetic_field_strength * np.cos(dip_rad) * np.sin(azi),
-                magnetic_field_strength * np.sin(dip_rad)
+                Bh * cos_azi,
+                Bh * sin_azi,
+                Bz_geo
             ]
             
             # If we have a previous solution and extrapolation is enabled, use it for stability
@@ -1,39 +1,132 @@
+import ast
+import io
 from pathlib import Path            # ← add this
 
+import numpy as np
+
+# AST nodes an IPM formula may contain: arithmetic on names, numbers and
+# plain function calls (sin, cos, sqrt, …).  Anything else – attribute
+# access, subscripts, lambdas, comprehensions – is rejected.
+_FORMULA_NODES = (
+    ast.Expression, ast.Load, ast.Name, ast.Constant, ast.Call,
+    ast.BinOp, ast.UnaryOp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
+
+def compile_formula(formula: str, filename: str = "<ipm>"):
+    """
+    Compile an IPM formula to an ``eval`` code object.
+
+    Returns None for formulas that do not parse or that use anything beyond
+    numeric arithmetic and simple function calls.
+    """
+    try:
+        tree = ast.parse(formula, mode="eval")
+    except SyntaxError:
+        return None
+    for node in ast.walk(tree):
+        if not isinstance(node, _FORMULA_NODES):
+            return None
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            return None
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.keywords):
+            return None
+    return compile(tree, filename, "eval")
+
+
+# Expanded unit mapping: raw (lower-cased) unit -> (canonical unit, factor).
+# Built once at import instead of on every _canonicalize() call.
+_UNIT_MAP = {
+    # Magnetic units
+    "µt": ("nT", 1000.0),
+    "ut": ("nT", 1000.0),
+    "uT": ("nT", 1000.0),
+    "μt": ("nT", 1000.0),
+    "nt": ("nT", 1.0),
+    "nT": ("nT", 1.0),
+    "dnt": ("nT", 1.0),  # deg*nT treated as nT
+    
+    # Angular units
+    "rad/s": ("deg/hr", 57.29577951308232 * 3600.0),
+    "rad/s2": ("deg/hr²", 57.29577951308232 * 3600.0),
+    "deg/hr": ("deg/hr", 1.0),
+    "d": ("deg", 1.0),
+    "deg": ("deg", 1.0),
+    
+    # Length units
+    "ft": ("m", 0.3048),
+    "feet": ("m", 0.3048),
+    "m": ("m", 1.0),
+    
+    # Acceleration units
+    "m/s2": ("g", 1.0/9.80665),  # Convert to g-units
+    "g": ("g", 1.0),
+    
+    # Dimensionless
+    "-": ("-", 1.0),
+    "im": ("-", 1.0),  # Inverse meters
+    "1/m": ("-", 1.0),
+}
+
+
 class IPMFile:
-    def __init__(self, content: str | Path):
+    def __init__(self, content):
         self.error_terms = []
         self._index = {}  # Primary index by (name, vector, tie_on)
         self._name_index = {}  # Secondary index by name for faster lookups
+        self._norm_index = {}  # (NAME, vector, tie_on) -> first matching term
         self.metadata = {}  # Store metadata (ShortName, Description, etc.)
+        self._formula_codes = {}  # formula text -> compiled code (or None)
+        self._rows_cache = {}  # (names, vector, tie_on) -> row indices
+        self._tolerance_tables = {}  # per-test coefficients derived from this IPM
         self.parse_content(content)
     
-    def parse_content(self, content):
-        """More robust parsing with metadata handling"""
-        lines = content.splitlines() if isinstance(content, str) else content.read_text().splitlines()
+    @staticmethod
+    def _iter_lines(content):
+        """Yield text lines from a string, a Path or any iterable of lines."""
+        if isinstance(content, str):
+            yield from io.StringIO(content, newline=None)
+        elif isinstance(content, Path):
+            with content.open(newline=None) as fh:
+                yield from fh
+        else:
+            # e.g. iter(mm.readline, b'') over an mmap-ed upload
+            for line in content:
+                yield line.decode("utf-8", "replace") if isinstance(line, bytes) else line
+
+    def parse_content(self, content_or_iter):
+        """
+        More robust parsing with metadata handling.
+
+        Accepts IPM text, a Path, or any iterable of lines (str or bytes);
+        lines are consumed one at a time so no full line list is built.
+        """
+        error_terms = list(self.error_terms)
         
         # Parse metadata and error terms
-        for line in lines:
+        for line in self._iter_lines(content_or_iter):
             line = line.strip()
             if not line:
                 continue
                 
-            if line.startswith('#'):
-                if ':' in line:  # Metadata line
-                    key, value = line[1:].split(':', 1)
+            if line[0] == '#':
+                key, sep, value = line[1:].partition(':')
+                if sep:  # Metadata line
                     self.metadata[key.strip()] = value.strip()
                 continue
                 
             # Handle different whitespace patterns
             parts = line.split(None, 5)  # Split by any whitespace
-            if len(parts) < 5:
+            if len(parts) == 6:
+                name, vector, tie_on, unit_raw, value_raw, formula = parts
+            elif len(parts) == 5:
+                # No formula column
+                name, vector, tie_on, unit_raw, value_raw = parts
+                formula = ""
+            else:
                 continue  # Skip malformed lines
-                
-            # Ensure we have 6 parts (add empty formula if needed)
-            while len(parts) < 6:
-                parts.append("")
-                
-            name, vector, tie_on, unit_raw, value_raw, formula = parts
             
             try:
                 val_raw = float(value_raw)
@@ -54,7 +147,13 @@ class IPMFile:
                 "formula": formula,
             }
             
-            self.error_terms.append(term)
+            error_terms.append(term)
+            
+            # Compile each distinct formula once; terms stay JSON-serialisable
+            if formula and formula not in self._formula_codes:
+                short_name = self.metadata.get("ShortName", "")
+                self._formula_codes[formula] = compile_formula(
+                    formula, f"<ipm:{short_name}:{name}>")
             
             # Index by tuple and normalize name
             key = (name, vector, tie_on)
@@ -65,6 +164,7 @@ class IPMFile:
             if norm_name not in self._name_index:
                 self._name_index[norm_name] = []
             self._name_index[norm_name].append(term)
+            self._norm_index.setdefault((norm_name, vector, tie_on), term)
             
             # Add alternative name format (replace hyphens with underscores and vice versa)
             alt_name = name.replace('-', '_') if '-' in name else name.replace('_', '-')
@@ -76,49 +176,88 @@ class IPMFile:
                 if norm_alt not in self._name_index:
                     self._name_index[norm_alt] = []
                 self._name_index[norm_alt].append(term)
+                self._norm_index.setdefault((norm_alt, vector, tie_on), term)
+
+        # Parsed files are shared through the IPM cache – keep them read-only
+        self.error_terms = tuple(error_terms)
+        self._build_arrays()
+    
+    def _build_arrays(self):
+        """
+        Structure-of-arrays view of `error_terms` for batched lookups.
+
+        Row *i* of `names`/`vectors`/`tie_ons`/`values` describes
+        ``error_terms[i]``.  `values` holds exactly the floats in the term
+        dicts, so batched lookups agree with `get_error_term_value`.
+        `_values_ext` carries one trailing 0.0 so that a missing term (row -1)
+        reads as the 0.0 default without a branch.
+        """
+        terms = self.error_terms
+        self.names = np.asarray([t["name"] for t in terms], dtype=object)
+        self.vectors = np.asarray([t["vector"] for t in terms], dtype=object)
+        self.tie_ons = np.asarray([t["tie_on"] for t in terms], dtype=object)
+        self.values = np.fromiter((t["value"] for t in terms), dtype=np.float64, count=len(terms))
+        self._values_ext = np.append(self.values, 0.0)
+        self._row_of = {id(t): i for i, t in enumerate(terms)}
+        self._rows_cache = {}
+        self._tolerance_tables = {}
+    
+    def _rows(self, names, vector, tie_on):
+        """Row indices for *names* resolved via `get_error_term` (-1 if absent)."""
+        key = (tuple(names), vector, tie_on)
+        rows = self._rows_cache.get(key)
+        if rows is None:
+            found = (self.get_error_term(n, vector, tie_on) for n in key[0])
+            rows = np.fromiter((self._row_of[id(t)] if t else -1 for t in found),
+                               dtype=np.intp, count=len(key[0]))
+            self._rows_cache[key] = rows
+        return rows
+    
+    def get_values(self, names, vector="", tie_on=""):
+        """
+        Batch lookup of canonical 1-σ values for *names* (0.0 where absent).
+
+        Name resolution goes through `get_error_term` once per distinct
+        (names, vector, tie_on) request and is cached, so repeat calls are a
+        dict hit plus one fancy-index into `values`.  The result is a fresh
+        array (callers may scale it in place).
+        """
+        return self._values_ext[self._rows(names, vector, tie_on)]
+    
+    def tolerance_table(self, key, build):
+        """
+        Return the tolerance coefficients stored under *key*, building them
+        with ``build(self)`` on first use.
+
+        Calculators use this to derive the IPM-only part of a tolerance once
+        per parsed file (the IPM cache shares the object across requests)
+        instead of once per station.
+        """
+        try:
+            return self._tolerance_tables[key]
+        except KeyError:
+            table = self._tolerance_tables[key] = build(self)
+            return table
+    
+    def get_formula_codes(self, names, vector="", tie_on=""):
+        """Compiled formula (or None) for each of *names*, aligned with `get_values`."""
+        return [self.formula_code(self.error_terms[r]) if r >= 0 else None
+                for r in self._rows(names, vector, tie_on)]
     
     def _canonicalize(self, value, unit):
         """Enhanced unit mapping with more comprehensive coverage"""
-        # Expanded unit mapping
-        unit_map = {
-            # Magnetic units
-            "µt": ("nT", 1000.0),
-            "ut": ("nT", 1000.0),
-            "uT": ("nT", 1000.0),
-            "μt": ("nT", 1000.0),
-            "nt": ("nT", 1.0),
-            "nT": ("nT", 1.0),
-            "dnt": ("nT", 1.0),  # deg*nT treated as nT
-            
-            # Angular units
-            "rad/s": ("deg/hr", 57.29577951308232 * 3600.0),
-            "rad/s2": ("deg/hr²", 57.29577951308232 * 3600.0),
-            "deg/hr": ("deg/hr", 1.0),
-            "d": ("deg", 1.0),
-            "deg": ("deg", 1.0),
-            
-            # Length units
-            "ft": ("m", 0.3048),
-            "feet": ("m", 0.3048),
-            "m": ("m", 1.0),
-            
-            # Acceleration units
-            "m/s2": ("g", 1.0/9.80665),  # Convert to g-units
-            "g": ("g", 1.0),
-            
-            # Dimensionless
-            "-": ("-", 1.0),
-            "im": ("-", 1.0),  # Inverse meters
-            "1/m": ("-", 1.0),
-        }
-        
-        if unit in unit_map:
-            canonical_unit, factor = unit_map[unit]
+        mapped = _UNIT_MAP.get(unit)
+        if mapped is not None:
+            canonical_unit, factor = mapped
             return value * factor, canonical_unit
         
         # Return as-is if not found
         return value, unit
     
+    def formula_code(self, term):
+        """Compiled code object for *term*'s formula, or None if it has none/was rejected."""
+        return self._formula_codes.get(term.get("formula", ""))
+
     def get_error_term(self, name, vector="", tie_on=""):
         """More flexible error term lookup with normalization"""
         # Try direct lookup first
@@ -133,6 +272,15 @@ class IPMFile:
             name.replace('_', '-').upper()
         ]
         
+        # Fully-qualified lookups resolve through the normalized index in O(1)
+        if vector and tie_on:
+            for var_name in variations:
+                term = self._norm_index.get((var_name, vector, tie_on))
+                if term is not None:
+                    return term
+            return None
+        
+        # Wildcard vector/tie_on: first candidate in file order wins
         for var_name in variations:
             if var_name in self._name_index:
                 # Found candidates, filter by vector and tie_on if provided
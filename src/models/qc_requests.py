@@ -0,0 +1,55 @@
+# models/qc_requests.py
+"""
+Typed request bodies for the QC endpoints.
+
+Handlers decode the raw request bytes straight into these structs with
+msgspec's C decoder, which parses and validates in a single pass instead of
+`request.get_json()` followed by hand-written key checks.  Decoding errors
+(bad JSON, missing fields, wrong types) raise `msgspec.DecodeError`, which
+the handlers map to HTTP 400.
+"""
+from typing import Annotated, Any
+
+import msgspec
+from flask import request
+
+from src.utils.json_provider import _MISSING, loaded_json_body
+
+
+class MSERequest(msgspec.Struct):
+    # Stations stay plain dicts: MSE echoes every input key back in
+    # `corrected_surveys`, so they must not be narrowed to a fixed schema.
+    surveys: Annotated[list[dict[str, Any]], msgspec.Meta(min_length=1)]
+    ipm: str | dict[str, Any]
+
+
+class ParseIPMRequest(msgspec.Struct):
+    ipm_content: str
+
+
+class ErrorTermRequest(msgspec.Struct):
+    ipm_content: str
+    name: str
+    vector: str = ""
+    tie_on: str = ""
+
+def decode_request(body: bytes, request_type):
+    """Decode a JSON request body into *request_type* (raises msgspec.DecodeError)."""
+    return msgspec.json.decode(body, type=request_type)
+
+
+def decode_request_body(request_type):
+    """
+    Decode the current request's body into *request_type*.
+
+    The raw bytes are decoded directly unless `load_json_body` already
+    consumed them (`cached_qc` does, to build its key); then the struct is
+    built from that decoded value with `msgspec.convert`.  Raises
+    msgspec.DecodeError (or its ValidationError subclass) either way.
+    """
+    body = loaded_json_body()
+    if body is _MISSING:
+        return decode_request(request.get_data(cache=False), request_type)
+    if isinstance(body, Exception):
+        raise msgspec.DecodeError(body.description)
+    return msgspec.convert(body, type=request_type)
@@ -46,28 +46,75 @@ class QCResult:
     
     def to_dict(self):
         """Convert the result to a dictionary with Python native types"""
-        # Helper function to convert numpy types to Python native types
-        def convert_numpy(obj):
-            if isinstance(obj, (np.integer, np.int32, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float32, np.float64)):
-                return float(obj)
-            elif isinstance(obj, (np.ndarray, list)):
-                return [convert_numpy(i) for i in obj]
-            elif isinstance(obj, (np.bool_, bool)):
-                return bool(obj)
-            elif isinstance(obj, dict):
-                return {k: convert_numpy(v) for k, v in obj.items()}
-            else:
-                return obj
-        
-        # Convert all values to Python native types
         return {
             'test_name': self.test_name,
             'is_valid': bool(self.is_valid),  # Ensure it's a Python boolean
-            'measurements': convert_numpy(self.measurements),
-            'theoretical_values': convert_numpy(self.theoretical_values),
-            'errors': convert_numpy(self.errors),
-            'tolerances': convert_numpy(self.tolerances),
-            'details': convert_numpy(self.details)
-        }
\ No newline at end of file
+            'measurements': _convert_numpy(self.measurements),
+            'theoretical_values': _convert_numpy(self.theoretical_values),
+            'errors': _convert_numpy(self.errors),
+            'tolerances': _convert_numpy(self.tolerances),
+            'details': _convert_numpy(self.details)
+        }
+
+    @classmethod
+    def from_fields(cls, test_name, is_valid, measurements, theoretical_values,
+                    errors, tolerances, details=None):
+        """Build the `to_dict` payload in one step, skipping the builder calls"""
+        return {
+            'test_name': test_name,
+            'is_valid': bool(is_valid),
+            'measurements': _convert_numpy(measurements),
+            'theoretical_values': _convert_numpy(theoretical_values),
+            'errors': _convert_numpy(errors),
+            'tolerances': _convert_numpy(tolerances),
+            'details': _convert_numpy(details or {})
+        }
+
+    @classmethod
+    def batch_to_records(cls, test_name, name, is_valid, measured, theoretical,
+                         error, tolerance):
+        """
+        Yield one `to_dict`-shaped payload per station from batched arrays.
+
+        Scalars broadcast against the arrays.  Each column is converted with a
+        single `.tolist()` so the per-station work is plain dict construction.
+        """
+        columns = np.broadcast_arrays(np.asarray(is_valid, dtype=bool),
+                                      measured, theoretical, error, tolerance)
+        for ok, meas, theo, err, tol in zip(*(c.tolist() for c in columns)):
+            yield {
+                'test_name': test_name,
+                'is_valid': ok,
+                'measurements': {name: meas},
+                'theoretical_values': {name: theo},
+                'errors': {name: err},
+                'tolerances': {name: tol},
+                'details': {}
+            }
+
+
+# values that are already JSON-native and need no conversion
+_NATIVE_TYPES = frozenset((float, int, str, bool, type(None)))
+
+
+def _convert_numpy(obj):
+    """Convert numpy types to Python native types"""
+    if type(obj) in _NATIVE_TYPES:
+        return obj
+    elif isinstance(obj, dict):
+        return {k: _convert_numpy(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        # `.tolist()` output is already native – only descend where needed
+        return [v if type(v) in _NATIVE_TYPES else _convert_numpy(v) for v in obj]
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype != object:
+            return obj.tolist()
+        return [_convert_numpy(i) for i in obj]
+    elif isinstance(obj, (np.integer, np.int32, np.int64)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float32, np.float64)):
+        return float(obj)
+    elif isinstance(obj, (np.bool_, bool)):
+        return bool(obj)
+    else:
+        return obj
@@ -0,0 +1,120 @@
+# models/survey_batch.py
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.utils.survey_arrays import stack_fields
+
+
+class SurveyBatch:
+    """
+    N survey stations laid out for the batched QC tests.
+
+    Sensor groups are passed station-major – `acc` as (N, 3), `gyro` as
+    (N, 2), one row per station – and stored axis-major: `acc` is a
+    C-contiguous (3, N) float64 block and `gyro` a (2, N) block, so every
+    axis is one contiguous row that NumPy and the Numba kernels stream
+    through directly.  (For the column-wise QC maths this measured faster
+    than keeping the (N, 3) layout, where each axis is a strided view.)
+    Per-station angles and references are contiguous (N,) arrays.
+
+    The batch also reads like the dict-of-arrays the batch functions accept –
+    `batch["accelerometer_x"]`, `batch.get("inclination")` – so it can be
+    passed to `perform_get_batch` / `perform_hert_batch` unchanged.
+    """
+
+    # survey-dict field -> (attribute, row or None)
+    _FIELDS = {
+        "accelerometer_x": ("acc", 0),
+        "accelerometer_y": ("acc", 1),
+        "accelerometer_z": ("acc", 2),
+        "gyro_x": ("gyro", 0),
+        "gyro_y": ("gyro", 1),
+        "inclination": ("inclination", None),
+        "toolface": ("toolface", None),
+        "azimuth": ("azimuth", None),
+        "latitude": ("latitude", None),
+        "depth": ("depth", None),
+        "expected_gravity": ("expected_gravity", None),
+    }
+
+    __slots__ = ("acc", "gyro", "inclination", "toolface", "azimuth",
+                 "latitude", "depth", "expected_gravity")
+
+    def __init__(self, acc, gyro=None, inclination=None, toolface=None,
+                 azimuth=None, latitude=None, depth=None, expected_gravity=None):
+        self.acc = _block(acc, 3)
+        self.gyro = _block(gyro, 2)
+        self.inclination = _column(inclination)
+        self.toolface = _column(toolface)
+        self.azimuth = _column(azimuth)
+        self.latitude = _column(latitude)
+        self.depth = _column(depth)
+        self.expected_gravity = _column(expected_gravity)
+
+    @classmethod
+    def from_surveys(cls, surveys: Sequence[dict]) -> "SurveyBatch":
+        """Build a batch from a list of survey dicts (one pass per sensor group)."""
+        first = surveys[0]
+
+        def group(fields):
+            if not all(f in first for f in fields):
+                return None
+            return stack_fields(surveys, fields)
+
+        def column(field):
+            if field not in first:
+                return None
+            return stack_fields(surveys, (field,))[:, 0]
+
+        return cls(
+            acc=group(("accelerometer_x", "accelerometer_y", "accelerometer_z")),
+            gyro=group(("gyro_x", "gyro_y")),
+            inclination=column("inclination"),
+            toolface=column("toolface"),
+            azimuth=column("azimuth"),
+            latitude=column("latitude"),
+            depth=column("depth"),
+            expected_gravity=column("expected_gravity"),
+        )
+
+    def __len__(self):
+        return self.acc.shape[1]
+
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def get(self, field, default=None):
+        """Dict-style access by survey field name."""
+        attr, row = self._FIELDS.get(field, (None, None))
+        if attr is None:
+            return default
+        value = getattr(self, attr)
+        if value is None:
+            return default
+        return value if row is None else value[row]
+
+
+def _block(values, axes: int) -> Optional[np.ndarray]:
+    """
+    Station-major (N, *axes*) *values* as a C-contiguous (axes, N) float64 block.
+
+    The layout is fixed rather than guessed from the shape: with N == axes
+    an axis-major block would be indistinguishable and silently swapped.
+    """
+    if values is None:
+        return None
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim != 2 or arr.shape[1] != axes:
+        raise ValueError(f"expected a station-major (N, {axes}) array, got {arr.shape}")
+    return np.ascontiguousarray(arr.T)
+
+
+def _column(values) -> Optional[np.ndarray]:
+    """*values* as a contiguous (N,) float64 array."""
+    if values is None:
+        return None
+    return np.ascontiguousarray(values, dtype=np.float64)
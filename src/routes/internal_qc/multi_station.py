@@ -1,14 +1,19 @@
 # blueprints/qc/multi_station.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
+from src.utils.qc_cache import cached_qc
 from src.calculators.survey_qc_tests.msat import perform_msat, perform_msat_with_corrections
 from src.calculators.survey_qc_tests.msgt import perform_msgt
 from src.calculators.survey_qc_tests.msmt import perform_msmt
 from src.calculators.survey_qc_tests.mse import perform_mse
+from src.utils.json_provider import json_response, load_json_body
+from src.models.qc_requests import MSERequest, decode_request_body
+import msgspec
 import numpy as np
 
-multi_station_bp = Blueprint('multi_station', __name__)
+multi_station_bp = Blueprint('multi_station', __name__, url_prefix='/api/v1/qc/multi-station')
 
 @multi_station_bp.route('/msat', methods=['POST'])
+@cached_qc(prefix="msat")
 def multi_station_accelerometer_test():
     """
     Perform Multi-Station Accelerometer Test (MSAT) on a set of survey measurements
@@ -31,7 +36,7 @@ def multi_station_accelerometer_test():
         "apply_corrections": bool # optional, whether to apply corrections (default: false)
     }
     """
-    data = request.get_json()
+    data = load_json_body()
     
     # Validate required inputs
     if 'surveys' not in data or not isinstance(data['surveys'], list):
@@ -54,16 +59,18 @@ def multi_station_accelerometer_test():
     else:
         result = perform_msat(data['surveys'], data['ipm'], sigma=sigma)
     
-    return jsonify(result)
+    return json_response(result)
 
 @multi_station_bp.route('/msgt', methods=['POST'])
+@cached_qc(prefix="msgt")
 def multi_station_gyro_test():
     """Perform Multi-Station Gyro Test (MSGT) on a set of survey measurements"""
-    data = request.get_json()
+    data = load_json_body()
     result = perform_msgt(data['surveys'], data['ipm'])
-    return jsonify(result)
+    return json_response(result)
 
 @multi_station_bp.route('/msmt', methods=['POST'])
+@cached_qc(prefix="msmt")
 def multi_station_magnetometer_test():
     """
     Perform Multi-Station Magnetometer Test (MSMT) on a set of survey measurements
@@ -93,7 +100,7 @@ def multi_station_magnetometer_test():
     }
     """
     try:
-        data = request.get_json(silent=True)
+        data = load_json_body(silent=True)
         if not data:
             return jsonify({"error": "Invalid JSON data in request"}), 400
         
@@ -118,7 +125,7 @@ def multi_station_magnetometer_test():
         # Run the MSMT with comprehensive error handling
         try:
             result = perform_msmt(data['surveys'], data['ipm'], sigma=sigma)
-            return jsonify(result)
+            return json_response(result)
         except (ValueError, KeyError) as e:
             # Handle validation errors
             return jsonify({"error": f"Validation error: {str(e)}"}), 422
@@ -138,15 +145,13 @@ def multi_station_magnetometer_test():
     
     
 @multi_station_bp.route('/mse', methods=['POST'])
+@cached_qc(prefix="mse")
 def multi_station_estimation():
     """Perform Multi-Station Estimation (MSE) on a set of survey measurements"""
-    data = request.get_json()
-    
-    if 'surveys' not in data or not data['surveys']:
-        return jsonify({'error': 'Survey data is required'}), 400
-    
-    if 'ipm' not in data:
-        return jsonify({'error': 'IPM data is required'}), 400
+    try:
+        req = decode_request_body(MSERequest)
+    except msgspec.DecodeError as e:
+        return jsonify({'error': f'Invalid MSE request: {str(e)}'}), 400
     
-    result = perform_mse(data['surveys'], data['ipm'])
-    return jsonify(result)
+    result = perform_mse(req.surveys, req.ipm)
+    return json_response(result)
@@ -1,14 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
+from src.utils.qc_cache import cached_qc
+from src.utils.json_provider import load_json_body
 from src.calculators.survey_qc_tests.get import perform_get
 from src.calculators.survey_qc_tests.tfdt import perform_tfdt
 from src.calculators.survey_qc_tests.hert import perform_hert
 from src.calculators.survey_qc_tests.rsmt import perform_rsmt
 from src.calculators.survey_qc_tests.dddt import perform_dddt  
 
-single_station_bp = Blueprint('single_station', __name__)
+single_station_bp = Blueprint('single_station', __name__, url_prefix='/api/v1/qc/single-station')
 measurement_bp = Blueprint('measurement', __name__)
 
 @single_station_bp.route('/get', methods=['POST'])
+@cached_qc(prefix="get")
 def gravity_error_test():
     """
     Perform Gravity Error Test (GET) on a survey station
@@ -29,7 +32,7 @@ def gravity_error_test():
         "ipm": string or object        # IPM file content or parsed object
     }
     """
-    data = request.get_json()
+    data = load_json_body()
     
     # Validate required inputs
     required_fields = ['accelerometer_x', 'accelerometer_y', 'accelerometer_z', 
@@ -51,6 +54,7 @@ def gravity_error_test():
     return jsonify(result)
 
 @single_station_bp.route('/tfdt', methods=['POST'])
+@cached_qc(prefix="tfdt")
 def total_field_dip_test():
     """
     Perform Total Field + Dip Test (TFDT) on a survey station
@@ -75,7 +79,7 @@ def total_field_dip_test():
         "ipm": string or object        # IPM file content or parsed object
     }
     """
-    data = request.get_json()
+    data = load_json_body()
     
     # Validate required inputs
     required_fields = ['mag_x', 'mag_y', 'mag_z', 'accelerometer_x', 'accelerometer_y', 
@@ -103,6 +107,7 @@ def total_field_dip_test():
     return jsonify(result)
 
 @single_station_bp.route('/hert', methods=['POST'])
+@cached_qc(prefix="hert")
 def horizontal_earth_rate_test():
     """
     Perform Horizontal Earth Rate Test (HERT) on a survey station
@@ -121,7 +126,7 @@ def horizontal_earth_rate_test():
         "ipm": string or object        # IPM file content or parsed object
     }
     """
-    data = request.get_json()
+    data = load_json_body()
     
     # Validate required inputs
     required_fields = ['gyro_x', 'gyro_y', 'inclination', 'azimuth', 
@@ -137,6 +142,7 @@ def horizontal_earth_rate_test():
     return jsonify(result)
 
 @single_station_bp.route('/rsmt', methods=['POST'])
+@cached_qc(prefix="rsmt")
 def rotation_shot_misalignment_test():
     """
     Perform Rotation-Shot Misalignment Test (RSMT) on a set of survey measurements
@@ -153,7 +159,7 @@ def rotation_shot_misalignment_test():
         "ipm": string or object        # IPM file content or parsed object
     }
     """
-    data = request.get_json()
+    data = load_json_body()
     
     # Validate required inputs
     if not data.get('surveys') or not isinstance(data['surveys'], list) or len(data['surveys']) < 3:
@@ -184,7 +190,7 @@ def dual_depth_difference_test():
         "ipm": string or object        # IPM file content or parsed object
     }
     """
-    data = request.get_json()
+    data = load_json_body()
     
     # Validate required inputs
     if 'pipe_depth' not in data or 'wireline_depth' not in data:
@@ -0,0 +1,41 @@
+# blueprints/qc_cache.py
+import hmac
+import os
+
+from flask import Blueprint, request, jsonify
+from src.utils.qc_cache import get_client, invalidate
+
+qc_cache_bp = Blueprint('qc_cache', __name__)
+
+def _authorised() -> bool:
+    """True if the request carries the QC_CACHE_ADMIN_TOKEN bearer token."""
+    token = os.environ.get('QC_CACHE_ADMIN_TOKEN')
+    if not token:
+        return False  # no token configured: the endpoint is disabled
+    sent = request.headers.get('Authorization', '')
+    return hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode())
+
+@qc_cache_bp.route('', methods=['DELETE'])
+def clear_qc_cache():
+    """
+    Invalidate cached QC responses.
+
+    Clears a keyspace shared by every worker, so it is an admin operation:
+    it needs ``Authorization: Bearer <QC_CACHE_ADMIN_TOKEN>`` and is
+    refused outright while that variable is unset.
+
+    Query parameters:
+        prefix: optional test name (e.g. "get", "msat"); omit to clear all
+    """
+    if not _authorised():
+        return jsonify({'error': 'Not authorised to clear the QC cache'}), 403
+
+    if get_client() is None:
+        return jsonify({'enabled': False, 'deleted': 0})
+    
+    try:
+        deleted = invalidate(request.args.get('prefix') or None)
+    except Exception as e:
+        return jsonify({'error': f'Failed to clear QC cache: {str(e)}'}), 500
+    
+    return jsonify({'enabled': True, 'deleted': deleted})
@@ -1,7 +1,6 @@
 # src/routes/survey_conversions/survey_from_raw_data.py
 from flask import Blueprint, request, jsonify
 import numpy as np
-import math
 import traceback
 
 survey_from_raw_data_bp = Blueprint('survey_from_raw_data', __name__)
@@ -1,7 +1,6 @@
 # src/routes/survey_conversions/survey_from_raw_gyro.py
 from flask import Blueprint, request, jsonify
 import math
-import numpy as np
 import traceback
 
 # Create the blueprint with the name expected by your app
@@ -92,7 +91,7 @@ def calculate_xy_gyro_params(gyro_x, gyro_y, acc_x, acc_y, acc_z, latitude):
         dict: Containing calculated inclination and azimuth
     """
     # Calculate gravity magnitude
-    g_total = math.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
+    g_total = math.hypot(acc_x, acc_y, acc_z)
     
     # Calculate inclination from accelerometer readings
     # Using formula: I = arctan[√(Ax² + Ay²) / Az]
@@ -110,8 +109,9 @@ def calculate_xy_gyro_params(gyro_x, gyro_y, acc_x, acc_y, acc_z, latitude):
         toolface = 0.0  # Default value
     
     # Calculate Earth rotation components
-    earth_rotation_horizontal = EARTH_ROTATION_RATE * math.cos(math.radians(latitude))
-    earth_rotation_vertical = EARTH_ROTATION_RATE * math.sin(math.radians(latitude))
+    lat_rad = math.radians(latitude)
+    earth_rotation_horizontal = EARTH_ROTATION_RATE * math.cos(lat_rad)
+    earth_rotation_vertical = EARTH_ROTATION_RATE * math.sin(lat_rad)
     
     # Calculate azimuth for xy gyro
     # Using formula: A = arctan[(Gx cos TF - Gy sin TF)cos I / (Gx sin TF + Gy cos TF + Ωv sin I)]
@@ -157,7 +157,7 @@ def calculate_xyz_gyro_params(gyro_x, gyro_y, gyro_z, acc_x, acc_y, acc_z, latit
         dict: Containing calculated inclination, azimuth and toolface
     """
     # Calculate gravity magnitude
-    g_total = math.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
+    g_total = math.hypot(acc_x, acc_y, acc_z)
     
     # Calculate Earth rotation vector components
     lat_rad = math.radians(latitude)
@@ -168,7 +168,7 @@ def calculate_xyz_gyro_params(gyro_x, gyro_y, gyro_z, acc_x, acc_y, acc_z, latit
     earth_rotation_total = EARTH_ROTATION_RATE  # Always constant
     
     # Calculate gyro total
-    gyro_total = math.sqrt(gyro_x**2 + gyro_y**2 + gyro_z**2)
+    gyro_total = math.hypot(gyro_x, gyro_y, gyro_z)
     
     # Calculate inclination from accelerometer readings
     # Using formula: I = arctan[√(Ax² + Ay²) / Az]
@@ -219,5 +219,5 @@ def calculate_xyz_gyro_params(gyro_x, gyro_y, gyro_z, acc_x, acc_y, acc_z, latit
         "earth_rotation_vertical": float(earth_rotation_vertical),
         "earth_rotation_total": float(earth_rotation_total),
         "gravity_total": float(g_total),
-        "dip": float(math.degrees(math.atan2(gyro_z, math.sqrt(gyro_x**2 + gyro_y**2))))
+        "dip": float(math.degrees(math.atan2(gyro_z, math.hypot(gyro_x, gyro_y))))
     }
\ No newline at end of file
@@ -1,6 +1,5 @@
 # blueprints/qc/test_generator.py
 from flask import Blueprint, request, jsonify
-import numpy as np
 
 test_generator_bp = Blueprint('test_generator', __name__)
 
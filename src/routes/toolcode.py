@@ -1,47 +1,76 @@
 # blueprints/toolcode.py
+import io
+import mmap
+import msgspec
 from flask import Blueprint, request, jsonify
+from src.models.qc_requests import ParseIPMRequest, ErrorTermRequest, decode_request
+from src.utils.ipm_cache import parse_ipm_file_cached
 from src.utils.ipm_parser import parse_ipm_file
 
-toolcode_bp = Blueprint('toolcode', __name__)
+toolcode_bp = Blueprint('toolcode', __name__, url_prefix='/api/v1/toolcode')
 
 @toolcode_bp.route('/parse-ipm', methods=['POST'])
 def parse_ipm():
-    """Parse and return the contents of an IPM file"""
-    data = request.get_json()
-    
-    if 'ipm_content' not in data:
-        return jsonify({'error': 'IPM content is required'}), 400
+    """
+    Parse and return the contents of an IPM file.
+
+    Accepts either JSON ``{"ipm_content": "..."}`` or a multipart upload with
+    the file in the ``ipm`` field; uploads are parsed line by line straight
+    from the (mmap-ed) file instead of being loaded as one string.
+    """
+    if 'ipm' in request.files:
+        try:
+            ipm = _parse_uploaded_ipm(request.files['ipm'])
+        except Exception as e:
+            return jsonify({'error': f'Failed to parse IPM file: {str(e)}'}), 400
+        return _ipm_response(ipm)
+
+    try:
+        req = decode_request(request.get_data(cache=False), ParseIPMRequest)
+    except msgspec.DecodeError as e:
+        return jsonify({'error': f'Invalid parse-ipm request: {str(e)}'}), 400
     
     try:
-        ipm = parse_ipm_file(data['ipm_content'])
-        
-        # Create a response using the to_dict() method but handle missing attributes
-        response = {
-            'short_name': getattr(ipm, 'short_name', ""),
-            'description': getattr(ipm, 'description', ""),
-            'error_terms': ipm.error_terms
-        }
-        
-        return jsonify(response)
+        ipm = parse_ipm_file_cached(req.ipm_content)
+        return _ipm_response(ipm)
     except Exception as e:
         return jsonify({'error': f'Failed to parse IPM file: {str(e)}'}), 400
+
+def _ipm_response(ipm):
+    # Create a response using the to_dict() method but handle missing attributes
+    response = {
+        'short_name': getattr(ipm, 'short_name', ""),
+        'description': getattr(ipm, 'description', ""),
+        'error_terms': ipm.error_terms
+    }
+    
+    return jsonify(response)
+
+def _parse_uploaded_ipm(file):
+    """Parse an uploaded IPM file without materialising its content."""
+    try:
+        fileno = file.stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        # Small uploads are kept in memory by Werkzeug – iterate the buffer
+        file.stream.seek(0)
+        return parse_ipm_file(file.stream)
+
+    if file.stream.seek(0, io.SEEK_END) == 0:
+        return parse_ipm_file(())   # mmap cannot map an empty file
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mm:
+        return parse_ipm_file(iter(mm.readline, b''))
     
 @toolcode_bp.route('/error-term', methods=['POST'])
 def get_error_term():
     """Get a specific error term from an IPM file"""
-    data = request.get_json()
-    
-    if 'ipm_content' not in data:
-        return jsonify({'error': 'IPM content is required'}), 400
-    if 'name' not in data:
-        return jsonify({'error': 'Error term name is required'}), 400
-    
-    vector = data.get('vector', '')
-    tie_on = data.get('tie_on', '')
+    try:
+        req = decode_request(request.get_data(cache=False), ErrorTermRequest)
+    except msgspec.DecodeError as e:
+        return jsonify({'error': f'Invalid error-term request: {str(e)}'}), 400
     
     try:
-        ipm = parse_ipm_file(data['ipm_content'])
-        error_term = ipm.get_error_term(data['name'], vector, tie_on)
+        ipm = parse_ipm_file_cached(req.ipm_content)
+        error_term = ipm.get_error_term(req.name, req.vector, req.tie_on)
         
         if error_term:
             return jsonify(error_term)
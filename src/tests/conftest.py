@@ -0,0 +1,103 @@
+# src/tests/conftest.py
+"""
+Shared fixtures for the unit tests: a small IPM and synthetic survey
+stations generated from a known tool orientation (SI units).
+
+The scripts under ``integration/`` drive a live server and plot the result,
+so they are run by hand rather than collected.
+"""
+import math
+import random
+
+import pytest
+
+from src.calculators.survey_qc_tests._kernels import HAVE_NUMBA
+
+collect_ignore_glob = ["integration/*"]
+
+IPM_TEXT = """#ShortName:MWD rev 3
+#Description:Unit test tool
+ABXY-TI1S e s m/s2 0.0039
+ABXY-TI1S i s m/s2 0.0039
+ABZ e s m/s2 0.0039
+ABZ i s m/s2 0.0039
+ASXY-TI1S e s - 0.0005
+ASXY-TI1S i s - 0.0005
+ASZ e s - 0.0005
+ASZ i s - 0.0005
+MBX e s nT 70
+MBY e s nT 70
+MBZ e s nT 70
+MSX e s - 0.0016
+MSY e s - 0.0016
+MSZ e s - 0.0016
+MFI e s nT 130
+MDI e s deg 0.2
+GBX e s deg/hr 0.1
+GBY e s deg/hr 0.1
+GBX i s deg/hr 0.1
+GBY i s deg/hr 0.1
+GSX e s - 0.001
+GSY e s - 0.001
+GSX i s - 0.001
+GSY i s - 0.001
+M e s deg/hr 0.1
+Q e s deg/hr 0.1
+M i s deg/hr 0.1 abs(sin(inc))
+Q i s deg/hr 0.1
+GR e s deg/hr 0.05
+GR i s deg/hr 0.05
+"""
+
+G = 9.80665
+BT, DIP, LAT = 50000.0, 70.0, 60.0
+EARTH_RATE = 15.041067
+
+# `HAVE_NUMBA` values to run a batch calculator under: the compiled kernels
+# and the NumPy expressions used when Numba is not installed
+KERNEL_PATHS = [
+    pytest.param(True, id="numba", marks=pytest.mark.skipif(
+        not HAVE_NUMBA, reason="Numba not installed")),
+    pytest.param(False, id="numpy"),
+]
+
+
+def make_station(i, n=20, noise=True, g_units=False):
+    """Station *i* of *n* along a build-and-turn well, with sensor noise."""
+    rnd = random.Random(i)
+    inc = 10 + 70 * i / (n - 1)
+    tf = (i * 97.0) % 360
+    az = (i * 53.0 + 20) % 360
+    I, T, A, D = map(math.radians, (inc, tf, az, DIP))
+    e = (lambda: rnd.uniform(-1, 1)) if noise else (lambda: 0.0)
+    g = 1.0 if g_units else G
+    gx, gy, gz = g * math.sin(I) * math.sin(T), g * math.sin(I) * math.cos(T), g * math.cos(I)
+    bx = BT * (math.sin(I) * math.cos(A) * math.cos(D) - math.sin(D) * math.sin(A))
+    by = BT * (math.sin(I) * math.sin(A) * math.cos(D) + math.sin(D) * math.cos(A))
+    bz = BT * (math.cos(I) * math.cos(D) + math.sin(I) * math.sin(D))
+    h = EARTH_RATE * math.cos(math.radians(LAT))
+    return {
+        "accelerometer_x": gx + 0.001 * g / G * e(), "accelerometer_y": gy + 0.001 * g / G * e(),
+        "accelerometer_z": gz + 0.001 * g / G * e(),
+        "mag_x": bx + 10 * e(), "mag_y": by + 10 * e(), "mag_z": bz + 10 * e(),
+        "gyro_x": h * math.cos(T) + 0.01 * e(), "gyro_y": h * math.sin(T) + 0.01 * e(),
+        "inclination": inc, "toolface": tf, "azimuth": az, "latitude": LAT,
+        "depth": 1000 + 30 * i, "expected_gravity": g,
+        "expected_geomagnetic_field": {"total_field": BT, "dip": DIP, "declination": 1.0},
+    }
+
+
+@pytest.fixture
+def ipm_text():
+    return IPM_TEXT
+
+
+@pytest.fixture
+def surveys():
+    return [make_station(i) for i in range(20)]
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+    return create_app(bundle="internal").test_client()
@@ -0,0 +1,140 @@
+# src/tests/test_get_batch.py
+"""`perform_get_batch` against the per-station `perform_get`."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.calculators.survey_qc_tests import get_batch
+from src.calculators.survey_qc_tests.get import perform_get
+from src.calculators.survey_qc_tests.get_batch import perform_get_batch
+from src.models.survey_batch import SurveyBatch
+from src.tests.conftest import KERNEL_PATHS, make_station
+
+_FIELDS = ("accelerometer_x", "accelerometer_y", "accelerometer_z",
+           "inclination", "toolface", "expected_gravity")
+
+
+def _columns(surveys, fields=_FIELDS):
+    return {f: np.array([s[f] for s in surveys]) for f in fields}
+
+
+def _assert_matches_scalar(out, surveys, ipm_text):
+    for k, s in enumerate(surveys):
+        ref = perform_get(s, ipm_text, None)
+        assert out["measured_gravity"][k] == pytest.approx(ref["measurements"]["gravity"], rel=1e-12)
+        assert out["gravity_error"][k] == pytest.approx(ref["errors"]["gravity"], rel=1e-9)
+        assert out["tolerance"][k] == pytest.approx(ref["tolerances"]["gravity"], rel=1e-9)
+        assert bool(out["is_valid"][k]) == ref["is_valid"]
+        assert out["calculated_inclination"][k] == pytest.approx(
+            ref["details"]["calculated_inclination"], rel=1e-12)
+
+
+@pytest.fixture
+def mixed_surveys(surveys):
+    # a provided inclination under 3° selects the "e" IPM rows; a noisy
+    # station fails the test
+    vertical = make_station(0)
+    vertical["inclination"] = 2.0
+    bad = make_station(5)
+    bad["accelerometer_z"] += 0.5
+    return surveys + [vertical, bad]
+
+
+@pytest.mark.parametrize("have_numba", KERNEL_PATHS)
+def test_provided_angles_match_scalar(monkeypatch, mixed_surveys, ipm_text, have_numba):
+    monkeypatch.setattr(get_batch, "HAVE_NUMBA", have_numba)
+    out = perform_get_batch(_columns(mixed_surveys), ipm_text)
+    _assert_matches_scalar(out, mixed_surveys, ipm_text)
+    assert not out["is_valid"].all()
+
+
+@pytest.mark.parametrize("have_numba", KERNEL_PATHS)
+def test_derived_angles_match_scalar(monkeypatch, ipm_text, have_numba):
+    # no inclination/toolface columns: both come from the accelerometers
+    monkeypatch.setattr(get_batch, "HAVE_NUMBA", have_numba)
+    surveys = [make_station(i) for i in range(1, 20)]
+    fields = ("accelerometer_x", "accelerometer_y", "accelerometer_z", "expected_gravity")
+    out = perform_get_batch(_columns(surveys, fields), ipm_text)
+    stripped = [{f: s[f] for f in fields} for s in surveys]
+    _assert_matches_scalar(out, stripped, ipm_text)
+    np.testing.assert_allclose(
+        out["calculated_toolface"],
+        [perform_get(s, ipm_text, None)["details"]["calculated_toolface"] for s in stripped],
+        rtol=1e-12)
+
+
+def test_survey_batch_input_matches_dicts(surveys, ipm_text):
+    from_dicts = perform_get_batch(_columns(surveys), ipm_text)
+    from_batch = perform_get_batch(SurveyBatch.from_surveys(surveys), ipm_text)
+    for key, value in from_dicts.items():
+        np.testing.assert_array_equal(from_batch[key], value)
+
+
+@pytest.mark.parametrize("have_numba", KERNEL_PATHS)
+def test_formula_sigmas_match_scalar(monkeypatch, mixed_surveys, ipm_text, have_numba):
+    # a formula row rules out the constant table, so the sigmas are
+    # evaluated per station and the variance comes from `get_var_batch_kernel`
+    monkeypatch.setattr(get_batch, "HAVE_NUMBA", have_numba)
+    ipm_text = ipm_text.replace("ABZ i s m/s2 0.0039", "ABZ i s m/s2 0.0039 abs(cos(inc))")
+    out = perform_get_batch(_columns(mixed_surveys), ipm_text)
+    _assert_matches_scalar(out, mixed_surveys, ipm_text)
+
+
+@pytest.mark.skipif(not get_batch.HAVE_NUMBA, reason="Numba not installed")
+def test_fused_kernel_matches_numpy(monkeypatch, surveys, ipm_text):
+    # constant sigmas take the single `get_batch_kernel` pass; a vertical
+    # station without a toolface column must come out NaN on both paths
+    vertical = make_station(0)
+    vertical.update(accelerometer_x=0.01, accelerometer_y=0.02, accelerometer_z=9.8)
+    fields = ("accelerometer_x", "accelerometer_y", "accelerometer_z", "expected_gravity")
+    soa = _columns(surveys + [vertical], fields)
+
+    calls = []
+    kernel = get_batch.get_batch_kernel
+    monkeypatch.setattr(get_batch, "get_batch_kernel",
+                        lambda *a: calls.append(1) or kernel(*a))
+    fused = perform_get_batch(soa, ipm_text)
+    assert calls
+
+    monkeypatch.setattr(get_batch, "HAVE_NUMBA", False)
+    plain = perform_get_batch(soa, ipm_text)
+    for key, value in plain.items():
+        np.testing.assert_allclose(fused[key], value, rtol=1e-9, atol=1e-12, err_msg=key)
+    assert np.isnan(fused["calculated_toolface"][-1])
+
+
+_CUDASIM_SCRIPT = """
+import numpy as np
+from src.calculators.survey_qc_tests import _cuda, get_batch
+from src.calculators.survey_qc_tests.get_batch import perform_get_batch
+from src.tests.conftest import IPM_TEXT, make_station
+from src.tests.test_get_batch import _columns
+
+assert _cuda.use_gpu(1)
+calls = []
+gpu = get_batch.get_batch_gpu
+get_batch.get_batch_gpu = lambda *a: calls.append(1) or gpu(*a)
+surveys = [make_station(i) for i in range(20)]
+soa = _columns(surveys)
+on_gpu = perform_get_batch(soa, IPM_TEXT)
+assert calls
+_cuda.GPU_MIN_STATIONS = 10 ** 9
+on_cpu = perform_get_batch(soa, IPM_TEXT)
+for key, value in on_cpu.items():
+    np.testing.assert_allclose(on_gpu[key], value, rtol=1e-9, atol=1e-12, err_msg=key)
+"""
+
+
+@pytest.mark.skipif(not get_batch.HAVE_NUMBA, reason="Numba not installed")
+def test_cuda_kernel_matches_cpu_kernel():
+    # the CUDA simulator has to be switched on before Numba is imported,
+    # so the comparison runs in a fresh interpreter
+    root = Path(__file__).resolve().parents[2]
+    env = dict(os.environ, NUMBA_ENABLE_CUDASIM="1", QC_GPU_MIN_STATIONS="1")
+    proc = subprocess.run([sys.executable, "-c", _CUDASIM_SCRIPT], cwd=root,
+                          env=env, capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr
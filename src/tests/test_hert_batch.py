@@ -0,0 +1,55 @@
+# src/tests/test_hert_batch.py
+"""`perform_hert_batch` against the per-station `perform_hert`."""
+import numpy as np
+import pytest
+
+from src.calculators.survey_qc_tests import hert_batch
+from src.calculators.survey_qc_tests.hert import perform_hert
+from src.calculators.survey_qc_tests.hert_batch import perform_hert_batch
+from src.models.survey_batch import SurveyBatch
+from src.tests.conftest import KERNEL_PATHS, make_station
+
+_FIELDS = ("gyro_x", "gyro_y", "inclination", "azimuth", "latitude")
+
+
+def _columns(surveys):
+    return {f: np.array([s[f] for s in surveys]) for f in _FIELDS}
+
+
+@pytest.fixture
+def mixed_surveys(surveys):
+    # 2.5° is inside 3°: HERT is undefined there; 3.0° is the first defined
+    # inclination and takes the "e" rows; a drifting gyro fails the test
+    vertical, edge, bad = make_station(0), make_station(1), make_station(7)
+    vertical["inclination"] = 2.5
+    edge["inclination"] = 3.0
+    bad["gyro_x"] += 5.0
+    return surveys + [vertical, edge, bad]
+
+
+@pytest.mark.parametrize("have_numba", KERNEL_PATHS)
+def test_matches_scalar(monkeypatch, mixed_surveys, ipm_text, have_numba):
+    monkeypatch.setattr(hert_batch, "HAVE_NUMBA", have_numba)
+    out = perform_hert_batch(_columns(mixed_surveys), ipm_text)
+    for k, s in enumerate(mixed_surveys):
+        ref = perform_hert(s, ipm_text)
+        if "error" in ref:
+            assert np.isnan(out["tolerance"][k]) and not out["is_valid"][k]
+            continue
+        assert out["measured_horizontal_rate"][k] == pytest.approx(
+            ref["measurements"]["horizontal_rate"], rel=1e-12)
+        assert out["horizontal_rate_error"][k] == pytest.approx(
+            ref["errors"]["horizontal_rate"], rel=1e-9)
+        assert out["tolerance"][k] == pytest.approx(ref["tolerances"]["horizontal_rate"], rel=1e-9)
+        assert bool(out["is_valid"][k]) == ref["is_valid"]
+        np.testing.assert_allclose((out["w_gbx"][k], out["w_gby"][k]),
+                                   ref["details"]["weighting_functions"], rtol=1e-12)
+    assert np.isnan(out["tolerance"][-3])
+    assert not out["is_valid"][-1]
+
+
+def test_survey_batch_input_matches_dicts(surveys, ipm_text):
+    from_dicts = perform_hert_batch(_columns(surveys), ipm_text)
+    from_batch = perform_hert_batch(SurveyBatch.from_surveys(surveys), ipm_text)
+    for key, value in from_dicts.items():
+        np.testing.assert_array_equal(from_batch[key], value)
@@ -0,0 +1,24 @@
+# src/tests/test_ipm_values.py
+"""`IPMFile.get_values` against the per-term `get_error_term_value` lookup."""
+import pytest
+
+from src.calculators.survey_qc_tests.get import _get_error_term_values
+from src.utils.ipm_parser import parse_ipm_file
+from src.utils.tolerance import get_error_term_value
+
+
+@pytest.mark.parametrize("vec", ["e", "i"])
+def test_batched_values_match_term_lookup(ipm_text, vec):
+    ipm = parse_ipm_file(ipm_text)
+    names = ["ABXY-TI1S", "ABZ", "ASXY-TI1S", "ASZ", "MBX", "GBX", "NOPE"]
+    batched = ipm.get_values(names, vec, "s").tolist()
+    assert batched == [get_error_term_value(ipm, n, vec, "s") for n in names]
+
+
+def test_sigmas_are_reported_unrounded(ipm_text):
+    ipm = parse_ipm_file(ipm_text)
+    names = ("ABXY-TI1S", "ABZ", "ASXY-TI1S", "ASZ")
+    sigmas = _get_error_term_values(ipm, names, "e", "s")
+    # the canonical (unit-converted) value of each term, bit for bit
+    assert sigmas == [ipm.get_error_term(n, "e", "s")["value"] for n in names]
+    assert sigmas[2:] == [0.0005, 0.0005]
@@ -0,0 +1,26 @@
+# src/tests/test_msat.py
+"""MSAT input handling: list-of-dicts and column-wise input agree."""
+import numpy as np
+import pytest
+
+from src.calculators.survey_qc_tests.msat import perform_msat
+from src.models.survey_batch import SurveyBatch
+
+_FIELDS = ("accelerometer_x", "accelerometer_y", "accelerometer_z",
+           "inclination", "toolface", "expected_gravity")
+
+
+@pytest.mark.parametrize("n", [3, 9])
+def test_short_survey_fails_on_count_before_fields(ipm_text, n):
+    short = [{"inclination": 10.0}] * n          # also missing the sensor fields
+    expected = "At least 10 survey stations are required for MSAT"
+    assert perform_msat(short, ipm_text)["error"] == expected
+    columns = {"inclination": np.full(n, 10.0)}
+    assert perform_msat(columns, ipm_text)["error"] == expected
+
+
+def test_column_input_matches_dicts(surveys, ipm_text):
+    ref = perform_msat(surveys, ipm_text)
+    columns = {f: np.array([s[f] for s in surveys]) for f in _FIELDS}
+    assert perform_msat(columns, ipm_text) == ref
+    assert perform_msat(SurveyBatch.from_surveys(surveys), ipm_text) == ref
@@ -0,0 +1,71 @@
+# src/tests/test_mse.py
+"""MSE Numba kernels against the NumPy forward model and LM loop."""
+import numpy as np
+import pytest
+
+from src.calculators.survey_qc_tests import mse
+from src.tests.conftest import make_station
+
+pytestmark = pytest.mark.skipif(not mse.HAVE_NUMBA, reason="Numba not installed")
+
+_PNAMES = ['MBX', 'MBY', 'MBZ', 'MSX', 'MSY', 'MSZ', 'ABX', 'ABY', 'ABZ', 'ASX', 'ASY']
+
+
+@pytest.fixture
+def g_surveys():
+    return [make_station(i, g_units=True) for i in range(20)]
+
+
+@pytest.fixture
+def problem(g_surveys):
+    """(x, y, field, grav, cols) as `perform_mse` builds them, x perturbed."""
+    ns = len(g_surveys)
+    cols = mse.stack_fields(g_surveys, mse._MSE_FIELDS)
+    x = np.zeros(ns * 3 + len(_PNAMES))
+    x[:ns * 3] = np.radians(cols[:, 0:3]).ravel()
+    x += np.random.default_rng(0).normal(0.0, 1e-3, x.shape)
+    dip = np.radians(55.0 + np.arange(ns))
+    field = (np.full(ns, 50000.0), np.sin(dip), np.cos(dip))
+    grav = np.ascontiguousarray(cols[:, 9])
+    return x, cols[:, 3:9].ravel(), field, grav, mse._term_columns(ns, _PNAMES)
+
+
+def _both(monkeypatch, fn, *args):
+    compiled = fn(*args)
+    monkeypatch.setattr(mse, "HAVE_NUMBA", False)
+    plain = fn(*args)
+    monkeypatch.setattr(mse, "HAVE_NUMBA", True)
+    return compiled, plain
+
+
+def test_predict_and_jacobian_kernels_match_numpy(monkeypatch, problem):
+    x, _, field, grav, cols = problem
+    compiled, plain = _both(monkeypatch, mse._predict, x, field, grav, cols)
+    np.testing.assert_allclose(compiled, plain, rtol=1e-12, atol=1e-9)
+    compiled, plain = _both(monkeypatch, mse._jacobian, x, field, grav, cols)
+    for got, want in zip(compiled, plain):
+        np.testing.assert_allclose(got, want, rtol=1e-12, atol=1e-9)
+
+
+def test_lm_kernel_matches_levenberg_marquardt(monkeypatch, problem):
+    compiled, plain = _both(monkeypatch, mse._levenberg_marquardt, *problem)
+    x, cost, it, converged, N = compiled
+    np.testing.assert_allclose(x, plain[0], rtol=1e-9, atol=1e-12)
+    assert cost == pytest.approx(plain[1], rel=1e-9)
+    assert (it, converged) == plain[2:4]
+    assert len(N) == len(plain[4])
+    for got, want in zip(N, plain[4]):
+        np.testing.assert_allclose(got, want, rtol=1e-7, atol=1e-12)
+
+
+def test_perform_mse_matches_numpy(monkeypatch, g_surveys, ipm_text):
+    compiled, plain = _both(monkeypatch, mse.perform_mse, g_surveys, ipm_text)
+    assert compiled["details"] == plain["details"]
+    for stat in ("converged", "iterations"):
+        assert compiled["statistics"][stat] == plain["statistics"][stat]
+    # MBZ/MSZ are near-collinear here (correlation ~0.9997), so fastmath
+    # rounding moves them by ~1e-7 of their value; judge that against σ
+    for name, term in plain["error_parameters"].items():
+        got = compiled["error_parameters"][name]
+        assert got["value"] == pytest.approx(term["value"], abs=1e-6 * term["std_dev"])
+        assert got["std_dev"] == pytest.approx(term["std_dev"], rel=1e-6)
@@ -0,0 +1,36 @@
+# src/tests/test_msgt.py
+"""MSGT input handling and the least-squares estimates."""
+import numpy as np
+
+from src.calculators.survey_qc_tests.msgt import perform_msgt
+
+_FIELDS = ("gyro_x", "gyro_y", "inclination", "azimuth", "toolface", "latitude")
+
+
+def test_short_survey_fails_on_count_before_fields(ipm_text):
+    short = [{"inclination": 10.0}] * 9
+    assert perform_msgt(short, ipm_text)["error"] == \
+        "At least 10 survey stations are required for MSGT"
+
+
+def test_column_input_matches_dicts(surveys, ipm_text):
+    columns = {f: np.array([s[f] for s in surveys]) for f in _FIELDS}
+    assert perform_msgt(columns, ipm_text) == perform_msgt(surveys, ipm_text)
+
+
+def test_estimates_match_lstsq_on_near_constant_azimuth(surveys, ipm_text):
+    # a 0.01° azimuth spread leaves A nearly rank 3; the estimates must
+    # still be the plain least-squares solution, not a ridge-biased one
+    for i, s in enumerate(surveys):
+        s["azimuth"] = 45.0 + 0.01 * i / (len(surveys) - 1)
+    out = perform_msgt(surveys, ipm_text)
+
+    inc = np.radians([s["inclination"] for s in surveys])
+    azm = np.radians([s["azimuth"] for s in surveys])
+    si, ci, sa, ca = np.sin(inc), np.cos(inc), np.sin(azm), np.cos(azm)
+    A = np.column_stack((ci * ca + sa / si, ci * sa - ca / si, -ci * ca, ci * sa))
+    h = np.hypot([s["gyro_x"] for s in surveys], [s["gyro_y"] for s in surveys])
+    dO = h - 15.041067 * np.cos(np.radians([s["latitude"] for s in surveys]))
+    X = np.linalg.lstsq(A, dO, rcond=None)[0]
+    got = [out["measurements"][k] for k in ("GBX*", "GBY*", "M", "Q")]
+    np.testing.assert_allclose(got, X, rtol=1e-9)
@@ -0,0 +1,99 @@
+# src/tests/test_qc_cache.py
+"""`cached_qc` hit/miss behaviour, with an in-memory stand-in for Redis."""
+import orjson
+import pytest
+
+from src.tests.conftest import make_station
+import src.utils.qc_cache as qc_cache
+
+
+class FakeRedis:
+    """The slice of the redis-py client `cached_qc` uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(qc_cache, "get_client", lambda: fake)
+    return fake
+
+
+def _post(client, path, payload):
+    return client.post(path, data=orjson.dumps(payload), content_type="application/json")
+
+
+@pytest.mark.parametrize("path, g_units", [
+    ("/api/v1/qc/multi-station/msgt", False),
+    ("/api/v1/qc/multi-station/msmt", False),
+    ("/api/v1/qc/multi-station/mse", True),
+])
+def test_miss_then_hit_matches_uncached(client, fake_redis, monkeypatch, ipm_text, path, g_units):
+    payload = {"surveys": [make_station(i, g_units=g_units) for i in range(20)], "ipm": ipm_text}
+
+    miss = _post(client, path, payload)
+    assert miss.status_code == 200, miss.data
+    assert len(fake_redis.store) == 1
+
+    hit = _post(client, path, payload)
+    assert hit.status_code == 200
+    assert hit.data == miss.data
+    assert len(fake_redis.store) == 1
+
+    monkeypatch.setattr(qc_cache, "get_client", lambda: None)
+    uncached = _post(client, path, payload)
+    assert orjson.loads(uncached.data) == orjson.loads(miss.data)
+
+
+def test_mse_bad_request_with_cache_enabled(client, fake_redis, ipm_text):
+    resp = _post(client, "/api/v1/qc/multi-station/mse", {"surveys": [], "ipm": ipm_text})
+    assert resp.status_code == 400
+    assert "Invalid MSE request" in orjson.loads(resp.data)["error"]
+    assert not fake_redis.store
+
+    resp = client.post("/api/v1/qc/multi-station/mse", data=b"{bad", content_type="application/json")
+    assert resp.status_code == 400
+    assert not fake_redis.store
+
+
+def test_malformed_json_is_not_cached(client, fake_redis):
+    resp = client.post("/api/v1/qc/multi-station/msgt", data=b"{bad", content_type="application/json")
+    assert resp.status_code == 400
+    assert not fake_redis.store
+
+
+def test_key_carries_version(monkeypatch):
+    key = qc_cache.cache_key("get", {"b": 1, "a": 2})
+    assert key.startswith(f"qc:{qc_cache.CACHE_VERSION}:get:")
+    assert key == qc_cache.cache_key("get", {"a": 2, "b": 1})
+    monkeypatch.setenv("QC_CACHE_VERSION", "next")
+    assert qc_cache.cache_key("get", {"a": 2, "b": 1}).startswith("qc:next:get:")
+
+
+def test_clear_requires_admin_token(client, monkeypatch):
+    deleted = []
+    monkeypatch.setattr("src.routes.qc_cache.get_client", lambda: object())
+    monkeypatch.setattr("src.routes.qc_cache.invalidate", lambda prefix: deleted.append(prefix) or 3)
+
+    monkeypatch.delenv("QC_CACHE_ADMIN_TOKEN", raising=False)
+    assert client.delete("/api/v1/qc/cache").status_code == 403
+
+    monkeypatch.setenv("QC_CACHE_ADMIN_TOKEN", "s3cret")
+    assert client.delete("/api/v1/qc/cache").status_code == 403
+    assert client.delete("/api/v1/qc/cache", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    assert not deleted
+
+    resp = client.delete("/api/v1/qc/cache?prefix=mse", headers={"Authorization": "Bearer s3cret"})
+    assert resp.status_code == 200
+    assert orjson.loads(resp.data) == {"enabled": True, "deleted": 3}
+    assert deleted == ["mse"]
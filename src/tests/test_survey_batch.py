@@ -0,0 +1,34 @@
+# src/tests/test_survey_batch.py
+"""`SurveyBatch` construction and its dict-style field access."""
+import numpy as np
+import pytest
+
+from src.models.survey_batch import SurveyBatch
+
+
+def test_station_major_input_with_n_equal_to_axes():
+    acc = np.array([[1.0, 2.0, 3.0],
+                    [4.0, 5.0, 6.0],
+                    [7.0, 8.0, 9.0]])         # 3 stations
+    gyro = np.array([[1.0, 2.0],
+                     [3.0, 4.0]])             # 2 stations (shape only)
+    batch = SurveyBatch(acc, gyro=gyro)
+    np.testing.assert_array_equal(batch["accelerometer_x"], [1.0, 4.0, 7.0])
+    np.testing.assert_array_equal(batch["accelerometer_z"], [3.0, 6.0, 9.0])
+    np.testing.assert_array_equal(batch["gyro_y"], [2.0, 4.0])
+    assert batch.acc.flags.c_contiguous and len(batch) == 3
+
+
+@pytest.mark.parametrize("shape", [(3, 5), (5,), (5, 2)])
+def test_rejects_non_station_major_acc(shape):
+    with pytest.raises(ValueError):
+        SurveyBatch(np.zeros(shape))
+
+
+def test_from_surveys_matches_dicts(surveys):
+    batch = SurveyBatch.from_surveys(surveys)
+    assert len(batch) == len(surveys)
+    for field in ("accelerometer_x", "accelerometer_y", "accelerometer_z",
+                  "gyro_x", "gyro_y", "inclination", "toolface", "latitude"):
+        np.testing.assert_array_equal(batch[field], [s[field] for s in surveys])
+    assert batch.get("mag_x") is None
@@ -0,0 +1,31 @@
+# src/utils/health.py
+"""
+WSGI-level health probe.
+
+Load balancers hit the health endpoint several times a second per instance.
+`HealthShortcut` answers those probes before Flask sees the request – no
+request context, URL matching or JSON provider – and hands everything else
+to the wrapped application unchanged.
+"""
+
+HEALTH_PATHS = frozenset(("/health", "/healthz"))
+
+_BODY = b'{"status":"healthy"}'
+_HEADERS = [
+    ("Content-Type", "application/json"),
+    ("Content-Length", str(len(_BODY))),
+]
+
+
+class HealthShortcut:
+    """Wrap a WSGI app and serve GET/HEAD health probes directly."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        if (environ.get("PATH_INFO") in HEALTH_PATHS
+                and environ.get("REQUEST_METHOD") in ("GET", "HEAD")):
+            start_response("200 OK", list(_HEADERS))
+            return [] if environ["REQUEST_METHOD"] == "HEAD" else [_BODY]
+        return self.app(environ, start_response)
@@ -6,14 +6,37 @@ from typing import Union, Optional
 from src.models.ipm import IPMFile
 from src.utils.ipm_parser import parse_ipm_file
 
-def _hash(text: str) -> str:
-    """Return a 40-char SHA-1 hex digest."""
-    return hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+def _digest(text: str) -> bytes:
+    """Return the 32-byte SHA-256 digest of *text*."""
+    return hashlib.sha256(text.encode("utf-8", "replace")).digest()
 
-@lru_cache(maxsize=128)                 # one object per unique key
-def _parse_cached(key: str, text: str) -> IPMFile:
-    # key is only here to make lru_cache key = (key, text_hash) unique
-    return parse_ipm_file(text)
+class _ContentKey:
+    """
+    lru_cache key that hashes and compares on the digest only.
+
+    The raw text rides along so a cache miss can parse it, but it never takes
+    part in hashing/equality – a hit costs one SHA-256 plus a dict lookup
+    instead of a full string comparison.
+    """
+    __slots__ = ("digest", "text")
+
+    def __init__(self, digest, text: str):
+        self.digest = digest
+        self.text = text
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, _ContentKey) and self.digest == other.digest
+
+@lru_cache(maxsize=256)                 # one object per unique key
+def _parse_cached(key: _ContentKey) -> IPMFile:
+    return parse_ipm_file(key.text)
+
+def parse_ipm_file_cached(content: str) -> IPMFile:
+    """Parse IPM text once per unique content (SHA-256) and reuse the result."""
+    return _parse_cached(_ContentKey(_digest(content), content))
 
 def get_ipm(ipm_data: Union[str, IPMFile], ipm_id: Optional[str] = None) -> IPMFile:
     """
@@ -39,8 +62,7 @@ def get_ipm(ipm_data: Union[str, IPMFile], ipm_id: Optional[str] = None) -> IPMF
         return ipm_data
 
     if ipm_id is None:
-        key = _hash(ipm_data)
-    else:
-        key = f"{ipm_id}:{_hash(ipm_data)}"   # protects against id-clashes
+        return parse_ipm_file_cached(ipm_data)
 
-    return _parse_cached(key, ipm_data)
\ No newline at end of file
+    key = (ipm_id, _digest(ipm_data))   # protects against id-clashes
+    return _parse_cached(_ContentKey(key, ipm_data))
@@ -4,7 +4,7 @@ Helper functions for consistent IPM handling across the codebase
 import logging
 from typing import Union, Dict, Any, List, Optional
 from src.models.ipm import IPMFile
-from src.utils.ipm_parser import parse_ipm_file
+from src.utils.ipm_cache import parse_ipm_file_cached
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ def prepare_ipm(ipm_data):
     
     if isinstance(ipm_data, str):
         try:
-            return parse_ipm_file(ipm_data)
+            return parse_ipm_file_cached(ipm_data)
         except Exception as e:
             logger.error(f"Error parsing IPM content: {e}")
             # Return minimal IPM to avoid cascading failures
@@ -0,0 +1,67 @@
+# src/utils/json_provider.py
+"""
+orjson-backed JSON handling for Flask.
+
+`OrjsonProvider` replaces Flask's stdlib-json provider so that
+`request.get_json()` and `jsonify()` go through orjson's C encoder/decoder,
+which also serialises NumPy arrays and scalars natively.
+"""
+import orjson
+from flask import g, request
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import BadRequest
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+_BODY_ATTR = "_json_body"  # decoded request body, see `load_json_body`
+_MISSING = object()
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider using orjson for both directions."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def json_response(obj, status: int = 200):
+    """Serialise *obj* straight to a JSON response tuple, bypassing jsonify."""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS), status, {"Content-Type": "application/json"}
+
+
+def load_json_body(silent: bool = False):
+    """
+    Decode the current request body with orjson.
+
+    Unlike `request.get_json()` the raw bytes are read with `cache=False`, so
+    Werkzeug does not keep them for the rest of the request.  The decoded
+    result is kept on `flask.g` instead, so a decorator (`cached_qc`) and the
+    view it wraps share one decode.  Malformed JSON raises `BadRequest`
+    (HTTP 400), or returns None when *silent* is true.
+    """
+    body = g.get(_BODY_ATTR, _MISSING)
+    if body is _MISSING:
+        try:
+            body = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError as e:
+            body = BadRequest(f"Failed to decode JSON object: {e}")
+        setattr(g, _BODY_ATTR, body)
+    if isinstance(body, BadRequest):
+        if silent:
+            return None
+        raise body
+    return body
+
+
+def loaded_json_body():
+    """
+    What `load_json_body` already decoded for this request – the JSON value,
+    or the `BadRequest` for malformed JSON – or `_MISSING` if it has not run.
+
+    Once it has run the raw bytes are consumed, so a handler that decodes
+    the body its own way (e.g. into a msgspec struct) must start from this.
+    """
+    return g.get(_BODY_ATTR, _MISSING)
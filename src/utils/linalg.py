@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.linalg.lapack import dpotrf, dpotri, dpotrs
 
 def safe_inverse(mat: np.ndarray, ridge: float = 1e-9) -> np.ndarray:
     """
@@ -18,4 +19,51 @@ def safe_inverse(mat: np.ndarray, ridge: float = 1e-9) -> np.ndarray:
             return np.linalg.inv(mat + ridge * 1e3 * eye)
         except np.linalg.LinAlgError as err:
             raise np.linalg.LinAlgError("Normal matrix singular – "
-                                        "survey geometry too weak") from err
\ No newline at end of file
+                                        "survey geometry too weak") from err
+
+def safe_spd_inverse(mat: np.ndarray, ridge: float = 1e-9) -> np.ndarray:
+    """
+    Return (mat + ridge*I)⁻¹ for a symmetric positive-definite *mat*.
+
+    Same contract as `safe_inverse`, but factors with Cholesky (LAPACK
+    potrf/potri) instead of a general LU – half the work, and a failed
+    factorisation flags a (numerically) singular normal matrix directly.
+
+    Raises
+    ------
+    np.linalg.LinAlgError
+        If the matrix is still not positive definite after regularisation.
+    """
+    n = mat.shape[0]
+    eye = np.eye(n, dtype=np.float64)
+    for r in (ridge, ridge * 1e3):
+        chol, info = dpotrf(mat + r * eye)
+        if info == 0:
+            inv, info = dpotri(chol)
+            if info == 0:
+                # potri fills the upper triangle only (the lower stays zero)
+                sym = inv + inv.T
+                sym.flat[::n + 1] = inv.flat[::n + 1]
+                return sym
+    raise np.linalg.LinAlgError("Normal matrix singular – "
+                                "survey geometry too weak")
+
+def spd_solve(mat: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Solve mat·x = rhs for a symmetric positive-definite *mat*.
+
+    Cholesky (LAPACK potrf/potrs) in place of the LU behind
+    `np.linalg.solve` – half the factorisation work.
+
+    Raises
+    ------
+    np.linalg.LinAlgError
+        If *mat* is not (numerically) positive definite.
+    """
+    chol, info = dpotrf(mat)
+    if info == 0:
+        x, info = dpotrs(chol, rhs)
+        if info == 0:
+            return x
+    raise np.linalg.LinAlgError("Normal matrix singular – "
+                                "survey geometry too weak")
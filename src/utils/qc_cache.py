@@ -0,0 +1,114 @@
+# src/utils/qc_cache.py
+"""
+Redis response cache for the idempotent QC endpoints.
+
+The QC handlers are pure functions of their JSON payload (survey + IPM), so
+a response can be reused for any byte-identical request.  `cached_qc` keys
+each response on ``qc:<version>:<prefix>:<sha256 of the key-sorted payload>``
+and stores the serialised body with a TTL.  The version comes from
+``QC_CACHE_VERSION`` (default `CACHE_VERSION`); bump it with any release that
+changes QC outputs so stale results are not served after a deploy.
+
+The cache is opt-in: it is active only when the `redis` package is installed
+and ``REDIS_URL`` is set.  Otherwise – or if Redis errors – the decorated
+view simply runs.
+"""
+import hashlib
+import logging
+import os
+from functools import wraps
+
+import orjson
+from flask import current_app
+
+from src.utils.json_provider import load_json_body
+
+try:
+    import redis  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    redis = None
+
+log = logging.getLogger(__name__)
+
+KEY_NAMESPACE = "qc"
+CACHE_VERSION = "1"  # bump when a QC calculator's output changes
+DEFAULT_TTL = 86400  # 1 day
+
+_client = None
+
+
+def get_client():
+    """Return the shared Redis client, or None when caching is disabled."""
+    global _client
+    if _client is None:
+        url = os.environ.get("REDIS_URL")
+        if redis is None or not url:
+            return None
+        _client = redis.Redis.from_url(url)
+    return _client
+
+
+def cache_key(prefix: str, payload) -> str:
+    """Deterministic cache key for a JSON payload."""
+    digest = hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    version = os.environ.get("QC_CACHE_VERSION", CACHE_VERSION)
+    return f"{KEY_NAMESPACE}:{version}:{prefix}:{digest}"
+
+
+def cached_qc(prefix: str, ttl: int = DEFAULT_TTL):
+    """
+    Cache successful (HTTP 200) JSON responses of a QC view in Redis.
+
+    Parameters
+    ----------
+    prefix : str
+        Short test name (``"get"``, ``"msat"`` …) used to namespace keys so
+        they can be invalidated per test.
+    ttl : int
+        Lifetime of a cached response in seconds.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            client = get_client()
+            # decoded once here; the view's own `load_json_body` reuses it
+            payload = load_json_body(silent=True) if client is not None else None
+            if payload is None:
+                return view(*args, **kwargs)
+
+            key = cache_key(prefix, payload)
+            try:
+                hit = client.get(key)
+            except redis.RedisError as e:
+                log.warning("QC cache read failed: %s", e)
+                return view(*args, **kwargs)
+            if hit is not None:
+                return hit, 200, {"Content-Type": "application/json"}
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                try:
+                    client.setex(key, ttl, response.get_data())
+                except redis.RedisError as e:
+                    log.warning("QC cache write failed: %s", e)
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(prefix: str | None = None) -> int:
+    """Delete cached responses for *prefix* (all QC tests if None), any version."""
+    client = get_client()
+    if client is None:
+        return 0
+    pattern = f"{KEY_NAMESPACE}:*:{prefix}:*" if prefix else f"{KEY_NAMESPACE}:*"
+    deleted = 0
+    batch = []
+    for key in client.scan_iter(match=pattern, count=500):
+        batch.append(key)
+        if len(batch) >= 500:
+            deleted += client.delete(*batch)
+            batch.clear()
+    if batch:
+        deleted += client.delete(*batch)
+    return deleted
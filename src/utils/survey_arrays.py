@@ -0,0 +1,66 @@
+# src/utils/survey_arrays.py
+"""
+Helpers for turning a list of survey dicts into NumPy columns.
+
+The multi-station tests receive stations as a list of dicts (one per
+station).  Pulling every field out with its own list comprehension walks the
+list once per field; `stack_fields` does a single pass with `np.fromiter`
+and hands back an (N, k) float64 block whose columns feed the vectorised
+QC maths directly.
+"""
+from typing import Mapping, Sequence
+
+import numpy as np
+
+
+def stack_fields(surveys: Sequence[dict], fields: Sequence[str]) -> np.ndarray:
+    """Return an (N, len(fields)) float64 array of *fields* for every station."""
+    n, k = len(surveys), len(fields)
+    flat = np.fromiter((s[f] for s in surveys for f in fields),
+                       dtype=np.float64, count=n * k)
+    return flat.reshape(n, k)
+
+
+def station_count(surveys) -> int:
+    """
+    Number of stations in *surveys*, without extracting any field.
+
+    Works for every form `survey_columns` accepts; for a dict of arrays that
+    is the length of its columns (``len`` of the dict would count fields).
+    """
+    if isinstance(surveys, Mapping):
+        return len(next(iter(surveys.values()), ()))
+    return len(surveys)
+
+
+def survey_columns(surveys, fields: Sequence[str]) -> np.ndarray:
+    """
+    Return a C-contiguous (len(fields), N) float64 block, one row per field.
+
+    *surveys* is either the usual list of station dicts or column-indexable
+    per-station data: a dict of arrays, a `SurveyBatch` or a structured
+    ndarray.  Unpacking the block gives one contiguous array per field.
+    """
+    if isinstance(surveys, Sequence):
+        return np.ascontiguousarray(stack_fields(surveys, fields).T)
+    return np.stack([np.asarray(surveys[f], dtype=np.float64) for f in fields])
+
+
+def station_dicts(surveys, fields: Sequence[str]) -> Sequence[dict]:
+    """
+    *surveys* as a list of station dicts.
+
+    A list of dicts is returned unchanged; column-indexable input (see
+    `survey_columns`) is split into one dict per station holding those of
+    *fields* it carries, as plain Python floats.
+    """
+    if isinstance(surveys, Sequence):
+        return surveys
+    present = []
+    for f in fields:
+        try:
+            present.append((f, np.asarray(surveys[f], dtype=np.float64).tolist()))
+        except (KeyError, ValueError):
+            continue
+    names = [f for f, _ in present]
+    return [dict(zip(names, row)) for row in zip(*(col for _, col in present))]
@@ -31,8 +31,8 @@ def get_error_term_value(ipm_data,
 
     # --- ensure we have an IPMFile object ---------------------------------
     if isinstance(ipm_data, str):
-        from .ipm_parser import parse_ipm_file
-        ipm_data = parse_ipm_file(ipm_data)
+        from .ipm_cache import parse_ipm_file_cached
+        ipm_data = parse_ipm_file_cached(ipm_data)
 
     # --- try common name variants ----------------------------------------
     variants = {
@@ -54,10 +54,10 @@ def get_error_term_value(ipm_data,
             continue
 
         sigma = term.get("value", 0.0)
-        formula = (term.get("formula") or "").strip()
+        code = ipm_data.formula_code(term)
 
         # ---------- evaluate Formula, if any ------------------------------
-        if formula:
+        if code is not None:
             env = {
                 # geometry (radians)
                 "inc": math.radians(inc_deg) if inc_deg is not None else 0.0,
@@ -71,7 +71,7 @@ def get_error_term_value(ipm_data,
                 "sqrt": math.sqrt, "abs": abs
             }
             try:
-                factor = abs(eval(formula, {"__builtins__": None}, env))
+                factor = abs(eval(code, {"__builtins__": None}, env))
                 sigma *= factor
             except Exception:
                 # leave sigma as-is if eval fails
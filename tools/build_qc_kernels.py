@@ -0,0 +1,40 @@
+# tools/build_qc_kernels.py
+"""
+Build the ahead-of-time QC kernel extension
+-------------------------------------------
+Compiles every kernel registered in `src/calculators/survey_qc_tests/_kernels.py`
+with `numba.pycc` into `_qc_kernels_aot.<ext>` next to that module.  Once the
+extension exists `_kernels` imports it instead of JIT-compiling, so a fresh
+worker serves its first QC request without any Numba compile or cache load.
+
+Usage (from the repository root, e.g. as a Docker build step):
+
+    python tools/build_qc_kernels.py
+
+The build is optional – without the extension the JIT kernels are used.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# No need to JIT the kernels just to read their Python source
+os.environ["NUMBA_DISABLE_JIT"] = "1"
+
+from numba.pycc import CC  # noqa: E402
+
+from src.calculators.survey_qc_tests import _kernels  # noqa: E402
+
+
+def main() -> None:
+    cc = CC("_qc_kernels_aot")
+    cc.output_dir = os.path.dirname(os.path.abspath(_kernels.__file__))
+    cc.verbose = True
+    for name, (func, nargs) in _kernels.PY_KERNELS.items():
+        cc.export(name, _kernels._f64_sig(nargs))(func)
+    cc.compile()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
-from app import create_app
+# Patch blocking stdlib I/O before anything else is imported so the gevent
+# worker can schedule requests cooperatively.
+from gevent import monkey
+monkey.patch_all()
 
-app = create_app()
+from app import create_app
 
-if __name__ == '__main__':
-    app.run()
\ No newline at end of file
+application = create_app()
+app = application  # `wsgi:app` alias kept for existing deploy configs